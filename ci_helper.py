@@ -308,7 +308,8 @@ class CIHelper:
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
-        # Run all checks
+        # Run all checks (the commands share the file listing persisted by the
+        # first one in the cache, so the tree is only walked once)
         preflight = self.run_preflight(scan_path)
         compat = self.run_compatibility_check(scan_path)
         stats = self.run_stats_collection(scan_path)
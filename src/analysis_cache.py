@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Analysis Cache
+
+Cache-through memoization of per-file analyzer results. Decorating an
+``analyze_file``-style method with ``@cached_analysis(...)`` stores its
+result in the CacheManager, keyed by
+
+- the content fingerprint of the file,
+- the analyzer name (the decorated method's qualified name),
+- the analyzer version given to the decorator,
+- a hash of the configuration attributes named by the decorator, and
+- the path as given, since analyzer results embed it (relative paths keep
+  results valid when the cache is moved to another checkout),
+
+so a repeat run over unchanged files returns the stored results instead of
+re-analyzing them, while a changed file, a new analyzer version or a
+different configuration (e.g. ``CodeSmellDetector(max_function_length=80)``)
+is a miss.
+
+Caching is off until enable_analysis_cache() is called (the CLI does this
+unless ``--no-cache`` is given), so library users and tests see no disk
+writes. A single analyzer can opt out by setting ``analysis_cache = False``
+on the instance, or use its own CacheManager by assigning one.
+
+Decorated methods must be pure functions of the file and the named
+configuration: side effects such as counters are not replayed on a hit.
+"""
+
+import atexit
+import functools
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+from parsed_file import ParsedFile
+
+_lock = threading.Lock()
+_enabled = False
+_cache_dir: Optional[str] = None
+_cache = None
+
+
+def enable_analysis_cache(cache=None, cache_dir: Optional[str] = None):
+    """Turn on result caching for every decorated analyzer in this process.
+
+    Args:
+        cache: CacheManager to use (default: one opened lazily on first use)
+        cache_dir: Directory for the lazily opened CacheManager
+    """
+    global _enabled, _cache_dir, _cache
+    with _lock:
+        _enabled = True
+        _cache_dir = cache_dir
+        _cache = cache
+
+
+def disable_analysis_cache():
+    """Turn result caching off again (an opened cache is closed)."""
+    global _enabled, _cache
+    with _lock:
+        _enabled = False
+        cache, _cache = _cache, None
+    if cache is not None:
+        cache.close()
+
+
+def active_cache():
+    """Return the process-wide CacheManager, or None if caching is off."""
+    global _cache
+    if not _enabled:
+        return None
+    if _cache is None:
+        with _lock:
+            if _cache is None and _enabled:
+                from cache_manager import CacheManager
+
+                _cache = CacheManager(_cache_dir)
+                atexit.register(_cache.close)
+    return _cache
+
+
+def config_hash(values: Iterable[Any]) -> str:
+    """Return a short, stable hash of configuration values."""
+    data = json.dumps(list(values), sort_keys=True, default=repr)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+def cached_analysis(version: str = "1", config: Iterable[str] = (),
+                    name: Optional[str] = None) -> Callable:
+    """Memoize a per-file analyzer method in the analysis cache.
+
+    The method must take the file (a path or a ParsedFile) as its only
+    argument and return a picklable result that is not None. In-memory
+    ParsedFiles are never cached.
+
+    Args:
+        version: Analyzer version; bump it when the method's output changes
+        config: Names of instance attributes that affect the result
+        name: Analyzer name in cache keys (default: the method's qualified name)
+    """
+    config = tuple(config)
+
+    def decorator(method):
+        analyzer = name or method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(self, target, *args, **kwargs):
+            cache = getattr(self, "analysis_cache", None)
+            if cache is None:
+                cache = active_cache()
+            if not cache or args or kwargs:
+                return method(self, target, *args, **kwargs)
+            if isinstance(target, ParsedFile):
+                if target.in_memory:
+                    return method(self, target)
+                path = target.path
+            else:
+                path = os.fspath(target)
+
+            fingerprint = cache.fingerprint(path)
+            if fingerprint is None:
+                return method(self, target)
+            key = "%s@%s:%s:%s" % (
+                analyzer, version, config_hash(getattr(self, attr) for attr in config), path
+            )
+            result = cache.get_result_cache(path, key, fingerprint)
+            if result is not None:
+                return result
+
+            result = method(self, target)
+            # Only store results for content that did not change while analyzed
+            after = cache.fingerprint(path)
+            if result is not None and after is not None and after.digest == fingerprint.digest:
+                cache.set_result_cache(path, key, result, fingerprint)
+            return result
+
+        wrapper.uncached = method
+        return wrapper
+
+    return decorator
@@ -23,7 +23,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 
 try:
-    from flask import Flask, request, jsonify, send_file
+    from flask import Flask, Response, request, jsonify, send_file, stream_with_context
     from flask_cors import CORS
 except ImportError:
     print("Error: Flask is required for the API server.")
@@ -73,6 +73,7 @@ def api_info():
         "/api/health": "Health check",
         "/api/info": "API information",
         "/api/check": "Run Python 3 compatibility check",
+        "/api/check/stream": "Run compatibility check, streaming NDJSON per file",
         "/api/fix": "Apply migration fixes",
         "/api/report": "Generate migration report",
         "/api/stats": "Get migration statistics",
@@ -135,6 +136,25 @@ def check_compatibility():
         return create_response(error=str(e), status_code=500)
 
 
+@app.route('/api/check/stream', methods=['POST'])
+def check_compatibility_stream():
+    """Run a compatibility check, streaming one NDJSON record per file."""
+    data = request.get_json() or {}
+    path = data.get('path', '.')
+    
+    if not os.path.exists(path):
+        return create_response(error=f"Path not found: {path}", status_code=404)
+    
+    from verifier import Python3CompatibilityVerifier
+    
+    def generate():
+        verifier = Python3CompatibilityVerifier(verbose=False)
+        for record in verifier.iter_results(path):
+            yield json.dumps({"type": "file", **record}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @app.route('/api/fix', methods=['POST'])
 def apply_fixes():
     """Apply migration fixes to code."""
@@ -154,12 +174,12 @@ def apply_fixes():
             backup_dir = os.path.join(tempfile.gettempdir(), 'py2to3_backups')
             os.makedirs(backup_dir, exist_ok=True)
         
-        fixer = Python2to3Fixer(backup_dir=backup_dir)
+        fixer = Python2to3Fixer(backup_dir=backup_dir, verbose=False)
         
         if os.path.isdir(path):
-            results = fixer.fix_directory(path)
+            results = fixer.fix_directory(path, dry_run=dry_run)
         else:
-            results = fixer.fix_file(path)
+            results = fixer.fix_file(path, dry_run=dry_run)
         
         return create_response({
             "path": path,
@@ -488,6 +508,7 @@ def main():
    
 🔧 Available Endpoints:
    POST /api/check      - Run compatibility check
+   POST /api/check/stream - Stream check results as NDJSON
    POST /api/fix        - Apply migration fixes
    POST /api/report     - Generate reports
    GET  /api/stats      - Get statistics
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+AST Table
+
+A flattened, marshal-encoded form of a parsed module for the AST cache.
+
+Unpickling a full ``ast`` tree creates every node object again and is
+barely faster than ``ast.parse``, so a pickled tree makes a poor cache. An
+AstTable instead keeps the nodes as rows in post-order (children before
+their parents), one row per node:
+
+    (type index, field values, position attributes)
+
+Child nodes are referred to by row index, so the whole table is plain
+tuples, lists, ints and strings that ``marshal`` loads several times faster
+than parsing the source. Callers that only need facts about the module (all
+functions with their line numbers, how many ``Call`` nodes there are, the
+names imported) can query the table directly; ``to_ast()`` rebuilds real
+nodes when a full tree is needed.
+
+Rebuilding nodes in Python can be slower than reparsing, so the cache uses
+an AstCostModel: it measures both ways of producing a tree per file-size
+bucket and picks the cheaper one. benchmark_ast_cache() reports the
+measured costs of each format per bucket.
+"""
+
+import ast
+import marshal
+import pickle
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Bump when the row layout changes; tables also record the Python version,
+# since node classes and fields differ between versions
+FORMAT_VERSION = 1
+
+# Upper bounds (in source bytes) of the file-size buckets used for timings
+SIZE_BUCKETS = (4 * 1024, 16 * 1024, 64 * 1024)
+
+_NODE_TYPES: Dict[str, type] = {
+    name: cls for name, cls in vars(ast).items()
+    if isinstance(cls, type) and issubclass(cls, ast.AST)
+}
+
+
+def size_bucket(size: int) -> str:
+    """Return the name of the file-size bucket for ``size`` bytes."""
+    for limit in SIZE_BUCKETS:
+        if size < limit:
+            return "<%dKB" % (limit // 1024)
+    return ">=%dKB" % (SIZE_BUCKETS[-1] // 1024)
+
+
+class TableNode(NamedTuple):
+    """A node of an AstTable, without its fields."""
+
+    index: int
+    type: str
+    lineno: Optional[int]
+    col_offset: Optional[int]
+    end_lineno: Optional[int]
+    end_col_offset: Optional[int]
+
+
+def _encode(value, rows: List[tuple], types: Dict[type, int]):
+    """Encode a field value, appending node rows as needed."""
+    if isinstance(value, ast.AST):
+        return _add_node(value, rows, types)
+    if isinstance(value, list):
+        return [_encode(item, rows, types) for item in value]
+    if type(value) is int or type(value) is tuple:
+        # Bare ints are row indices, so int (and tuple) leaves are wrapped
+        return (value,)
+    return value
+
+
+def _add_node(node: ast.AST, rows: List[tuple], types: Dict[type, int]) -> int:
+    cls = type(node)
+    values = tuple(_encode(getattr(node, name, None), rows, types) for name in cls._fields)
+    attrs = tuple(getattr(node, name, None) for name in cls._attributes)
+    rows.append((types.setdefault(cls, len(types)), values, attrs))
+    return len(rows) - 1
+
+
+class AstTable:
+    """Post-order node table of one parsed module."""
+
+    def __init__(self, types: Tuple[str, ...], rows: List[tuple]):
+        self.types = types
+        self.rows = rows
+
+    @classmethod
+    def from_tree(cls, tree: ast.AST) -> "AstTable":
+        """Flatten an AST into a table (the root is the last row)."""
+        rows: List[tuple] = []
+        types: Dict[type, int] = {}
+        _add_node(tree, rows, types)
+        return cls(tuple(node_type.__name__ for node_type in types), rows)
+
+    def dumps(self) -> bytes:
+        """Serialize the table."""
+        header = (FORMAT_VERSION, tuple(sys.version_info[:2]))
+        return marshal.dumps((header, self.types, self.rows))
+
+    @classmethod
+    def loads(cls, data: bytes) -> "AstTable":
+        """Load a serialized table.
+
+        Raises:
+            ValueError: If it was written by another format or Python version
+        """
+        header, types, rows = marshal.loads(data)
+        if tuple(header) != (FORMAT_VERSION, tuple(sys.version_info[:2])):
+            raise ValueError("incompatible AST table %r" % (header,))
+        return cls(tuple(types), rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def root(self) -> TableNode:
+        """The module node."""
+        return self.node(len(self.rows) - 1)
+
+    def node(self, index: int) -> TableNode:
+        """Return the node in row ``index``."""
+        type_index, _, attrs = self.rows[index]
+        name = self.types[type_index]
+        if len(attrs) == 4:
+            return TableNode(index, name, *attrs)
+        positions = dict(zip(_NODE_TYPES[name]._attributes, attrs))
+        return TableNode(
+            index, name, positions.get("lineno"), positions.get("col_offset"),
+            positions.get("end_lineno"), positions.get("end_col_offset"),
+        )
+
+    def _type_indices(self, type_names: Iterable[str]) -> set:
+        wanted = set(type_names)
+        return {i for i, name in enumerate(self.types) if name in wanted}
+
+    def find(self, *type_names: str) -> Iterator[TableNode]:
+        """Yield the nodes of the given types (all nodes if none given), in source order."""
+        if not type_names:
+            indices = range(len(self.rows))
+        else:
+            wanted = self._type_indices(type_names)
+            indices = [i for i, row in enumerate(self.rows) if row[0] in wanted]
+        nodes = [self.node(i) for i in indices]
+        nodes.sort(key=lambda n: (n.lineno or 0, n.col_offset or 0, -n.index))
+        return iter(nodes)
+
+    def count(self, *type_names: str) -> int:
+        """Return the number of nodes of the given types."""
+        wanted = self._type_indices(type_names)
+        return sum(1 for row in self.rows if row[0] in wanted)
+
+    def _decode(self, value, make):
+        kind = type(value)
+        if kind is int:
+            return make(value)
+        if kind is tuple:
+            return value[0]
+        if kind is list:
+            return [self._decode(item, make) for item in value]
+        return value
+
+    def fields(self, index: int) -> Dict[str, Any]:
+        """Return the fields of a node, with child nodes as TableNodes."""
+        type_index, values, _ = self.rows[index]
+        names = _NODE_TYPES[self.types[type_index]]._fields
+        return {name: self._decode(value, self.node) for name, value in zip(names, values)}
+
+    def to_ast(self) -> ast.AST:
+        """Rebuild the full tree."""
+        classes = [_NODE_TYPES[name] for name in self.types]
+        nodes: List[ast.AST] = []
+        for type_index, values, attrs in self.rows:
+            cls = classes[type_index]
+            node = cls.__new__(cls)
+            state = node.__dict__
+            for name, value in zip(cls._fields, values):
+                kind = type(value)
+                if kind is int:
+                    value = nodes[value]
+                elif kind is tuple:
+                    value = value[0]
+                elif kind is list:
+                    value = [self._decode(item, nodes.__getitem__) for item in value]
+                state[name] = value
+            for name, value in zip(cls._attributes, attrs):
+                if value is not None:
+                    state[name] = value
+            nodes.append(node)
+        return nodes[-1]
+
+
+class AstCostModel:
+    """Measured cost of producing a tree from a table vs reparsing, per size bucket.
+
+    Costs are kept as moving averages of seconds per source byte. Until both
+    ways have been measured for a bucket, the unmeasured one is tried.
+    """
+
+    SMOOTHING = 0.2
+
+    def __init__(self, timings: Optional[Dict[str, Dict[str, float]]] = None):
+        self.timings: Dict[str, Dict[str, float]] = {
+            bucket: dict(costs) for bucket, costs in (timings or {}).items()
+        }
+
+    def choose(self, size: int) -> str:
+        """Return "build" or "parse", whichever is cheaper for files of ``size`` bytes."""
+        costs = self.timings.get(size_bucket(size), {})
+        for method in ("build", "parse"):
+            if method not in costs:
+                return method
+        return "build" if costs["build"] <= costs["parse"] else "parse"
+
+    def record(self, method: str, size: int, seconds: float):
+        """Record how long one tree took to produce."""
+        costs = self.timings.setdefault(size_bucket(size), {})
+        per_byte = seconds / max(size, 1)
+        previous = costs.get(method)
+        costs[method] = per_byte if previous is None else (
+            previous + self.SMOOTHING * (per_byte - previous)
+        )
+
+
+def _best_time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_ast_cache(paths: Iterable[str], repeat: int = 3) -> List[Dict[str, Any]]:
+    """Time parsing against loading each AST cache format, per file-size bucket.
+
+    Args:
+        paths: Python files to measure (files that do not parse are skipped)
+        repeat: Timing runs per file; the fastest is used
+
+    Returns:
+        One dict per bucket with the file count, average source and
+        serialized sizes, and average milliseconds for ``parse``
+        (ast.parse), ``unpickle`` (pickled tree), ``table`` (loading an
+        AstTable) and ``build`` (loading an AstTable and rebuilding the tree)
+    """
+    totals: Dict[str, Dict[str, float]] = {}
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                source = f.read()
+            tree = ast.parse(source, filename=path)
+        except (OSError, SyntaxError, ValueError):
+            continue
+        pickled = pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL)
+        table = AstTable.from_tree(tree).dumps()
+
+        bucket = totals.setdefault(size_bucket(len(source)), {
+            "files": 0, "source_bytes": 0, "pickle_bytes": 0, "table_bytes": 0,
+            "parse": 0.0, "unpickle": 0.0, "table": 0.0, "build": 0.0,
+        })
+        bucket["files"] += 1
+        bucket["source_bytes"] += len(source)
+        bucket["pickle_bytes"] += len(pickled)
+        bucket["table_bytes"] += len(table)
+        bucket["parse"] += _best_time(lambda: ast.parse(source, filename=path), repeat)
+        bucket["unpickle"] += _best_time(lambda: pickle.loads(pickled), repeat)
+        bucket["table"] += _best_time(lambda: AstTable.loads(table), repeat)
+        bucket["build"] += _best_time(lambda: AstTable.loads(table).to_ast(), repeat)
+
+    order = [size_bucket(limit - 1) for limit in SIZE_BUCKETS] + [size_bucket(SIZE_BUCKETS[-1])]
+    results = []
+    for name in order:
+        if name not in totals:
+            continue
+        bucket = totals[name]
+        files = bucket["files"]
+        row = {"bucket": name, "files": files}
+        for key in ("source_bytes", "pickle_bytes", "table_bytes"):
+            row[key] = int(bucket[key] / files)
+        for key in ("parse", "unpickle", "table", "build"):
+            row[key + "_ms"] = bucket[key] * 1000 / files
+        results.append(row)
+    return results
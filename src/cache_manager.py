@@ -9,133 +9,613 @@ Speeds up repeated operations by caching:
 - Dependency graphs
 
 Automatically invalidates cache when files change.
+
+The cache has two tiers:
+
+- an in-process LRU of decoded objects, so repeated hits in long-lived
+  processes (``watch``, the API server) skip unpickling entirely, and
+- a single SQLite database (``cache.db``) in WAL mode, so readers never
+  block the writer. Entries are indexed by (kind, fingerprint), where the
+  fingerprint is the hash of the file content the entry was computed from,
+  and a separate table maps each cached path to its current hash;
+  statistics, listing and age-based cleanup are indexed queries rather
+  than directory scans. The database is held under a byte budget by
+  evicting the least recently (LRU) or least frequently (LFU) used entries.
+
+Since entries do not depend on where a file lives, they can be exported to
+a compressed bundle and imported into another checkout's cache (e.g. to
+warm-start CI runners from the main branch's cache).
+
+ASTs are stored as marshal-encoded AstTables (see ast_table.py) rather
+than pickled trees: a table loads several times faster than the source
+parses, and get_ast_table() answers queries on it directly. get_ast_cache()
+rebuilds a full tree either from the table or by reparsing the file,
+whichever has measured cheaper for files of that size.
+
+Content hashes come from the process-wide FingerprintService, and the stat
+tuple each hash was computed for is stored with the file, so a lookup on an
+unchanged file costs a stat() call rather than a read and a hash.
 """
 
+import ast
+import gzip
 import os
 import json
 import pickle
-import hashlib
+import sqlite3
+import struct
+import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, Optional, Dict, List, Tuple
-from collections import defaultdict
+
+from ast_table import AstCostModel, AstTable
+from file_fingerprint import Fingerprint, StatKey, fingerprint_service
+from verification_record import VerificationRecord
+
+# (kind, content hash) of one cache entry
+EntryKey = Tuple[str, str]
+
+# Connections inherited through fork(), kept open so they are never closed
+# in the child (see CacheManager._after_fork)
+_inherited_connections: List[sqlite3.Connection] = []
+
+# Cache bundles: a gzip stream of a JSON header line, then one frame per
+# entry (four big-endian lengths, then kind, fingerprint, category and data),
+# then the verifier results as one JSON frame
+BUNDLE_FORMAT = 1
+_FRAME = struct.Struct(">HHHI")
+
+_MISSING = object()
+
+
+class _MemoryTier:
+    """Bounded LRU of decoded cache values, keyed like database entries"""
+    
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Entry key -> (value, encoded size)
+        self._items: "OrderedDict[EntryKey, Tuple[Any, int]]" = OrderedDict()
+    
+    def __len__(self):
+        return len(self._items)
+    
+    def get(self, key: EntryKey) -> Any:
+        """Return the value for key (most recently used now), or _MISSING"""
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return _MISSING
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[0]
+    
+    def put(self, key: EntryKey, value: Any, size: int):
+        """Add a value, evicting least recently used ones beyond the bounds"""
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.size_bytes -= old[1]
+        self._items[key] = (value, size)
+        self.size_bytes += size
+        while len(self._items) > self.max_entries or self.size_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._items.popitem(last=False)
+            self.size_bytes -= evicted_size
+            self.evictions += 1
+    
+    def discard_hash(self, digest: str):
+        """Drop every value cached for content with this hash"""
+        for key in [key for key in self._items if key[1] == digest]:
+            self.size_bytes -= self._items.pop(key)[1]
+    
+    def clear(self):
+        """Drop every value"""
+        self._items.clear()
+        self.size_bytes = 0
 
 
 class CacheManager:
-    """Smart caching system for migration tool operations"""
+    """Smart caching system for migration tool operations
+    
+    Values returned by the get_* methods may be shared with other callers
+    in the same process (they come from the in-memory tier) and must not be
+    mutated.
+    """
     
-    CACHE_VERSION = "1.0.0"
+    CACHE_VERSION = "3.0.0"
     DEFAULT_CACHE_DIR = ".py2to3_cache"
+    DATABASE_NAME = "cache.db"
+    
+    # Entry categories, as accepted by clear_cache()
+    CATEGORIES = ("ast", "patterns", "analysis")
+    
+    # Kinds whose data is pickled; never exchanged through bundles
+    PICKLED_KIND_PREFIX = "result:"
+    
+    # Persistent tier budget and eviction order, unless configured
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+    EVICTION_POLICIES = ("lru", "lfu")
+    DEFAULT_EVICTION_POLICY = "lru"
     
-    def __init__(self, cache_dir: Optional[str] = None):
+    # Eviction frees space down to this fraction of the budget, so it runs
+    # once per batch of writes rather than on every write
+    EVICTION_LOW_WATER = 0.9
+    
+    # In-memory tier bounds
+    DEFAULT_MEMORY_ENTRIES = 512
+    DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+    
+    # Entry accesses are recorded in memory and written in batches of this size
+    ACCESS_FLUSH_SIZE = 256
+    
+    # Seconds to wait for another process's write transaction to finish
+    BUSY_TIMEOUT = 30
+    
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            hash TEXT NOT NULL,
+            dev INTEGER,
+            ino INTEGER,
+            size INTEGER,
+            mtime_ns INTEGER,
+            updated REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS entries (
+            kind TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            category TEXT NOT NULL,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            created REAL NOT NULL,
+            accessed REAL NOT NULL,
+            uses INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, fingerprint)
+        );
+        CREATE TABLE IF NOT EXISTS timings (
+            operation TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            seconds REAL NOT NULL,
+            PRIMARY KEY (operation, path)
+        );
+        CREATE INDEX IF NOT EXISTS files_hash ON files (hash);
+        CREATE INDEX IF NOT EXISTS entries_fingerprint ON entries (fingerprint);
+        CREATE INDEX IF NOT EXISTS entries_category ON entries (category);
+        CREATE INDEX IF NOT EXISTS entries_created ON entries (created);
+        CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed);
+        CREATE INDEX IF NOT EXISTS entries_lfu ON entries (uses, accessed);
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                 eviction_policy: Optional[str] = None,
+                 memory_max_entries: Optional[int] = None,
+                 memory_max_bytes: Optional[int] = None):
         """
         Initialize cache manager
         
         Args:
             cache_dir: Directory to store cache files (default: .py2to3_cache)
+            max_bytes: Byte budget of the persistent tier (default: the limit
+                saved with set_limits(), else DEFAULT_MAX_BYTES)
+            eviction_policy: 'lru' or 'lfu' (default: the saved policy, else lru)
+            memory_max_entries: Entries kept decoded in memory (0 disables
+                the in-memory tier)
+            memory_max_bytes: Encoded size of the entries kept in memory
         """
         self.cache_dir = Path(cache_dir or self.DEFAULT_CACHE_DIR)
-        self.cache_dir.mkdir(exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / self.DATABASE_NAME
         
-        # Cache subdirectories
-        self.ast_cache_dir = self.cache_dir / "ast"
-        self.pattern_cache_dir = self.cache_dir / "patterns"
-        self.analysis_cache_dir = self.cache_dir / "analysis"
-        self.metadata_dir = self.cache_dir / "metadata"
+        # Statistics
+        self.stats = self._new_stats()
         
-        for d in [self.ast_cache_dir, self.pattern_cache_dir, 
-                  self.analysis_cache_dir, self.metadata_dir]:
-            d.mkdir(exist_ok=True)
+        self.fingerprints = fingerprint_service()
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        # Entry key -> uses since the last flush (with the last access time)
+        self._accesses: Dict[EntryKey, Tuple[int, float]] = {}
+        self._pid = os.getpid()
+        self._connection = self._connect()
         
-        # Statistics
-        self.stats = {
+        settings = dict(self._conn.execute(
+            "SELECT key, value FROM meta WHERE key IN ('max_bytes', 'eviction_policy', 'ast_costs')"
+        ))
+        self.max_bytes = int(max_bytes if max_bytes is not None
+                             else settings.get('max_bytes', self.DEFAULT_MAX_BYTES))
+        self.eviction_policy = (eviction_policy or settings.get('eviction_policy')
+                                or self.DEFAULT_EVICTION_POLICY)
+        if self.eviction_policy not in self.EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {self.eviction_policy}")
+        
+        self._memory = _MemoryTier(
+            self.DEFAULT_MEMORY_ENTRIES if memory_max_entries is None else memory_max_entries,
+            self.DEFAULT_MEMORY_BYTES if memory_max_bytes is None else memory_max_bytes
+        )
+        self._stored_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+        
+        # Measured cost of rebuilding ASTs from tables vs reparsing
+        try:
+            self.ast_costs = AstCostModel(json.loads(settings.get('ast_costs', '{}')))
+        except (ValueError, TypeError, AttributeError):
+            self.ast_costs = AstCostModel()
+    
+    @staticmethod
+    def _new_stats() -> Dict[str, int]:
+        """Return zeroed statistics counters"""
+        return {
             'hits': 0,
             'misses': 0,
             'invalidations': 0,
-            'total_size': 0
+            'total_size': 0,
+            'disk_hits': 0,
+            'disk_misses': 0,
+            'disk_evictions': 0
         }
-        
-        self._load_metadata()
     
-    def _load_metadata(self):
-        """Load cache metadata"""
-        self.metadata_file = self.metadata_dir / "cache_metadata.json"
-        if self.metadata_file.exists():
-            with open(self.metadata_file, 'r') as f:
-                self.metadata = json.load(f)
-        else:
-            self.metadata = {
-                'version': self.CACHE_VERSION,
-                'created': time.time(),
-                'file_hashes': {},
-                'stats': self.stats
-            }
-    
-    def _save_metadata(self):
-        """Save cache metadata"""
-        self.metadata['stats'] = self.stats
-        with open(self.metadata_file, 'w') as f:
-            json.dump(self.metadata, f, indent=2)
-    
-    def _get_file_hash(self, filepath: str) -> str:
-        """Calculate MD5 hash of file content"""
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database, (re)creating the schema if needed"""
+        # Transactions are started explicitly (see _write), so that reads
+        # and the writes depending on them are one atomic step
+        conn = sqlite3.connect(str(self.db_path), timeout=self.BUSY_TIMEOUT,
+                               check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL makes NORMAL safe against corruption; only the last commits
+        # can be lost on power failure, which a cache can afford
+        conn.execute("PRAGMA synchronous=NORMAL")
+        
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            with open(filepath, 'rb') as f:
-                return hashlib.md5(f.read()).hexdigest()
-        except Exception:
-            return ""
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.CACHE_VERSION:
+                # Written by another version: start over with the current schema
+                conn.execute("DROP TABLE IF EXISTS entries")
+                conn.execute("DROP TABLE IF EXISTS files")
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                    (self.CACHE_VERSION,)
+                )
+            for statement in self._SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+        except BaseException:
+            conn.rollback()
+            conn.close()
+            raise
+        conn.commit()
+        return conn
+    
+    @property
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        """This process's database connection (reopened in a forked child)"""
+        if self._pid != os.getpid():
+            self._after_fork()
+        return self._connection
     
-    def _has_file_changed(self, filepath: str) -> bool:
-        """Check if file has changed since last cache"""
-        current_hash = self._get_file_hash(filepath)
-        cached_hash = self.metadata['file_hashes'].get(filepath)
-        return current_hash != cached_hash
+    def _after_fork(self):
+        """Give a forked child its own connection and locks"""
+        # SQLite connections must not be used or closed in a forked child:
+        # closing one could checkpoint or remove the WAL under the parent
+        _inherited_connections.append(self._connection)
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._accesses = {}
+        if self._connection is not None:
+            self._connection = self._connect()
     
-    def _update_file_hash(self, filepath: str):
-        """Update stored hash for file"""
-        self.metadata['file_hashes'][filepath] = self._get_file_hash(filepath)
+    @contextmanager
+    def _write(self):
+        """
+        Run a read-modify-write step as one write transaction
+        
+        BEGIN IMMEDIATE takes the database write lock up front, so other
+        processes wait (up to BUSY_TIMEOUT) instead of interleaving with the
+        step or failing half-way. Inside a batch the batch's transaction is used.
+        """
+        with self._lock:
+            conn = self._conn
+            if self._batch_depth:
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
     
-    def _get_cache_key(self, filepath: str, cache_type: str) -> str:
-        """Generate cache key for filepath and type"""
-        # Use relative path if possible for portability
+    def close(self):
+        """Commit pending writes and close the database"""
+        with self._lock:
+            if self._conn is not None:
+                with self._write():
+                    self._flush_accesses()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('ast_costs', ?)",
+                        (json.dumps(self.ast_costs.timings),)
+                    )
+                self._connection.close()
+                self._connection = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group cache writes into one transaction
+        
+        Outside a batch every set/invalidate call commits on its own; inside
+        one, writes are committed together when the outermost batch exits
+        (or rolled back if it raises). A batch holds the database write lock
+        until it exits, so other processes sharing the cache wait for it:
+        keep batches short.
+        """
+        with self._lock:
+            if self._batch_depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._conn.rollback()
+                    # Rolled-back writes may have been counted
+                    self._stored_bytes = self._conn.execute(
+                        "SELECT COALESCE(SUM(size), 0) FROM entries"
+                    ).fetchone()[0]
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._conn.commit()
+    
+    def set_limits(self, max_bytes: Optional[int] = None,
+                   eviction_policy: Optional[str] = None) -> int:
+        """
+        Save a new budget and/or eviction policy and enforce it right away
+        
+        The settings are stored in the cache database and apply to every
+        later CacheManager opened on it.
+        
+        Args:
+            max_bytes: Byte budget of the persistent tier
+            eviction_policy: 'lru' or 'lfu'
+            
+        Returns:
+            Number of entries evicted to meet the budget
+        """
+        if eviction_policy is not None and eviction_policy not in self.EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {eviction_policy}")
+        with self._write():
+            if max_bytes is not None:
+                self.max_bytes = int(max_bytes)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('max_bytes', ?)",
+                    (str(self.max_bytes),)
+                )
+            if eviction_policy is not None:
+                self.eviction_policy = eviction_policy
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('eviction_policy', ?)",
+                    (eviction_policy,)
+                )
+            evicted = self._evict()
+        return evicted
+    
+    def _known_fingerprint(self, path: str) -> Optional[Tuple[StatKey, str]]:
+        """Return the stored (stat tuple, hash) of a cached file, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT dev, ino, size, mtime_ns, hash FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return row[:4], row[4]
+    
+    def fingerprint(self, filepath: str) -> Optional[Fingerprint]:
+        """
+        Return the file's content fingerprint, hashing only if it changed
+        
+        Args:
+            filepath: Path to file
+            
+        Returns:
+            Fingerprint, or None if the file cannot be read
+        """
+        path = os.fspath(filepath)
+        return self.fingerprints.get(path, known=lambda _: self._known_fingerprint(path))
+    
+    def _record_access(self, key: EntryKey):
+        """Count a use of an entry, for LRU/LFU eviction"""
+        with self._lock:
+            uses, _ = self._accesses.get(key, (0, 0.0))
+            self._accesses[key] = (uses + 1, time.time())
+            if len(self._accesses) >= self.ACCESS_FLUSH_SIZE:
+                with self._write():
+                    self._flush_accesses()
+    
+    def _flush_accesses(self):
+        """Write recorded entry uses to the database (caller commits)"""
+        if not self._accesses:
+            return
+        accesses, self._accesses = self._accesses, {}
+        self._conn.executemany(
+            "UPDATE entries SET uses = uses + ?, accessed = MAX(accessed, ?) "
+            "WHERE kind = ? AND fingerprint = ?",
+            [(uses, accessed, *key) for key, (uses, accessed) in accesses.items()]
+        )
+    
+    def _evict(self) -> int:
+        """Evict entries until the persistent tier is within its budget (caller commits)"""
+        self._flush_accesses()
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self._stored_bytes = total
+        if total <= self.max_bytes:
+            return 0
+        
+        goal = total - int(self.max_bytes * self.EVICTION_LOW_WATER)
+        order = "accessed" if self.eviction_policy == "lru" else "uses, accessed"
+        victims = []
+        freed = 0
+        for kind, fingerprint, size in self._conn.execute(
+            f"SELECT kind, fingerprint, size FROM entries ORDER BY {order}"
+        ):
+            victims.append((kind, fingerprint))
+            freed += size
+            if freed >= goal:
+                break
+        
+        self._conn.executemany(
+            "DELETE FROM entries WHERE kind = ? AND fingerprint = ?", victims
+        )
+        self._conn.executemany(
+            "DELETE FROM files WHERE hash = ? AND NOT EXISTS "
+            "(SELECT 1 FROM entries WHERE entries.fingerprint = files.hash)",
+            [(digest,) for digest in {victim[1] for victim in victims}]
+        )
+        self._stored_bytes = total - freed
+        self.stats['disk_evictions'] += len(victims)
+        return len(victims)
+    
+    def _get(self, filepath: str, kind: str, loader, fingerprint: Optional[Fingerprint] = None,
+             memory: bool = True) -> Optional[Any]:
+        """Return the cached value for the file's current content, or None"""
+        fingerprint = fingerprint or self.fingerprint(filepath)
+        if fingerprint is None:
+            self.stats['misses'] += 1
+            return None
+        key = (kind, fingerprint.digest)
+        
+        if memory:
+            value = self._memory.get(key)
+            if value is not _MISSING:
+                self.stats['hits'] += 1
+                self._record_access(key)
+                return value
+        
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM entries WHERE kind = ? AND fingerprint = ?", key
+            ).fetchone()
         try:
-            rel_path = os.path.relpath(filepath)
-        except ValueError:
-            rel_path = filepath
+            if row is None:
+                raise LookupError(kind)
+            value = loader(row[0])
+        except Exception:
+            self.stats['disk_misses'] += 1
+            self.stats['misses'] += 1
+            return None
+        
+        self.stats['disk_hits'] += 1
+        self.stats['hits'] += 1
+        if memory:
+            self._memory.put(key, value, len(row[0]))
+        self._record_access(key)
+        return value
+    
+    def _set_entry(self, filepath: str, kind: str, category: str, data: bytes,
+                   fingerprint: Optional[Fingerprint] = None):
+        """Store data for the file's current (or given) content, replacing older versions"""
+        fingerprint = fingerprint or self.fingerprint(filepath)
+        if fingerprint is None:
+            return
+        path = os.fspath(filepath)
+        digest = fingerprint.digest
+        stat = fingerprint.stat or (None, None, None, None)
+        now = time.time()
+        with self._write():
+            row = self._conn.execute("SELECT hash FROM files WHERE path = ?", (path,)).fetchone()
+            if row is not None and row[0] != digest:
+                # The file's earlier content can never be hit again through
+                # this path; drop its entry unless another file shares it
+                self._conn.execute(
+                    "DELETE FROM entries WHERE kind = ? AND fingerprint = ? AND NOT EXISTS "
+                    "(SELECT 1 FROM files WHERE hash = ? AND path != ?)",
+                    (kind, row[0], row[0], path)
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(kind, fingerprint, category, data, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, digest, category, data, len(data), now, now)
+            )
+            self._conn.execute(
+                "INSERT INTO files (path, hash, dev, ino, size, mtime_ns, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET hash = excluded.hash, dev = excluded.dev, "
+                "ino = excluded.ino, size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                "updated = excluded.updated",
+                (path, digest, *stat, now)
+            )
+            # Replaced entries are not subtracted, so this may run early; _evict() recounts
+            self._stored_bytes += len(data)
+            if self._stored_bytes > self.max_bytes:
+                self._evict()
+    
+    def get_ast_table(self, filepath: str) -> Optional[AstTable]:
+        """
+        Retrieve the cached AST of a file as a node table
         
-        # Create safe filename from path
-        safe_name = rel_path.replace(os.sep, '_').replace('/', '_')
-        file_hash = self._get_file_hash(filepath)[:8]
-        return f"{safe_name}_{file_hash}"
+        Args:
+            filepath: Path to Python file
+            
+        Returns:
+            AstTable or None if not cached or invalidated
+        """
+        return self._get(filepath, 'ast', AstTable.loads)
     
     def get_ast_cache(self, filepath: str) -> Optional[Any]:
         """
         Retrieve cached AST for file
         
+        The tree is rebuilt from the cached table, or the file is parsed
+        again if that has measured cheaper for files of its size.
+        
         Args:
             filepath: Path to Python file
             
         Returns:
             Cached AST or None if not cached or invalidated
         """
-        if self._has_file_changed(filepath):
-            self.stats['misses'] += 1
+        fingerprint = self.fingerprint(filepath)
+        table = self._get(filepath, 'ast', AstTable.loads, fingerprint)
+        if table is None:
             return None
         
-        cache_key = self._get_cache_key(filepath, 'ast')
-        cache_file = self.ast_cache_dir / f"{cache_key}.pkl"
-        
-        if cache_file.exists():
+        size = fingerprint.stat[2] if fingerprint.stat else os.path.getsize(filepath)
+        method = self.ast_costs.choose(size)
+        start = time.perf_counter()
+        tree = None
+        if method == 'parse':
             try:
-                with open(cache_file, 'rb') as f:
-                    self.stats['hits'] += 1
-                    return pickle.load(f)
-            except Exception:
-                self.stats['misses'] += 1
-                return None
-        
-        self.stats['misses'] += 1
-        return None
+                with open(filepath, 'rb') as f:
+                    tree = ast.parse(f.read(), filename=os.fspath(filepath))
+            except (OSError, SyntaxError, ValueError):
+                method = 'build'
+        if tree is None:
+            start = time.perf_counter()
+            tree = table.to_ast()
+        self.ast_costs.record(method, size, time.perf_counter() - start)
+        return tree
     
     def set_ast_cache(self, filepath: str, ast_tree: Any):
         """
@@ -145,16 +625,11 @@ class CacheManager:
             filepath: Path to Python file
             ast_tree: AST tree object
         """
-        cache_key = self._get_cache_key(filepath, 'ast')
-        cache_file = self.ast_cache_dir / f"{cache_key}.pkl"
-        
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(ast_tree, f)
-            self._update_file_hash(filepath)
-            self._save_metadata()
-        except Exception:
-            pass
+            data = AstTable.from_tree(ast_tree).dumps()
+        except (TypeError, ValueError, AttributeError):
+            return
+        self._set_entry(filepath, 'ast', 'ast', data)
     
     def get_pattern_cache(self, filepath: str, pattern_name: str) -> Optional[List]:
         """
@@ -167,24 +642,7 @@ class CacheManager:
         Returns:
             List of matches or None if not cached
         """
-        if self._has_file_changed(filepath):
-            self.stats['misses'] += 1
-            return None
-        
-        cache_key = self._get_cache_key(filepath, f'pattern_{pattern_name}')
-        cache_file = self.pattern_cache_dir / f"{cache_key}.json"
-        
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r') as f:
-                    self.stats['hits'] += 1
-                    return json.load(f)
-            except Exception:
-                self.stats['misses'] += 1
-                return None
-        
-        self.stats['misses'] += 1
-        return None
+        return self._get(filepath, f'pattern:{pattern_name}', json.loads)
     
     def set_pattern_cache(self, filepath: str, pattern_name: str, matches: List):
         """
@@ -195,16 +653,11 @@ class CacheManager:
             pattern_name: Name of pattern being matched
             matches: List of pattern matches
         """
-        cache_key = self._get_cache_key(filepath, f'pattern_{pattern_name}')
-        cache_file = self.pattern_cache_dir / f"{cache_key}.json"
-        
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(matches, f)
-            self._update_file_hash(filepath)
-            self._save_metadata()
+            data = json.dumps(matches).encode('utf-8')
         except Exception:
-            pass
+            return
+        self._set_entry(filepath, f'pattern:{pattern_name}', 'patterns', data)
     
     def get_analysis_cache(self, filepath: str) -> Optional[Dict]:
         """
@@ -216,24 +669,7 @@ class CacheManager:
         Returns:
             Analysis results dict or None if not cached
         """
-        if self._has_file_changed(filepath):
-            self.stats['misses'] += 1
-            return None
-        
-        cache_key = self._get_cache_key(filepath, 'analysis')
-        cache_file = self.analysis_cache_dir / f"{cache_key}.json"
-        
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r') as f:
-                    self.stats['hits'] += 1
-                    return json.load(f)
-            except Exception:
-                self.stats['misses'] += 1
-                return None
-        
-        self.stats['misses'] += 1
-        return None
+        return self._get(filepath, 'analysis', json.loads)
     
     def set_analysis_cache(self, filepath: str, analysis: Dict):
         """
@@ -243,45 +679,119 @@ class CacheManager:
             filepath: Path to Python file
             analysis: Analysis results dictionary
         """
-        cache_key = self._get_cache_key(filepath, 'analysis')
-        cache_file = self.analysis_cache_dir / f"{cache_key}.json"
+        try:
+            data = json.dumps(analysis).encode('utf-8')
+        except Exception:
+            return
+        self._set_entry(filepath, 'analysis', 'analysis', data)
+    
+    def get_result_cache(self, filepath: str, key: str,
+                         fingerprint: Optional[Fingerprint] = None) -> Optional[Any]:
+        """
+        Retrieve a cached analyzer result for file
+        
+        Results are unpickled on every call, so callers may modify them.
+        
+        Args:
+            filepath: Path to Python file
+            key: Analyzer key (name, version and configuration hash)
+            fingerprint: Fingerprint of the file, if already known
+            
+        Returns:
+            Stored result or None if not cached
+        """
+        return self._get(filepath, self.PICKLED_KIND_PREFIX + key, pickle.loads, fingerprint, memory=False)
+    
+    def set_result_cache(self, filepath: str, key: str, result: Any,
+                         fingerprint: Optional[Fingerprint] = None):
+        """
+        Cache an analyzer result for file (counted as analysis cache)
         
+        Args:
+            filepath: Path to Python file
+            key: Analyzer key (name, version and configuration hash)
+            result: Picklable analyzer result
+            fingerprint: Fingerprint of the content the result was computed from
+        """
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(analysis, f, indent=2)
-            self._update_file_hash(filepath)
-            self._save_metadata()
+            data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
         except Exception:
-            pass
+            return
+        self._set_entry(filepath, self.PICKLED_KIND_PREFIX + key, 'analysis', data, fingerprint)
+    
+    def get_timings(self, operation: str, paths: List[str]) -> Dict[str, Tuple[int, float]]:
+        """
+        Return the per-file durations recorded by earlier runs
+        
+        Args:
+            operation: Operation the durations were measured for (e.g. 'check')
+            paths: Files to look up
+            
+        Returns:
+            Dict mapping each path with a recorded duration to the file's
+            (size in bytes, seconds) at the time
+        """
+        by_key = {os.path.abspath(path): path for path in paths}
+        keys = list(by_key)
+        timings = {}
+        with self._lock:
+            # Stay below SQLite's limit on query parameters
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ", ".join("?" * len(batch))
+                for path, size, seconds in self._conn.execute(
+                    f"SELECT path, size, seconds FROM timings "
+                    f"WHERE operation = ? AND path IN ({placeholders})", [operation, *batch]
+                ):
+                    timings[by_key[path]] = (size, seconds)
+        return timings
+    
+    def set_timings(self, operation: str, timings: Dict[str, Tuple[int, float]]):
+        """
+        Record per-file durations for scheduling later runs
+        
+        Args:
+            operation: Operation the durations were measured for
+            timings: Dict mapping paths to the file's (size in bytes, seconds)
+        """
+        with self._write():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO timings (operation, path, size, seconds) "
+                "VALUES (?, ?, ?, ?)",
+                [(operation, os.path.abspath(path), size, seconds)
+                 for path, (size, seconds) in timings.items()]
+            )
     
     def invalidate_file(self, filepath: str) -> int:
         """
         Invalidate all cache entries for a specific file
         
+        Entries for the file's last cached content and its current content
+        are removed (also for other files with the same content).
+        
         Args:
             filepath: Path to file to invalidate
             
         Returns:
             Number of cache entries removed
         """
-        removed = 0
-        cache_key_prefix = self._get_cache_key(filepath, '')
-        
-        for cache_dir in [self.ast_cache_dir, self.pattern_cache_dir, 
-                          self.analysis_cache_dir]:
-            for cache_file in cache_dir.glob(f"{cache_key_prefix}*"):
-                try:
-                    cache_file.unlink()
-                    removed += 1
-                except Exception:
-                    pass
-        
-        # Remove from metadata
-        if filepath in self.metadata['file_hashes']:
-            del self.metadata['file_hashes'][filepath]
+        path = os.fspath(filepath)
+        with self._write():
+            row = self._conn.execute("SELECT hash FROM files WHERE path = ?", (path,)).fetchone()
+            digests = {row[0]} if row is not None else set()
+            self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            self.fingerprints.forget(path)
+            current = self.fingerprints.get(path)
+            if current is not None:
+                digests.add(current.digest)
+            removed = 0
+            for digest in digests:
+                removed += self._conn.execute(
+                    "DELETE FROM entries WHERE fingerprint = ?", (digest,)
+                ).rowcount
+                self._memory.discard_hash(digest)
         
         self.stats['invalidations'] += removed
-        self._save_metadata()
         return removed
     
     def clear_cache(self, cache_type: Optional[str] = None) -> int:
@@ -294,39 +804,178 @@ class CacheManager:
         Returns:
             Number of cache entries removed
         """
-        removed = 0
+        with self._write():
+            if cache_type is None:
+                removed = self._conn.execute("DELETE FROM entries").rowcount
+                self._conn.execute("DELETE FROM files")
+                self._conn.execute("DELETE FROM timings")
+                self.stats = self._new_stats()
+                self._memory = _MemoryTier(self._memory.max_entries, self._memory.max_bytes)
+            elif cache_type in self.CATEGORIES:
+                removed = self._conn.execute(
+                    "DELETE FROM entries WHERE category = ?", (cache_type,)
+                ).rowcount
+            else:
+                removed = 0
+            self._accesses.clear()
+            self._memory.clear()
+            self._stored_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
         
-        if cache_type == 'ast' or cache_type is None:
-            removed += self._clear_directory(self.ast_cache_dir)
+        if cache_type is None:
+            self.vacuum()
+        return removed
+    
+    @property
+    def record_path(self) -> Path:
+        """Verification record stored alongside the cache database"""
+        return self.cache_dir / "verification_record.json"
+    
+    def export_bundle(self, bundle_path: str, categories: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Write cache entries to a compressed, relocatable bundle
         
-        if cache_type == 'patterns' or cache_type is None:
-            removed += self._clear_directory(self.pattern_cache_dir)
+        Entries are keyed by content hash only, so a bundle made in one
+        checkout can be imported into a cache anywhere else. Verifier
+        results from the incremental record are included as well. Analyzer
+        results are left out: they are pickled, and unpickling data from
+        a bundle could run code.
         
-        if cache_type == 'analysis' or cache_type is None:
-            removed += self._clear_directory(self.analysis_cache_dir)
+        Args:
+            bundle_path: File to write (conventionally *.py2to3cache.gz)
+            categories: Entry categories to include (default: all)
+            
+        Returns:
+            Dict with the number of 'entries' and 'verifier_results' written
+        """
+        categories = list(categories or self.CATEGORIES)
+        placeholders = ", ".join("?" * len(categories))
+        record = self._load_record()
+        # Snapshot the rows, then compress without holding the write lock
+        with self._write():
+            self._flush_accesses()
+            rows = self._conn.execute(
+                f"SELECT kind, fingerprint, category, data FROM entries "
+                f"WHERE category IN ({placeholders}) AND kind NOT LIKE ? ORDER BY rowid",
+                categories + [self.PICKLED_KIND_PREFIX + '%']
+            ).fetchall()
+        header = {
+            'format': BUNDLE_FORMAT,
+            'cache_version': self.CACHE_VERSION,
+            'entries': len(rows),
+            'record_fingerprint': record.fingerprint if record else None,
+        }
+        with gzip.open(bundle_path, 'wb', compresslevel=6) as f:
+            f.write(json.dumps(header).encode('utf-8') + b"\n")
+            for kind, fingerprint, category, data in rows:
+                fields = [kind.encode('utf-8'), fingerprint.encode('ascii'),
+                          category.encode('ascii'), data]
+                f.write(_FRAME.pack(*map(len, fields)))
+                f.writelines(fields)
+            results = json.dumps(record.entries if record else {}).encode('utf-8')
+            f.write(struct.pack(">Q", len(results)))
+            f.write(results)
+        return {'entries': len(rows), 'verifier_results': len(record.entries) if record else 0}
+    
+    def import_bundle(self, bundle_path: str) -> Dict[str, int]:
+        """
+        Merge a bundle made by export_bundle() into this cache
         
-        if cache_type is None:
-            self.metadata['file_hashes'] = {}
-            self.stats = {
-                'hits': 0,
-                'misses': 0,
-                'invalidations': 0,
-                'total_size': 0
-            }
-        
-        self._save_metadata()
-        return removed
+        Entries already present are kept as they are, and pickled analyzer
+        results (which export_bundle() never writes) are skipped, so a
+        tampered bundle cannot make the cache unpickle its data. Verifier
+        results are merged into the local incremental record unless that
+        record was made with different patterns.
+        
+        Args:
+            bundle_path: Bundle file to read
+            
+        Returns:
+            Dict with the numbers of entries 'imported' and 'skipped', and
+            of 'verifier_results' merged
+            
+        Raises:
+            ValueError: If the bundle is damaged or from another cache version
+        """
+        imported = skipped = 0
+        try:
+            with gzip.open(bundle_path, 'rb') as f:
+                header = json.loads(f.readline())
+                if (header.get('format') != BUNDLE_FORMAT
+                        or header.get('cache_version') != self.CACHE_VERSION):
+                    raise ValueError(
+                        f"Bundle is from cache version {header.get('cache_version')}, "
+                        f"this cache is {self.CACHE_VERSION}"
+                    )
+                
+                now = time.time()
+                with self.batch():
+                    rows = []
+                    for index in range(header['entries']):
+                        lengths = _FRAME.unpack(self._read_exact(f, _FRAME.size))
+                        kind, fingerprint, category, data = (
+                            self._read_exact(f, length) for length in lengths
+                        )
+                        kind = kind.decode('utf-8')
+                        if kind.startswith(self.PICKLED_KIND_PREFIX):
+                            skipped += 1
+                        else:
+                            rows.append((kind, fingerprint.decode('ascii'),
+                                         category.decode('ascii'), data, len(data), now, now))
+                        if rows and (len(rows) >= 500 or index == header['entries'] - 1):
+                            added = self._insert_new(rows)
+                            imported += added
+                            skipped += len(rows) - added
+                            rows = []
+                    self._evict()
+                
+                (size,) = struct.unpack(">Q", self._read_exact(f, 8))
+                results = json.loads(self._read_exact(f, size))
+        except (OSError, EOFError, struct.error, UnicodeDecodeError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid cache bundle {bundle_path}: {e}") from e
+        
+        merged = 0
+        fingerprint = header.get('record_fingerprint')
+        if results and fingerprint is not None:
+            record = VerificationRecord(str(self.record_path), fingerprint)
+            if not record.invalidated:
+                merged = record.merge(results)
+                record.save()
+        return {'imported': imported, 'skipped': skipped, 'verifier_results': merged}
     
-    def _clear_directory(self, directory: Path) -> int:
-        """Clear all files in directory"""
-        removed = 0
-        for cache_file in directory.glob("*"):
-            try:
-                cache_file.unlink()
-                removed += 1
-            except Exception:
-                pass
-        return removed
+    @staticmethod
+    def _read_exact(f, size: int) -> bytes:
+        data = f.read(size)
+        if len(data) != size:
+            raise EOFError("truncated bundle")
+        return data
+    
+    def _insert_new(self, rows: List[tuple]) -> int:
+        """Insert entries that are not present yet; return how many were new"""
+        before = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO entries "
+            "(kind, fingerprint, category, data, size, created, accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        return self._conn.total_changes - before
+    
+    def _load_record(self) -> Optional[VerificationRecord]:
+        """Return the verification record stored with the cache, if any"""
+        try:
+            with open(self.record_path, 'r', encoding='utf-8') as f:
+                fingerprint = json.load(f).get('fingerprint', '')
+        except (OSError, ValueError, AttributeError):
+            return None
+        record = VerificationRecord(str(self.record_path), fingerprint)
+        return None if record.invalidated else record
+    
+    def vacuum(self):
+        """Return free pages to the filesystem after large deletions"""
+        with self._lock:
+            if self._batch_depth == 0:
+                self._conn.execute("VACUUM")
     
     def get_statistics(self) -> Dict:
         """
@@ -335,17 +984,15 @@ class CacheManager:
         Returns:
             Dictionary with cache statistics
         """
-        total_entries = sum([
-            len(list(self.ast_cache_dir.glob("*"))),
-            len(list(self.pattern_cache_dir.glob("*"))),
-            len(list(self.analysis_cache_dir.glob("*")))
-        ])
-        
-        total_size = sum([
-            sum(f.stat().st_size for f in self.ast_cache_dir.glob("*")),
-            sum(f.stat().st_size for f in self.pattern_cache_dir.glob("*")),
-            sum(f.stat().st_size for f in self.analysis_cache_dir.glob("*"))
-        ])
+        counts = {category: 0 for category in self.CATEGORIES}
+        total_size = 0
+        with self._lock:
+            for category, count, size in self._conn.execute(
+                "SELECT category, COUNT(*), SUM(size) FROM entries GROUP BY category"
+            ):
+                counts[category] = count
+                total_size += size or 0
+            cached_files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
         
         hit_rate = 0.0
         total_requests = self.stats['hits'] + self.stats['misses']
@@ -353,17 +1000,28 @@ class CacheManager:
             hit_rate = (self.stats['hits'] / total_requests) * 100
         
         return {
-            'total_entries': total_entries,
-            'ast_entries': len(list(self.ast_cache_dir.glob("*"))),
-            'pattern_entries': len(list(self.pattern_cache_dir.glob("*"))),
-            'analysis_entries': len(list(self.analysis_cache_dir.glob("*"))),
+            'total_entries': sum(counts.values()),
+            'ast_entries': counts['ast'],
+            'pattern_entries': counts['patterns'],
+            'analysis_entries': counts['analysis'],
             'total_size_bytes': total_size,
             'total_size_mb': round(total_size / (1024 * 1024), 2),
-            'cached_files': len(self.metadata['file_hashes']),
+            'cached_files': cached_files,
             'hits': self.stats['hits'],
             'misses': self.stats['misses'],
             'hit_rate': round(hit_rate, 2),
             'invalidations': self.stats['invalidations'],
+            'memory_entries': len(self._memory),
+            'memory_size_bytes': self._memory.size_bytes,
+            'memory_hits': self._memory.hits,
+            'memory_misses': self._memory.misses,
+            'memory_evictions': self._memory.evictions,
+            'disk_hits': self.stats['disk_hits'],
+            'disk_misses': self.stats['disk_misses'],
+            'disk_evictions': self.stats['disk_evictions'],
+            'max_bytes': self.max_bytes,
+            'max_size_mb': round(self.max_bytes / (1024 * 1024), 2),
+            'eviction_policy': self.eviction_policy,
             'cache_version': self.CACHE_VERSION
         }
     
@@ -374,7 +1032,7 @@ class CacheManager:
         print("\n" + "="*60)
         print("  CACHE STATISTICS")
         print("="*60)
-        print(f"\nCache Location: {self.cache_dir}")
+        print(f"\nCache Location: {self.db_path}")
         print(f"Cache Version: {stats['cache_version']}")
         print(f"\n📦 Cache Entries:")
         print(f"  Total Entries: {stats['total_entries']}")
@@ -383,12 +1041,20 @@ class CacheManager:
         print(f"  └─ Analysis Cache: {stats['analysis_entries']}")
         print(f"\n💾 Storage:")
         print(f"  Total Size: {stats['total_size_mb']} MB ({stats['total_size_bytes']:,} bytes)")
+        print(f"  Size Limit: {stats['max_size_mb']} MB ({stats['eviction_policy'].upper()} eviction)")
         print(f"  Cached Files: {stats['cached_files']}")
         print(f"\n📊 Performance:")
         print(f"  Cache Hits: {stats['hits']}")
         print(f"  Cache Misses: {stats['misses']}")
         print(f"  Hit Rate: {stats['hit_rate']}%")
         print(f"  Invalidations: {stats['invalidations']}")
+        print(f"\n🧠 Memory Tier ({stats['memory_entries']} entries, "
+              f"{stats['memory_size_bytes']:,} bytes):")
+        print(f"  Hits: {stats['memory_hits']}  Misses: {stats['memory_misses']}  "
+              f"Evictions: {stats['memory_evictions']}")
+        print(f"\n💽 Disk Tier:")
+        print(f"  Hits: {stats['disk_hits']}  Misses: {stats['disk_misses']}  "
+              f"Evictions: {stats['disk_evictions']}")
         print("\n" + "="*60 + "\n")
     
     def list_cached_files(self) -> List[Tuple[str, str]]:
@@ -398,11 +1064,15 @@ class CacheManager:
         Returns:
             List of (filepath, hash) tuples
         """
-        return [(fp, h) for fp, h in self.metadata['file_hashes'].items()]
+        with self._lock:
+            return [
+                (path, file_hash) for path, file_hash in
+                self._conn.execute("SELECT path, hash FROM files ORDER BY rowid")
+            ]
     
     def optimize_cache(self, max_age_days: int = 7) -> int:
         """
-        Remove old cache entries
+        Remove old cache entries, then evict down to the size limit
         
         Args:
             max_age_days: Remove entries older than this many days
@@ -410,19 +1080,21 @@ class CacheManager:
         Returns:
             Number of entries removed
         """
-        removed = 0
         cutoff_time = time.time() - (max_age_days * 24 * 3600)
         
-        for cache_dir in [self.ast_cache_dir, self.pattern_cache_dir, 
-                          self.analysis_cache_dir]:
-            for cache_file in cache_dir.glob("*"):
-                try:
-                    if cache_file.stat().st_mtime < cutoff_time:
-                        cache_file.unlink()
-                        removed += 1
-                except Exception:
-                    pass
+        with self._write():
+            removed = self._conn.execute(
+                "DELETE FROM entries WHERE created < ?", (cutoff_time,)
+            ).rowcount
+            # Forget files that no longer have any entry
+            self._conn.execute(
+                "DELETE FROM files WHERE NOT EXISTS "
+                "(SELECT 1 FROM entries WHERE entries.fingerprint = files.hash)"
+            )
+            removed += self._evict()
         
+        if removed:
+            self.vacuum()
         return removed
 
 
@@ -459,6 +1131,16 @@ def main():
     opt_parser = subparsers.add_parser('optimize', help='Remove old cache entries')
     opt_parser.add_argument('--max-age', type=int, default=7,
                            help='Remove entries older than N days (default: 7)')
+    opt_parser.add_argument('--max-mb', type=float,
+                           help='Save a new cache size limit in MB')
+    opt_parser.add_argument('--policy', choices=CacheManager.EVICTION_POLICIES,
+                           help='Save a new eviction policy')
+    
+    # Bundle commands
+    export_parser = subparsers.add_parser('export', help='Write a relocatable cache bundle')
+    export_parser.add_argument('bundle', help='Bundle file to write')
+    import_parser = subparsers.add_parser('import', help='Merge a cache bundle')
+    import_parser.add_argument('bundle', help='Bundle file to read')
     
     args = parser.parse_args()
     
@@ -496,9 +1178,25 @@ def main():
         print(f"✓ Invalidated {removed} cache entries for {args.filepath}")
     
     elif args.command == 'optimize':
-        removed = cache.optimize_cache(args.max_age)
+        if args.max_mb is not None or args.policy:
+            max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+            removed = cache.set_limits(max_bytes, args.policy)
+        else:
+            removed = 0
+        removed += cache.optimize_cache(args.max_age)
         print(f"✓ Removed {removed} old cache entries")
     
+    elif args.command == 'export':
+        counts = cache.export_bundle(args.bundle)
+        print(f"✓ Exported {counts['entries']} cache entries and "
+              f"{counts['verifier_results']} verifier results")
+    
+    elif args.command == 'import':
+        counts = cache.import_bundle(args.bundle)
+        print(f"✓ Imported {counts['imported']} cache entries "
+              f"({counts['skipped']} already present) and "
+              f"{counts['verifier_results']} verifier results")
+    
     else:
         parser.print_help()
 
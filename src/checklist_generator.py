@@ -15,6 +15,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Tuple, Optional
 
+from parsed_file import ParsedFile
+
 
 class ChecklistGenerator:
     """Generate personalized migration checklists."""
@@ -51,14 +53,15 @@ class ChecklistGenerator:
         """Analyze a single Python file.
         
         Args:
-            file_path: Path to the file
+            file_path: Path to the file, or a shared ParsedFile
             
         Returns:
             dict: File analysis data
         """
+        parsed = ParsedFile.coerce(file_path)
+        file_path = Path(parsed.path)
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            content = parsed.text
         except Exception as e:
             return {'error': str(e), 'issues': [], 'complexity': 0}
         
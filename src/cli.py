@@ -73,8 +73,47 @@ def validate_path(path):
     return path
 
 
+def command_check_ndjson(args):
+    """Stream one JSON record per verified file, then a summary record."""
+    import contextlib
+    from verifier import Python3CompatibilityVerifier
+    
+    # Keep results for the report only when one was asked for
+    verifier = Python3CompatibilityVerifier(verbose=False, record=getattr(args, 'incremental', False) or None)
+    files = issues = incompatible = 0
+    
+    for record in verifier.iter_results(args.path, keep=bool(args.report)):
+        files += 1
+        issues += len(record['issues'])
+        incompatible += not record['compatible']
+        sys.stdout.write(json.dumps({'type': 'file', **record}) + '\n')
+        sys.stdout.flush()
+    
+    sys.stdout.write(json.dumps({
+        'type': 'summary',
+        'files': files,
+        'issues': issues,
+        'incompatible_files': incompatible,
+    }) + '\n')
+    sys.stdout.flush()
+    
+    if args.report:
+        # Keep stdout pure NDJSON
+        with contextlib.redirect_stdout(sys.stderr):
+            verifier.save_report(args.report)
+    
+    return 0 if not issues else 1
+
+
 def command_check(args):
     """Run the verifier to check Python 3 compatibility."""
+    if getattr(args, 'format', 'text') == 'ndjson':
+        if not os.path.exists(args.path):
+            print_error(f"Path does not exist: {args.path}")
+            return 1
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        return command_check_ndjson(args)
+    
     print_header("Python 3 Compatibility Check")
     
     validate_path(args.path)
@@ -87,14 +126,21 @@ def command_check(args):
         sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
         from verifier import Python3CompatibilityVerifier
         
-        verifier = Python3CompatibilityVerifier()
+        verifier = Python3CompatibilityVerifier(record=getattr(args, 'incremental', False) or None)
         if os.path.isdir(args.path):
             verifier.verify_directory(args.path)
         else:
             verifier.verify_file(args.path)
+            verifier.save_record()
         
         issues = verifier.issues_found
         
+        if verifier.record is not None:
+            record = verifier.record
+            if record.invalidated:
+                print_info("Patterns changed since the last run; re-verifying every file")
+            print_info(f"Incremental: {record.hits} file(s) unchanged, {record.misses} verified")
+        
         # Print summary
         if issues:
             print_warning(f"Found {len(issues)} compatibility issue(s)")
@@ -119,7 +165,7 @@ def command_check(args):
         
         # Save report if requested
         if args.report:
-            verifier.save_report(args.report, issues)
+            verifier.save_report(args.report)
             print_success(f"Report saved to: {args.report}")
         
         return 0 if not issues else 1
@@ -743,7 +789,7 @@ def command_stats(args):
             if args.format != 'json':
                 print_info(f"Collecting statistics for: {args.path or 'current directory'}\n")
             
-            stats = tracker.collect_stats(args.path)
+            stats = tracker.collect_stats(args.path, backend=args.backend)
             
             # Get previous snapshot for comparison if it exists
             previous = tracker.get_latest_snapshot()
@@ -900,8 +946,18 @@ def command_report(args):
             validate_path(args.scan_path)
             print_info(f"Scanning {args.scan_path} for migration data...")
             
-            # This would ideally load existing fix/verification data
-            # For now, we'll generate a basic report
+            # Verification issues go straight from the verifier's issue store
+            # into the report; fix data is not recorded between runs yet
+            if args.include_issues:
+                from verifier import Python3CompatibilityVerifier
+                
+                verifier = Python3CompatibilityVerifier()
+                if os.path.isdir(args.scan_path):
+                    verifier.verify_directory(args.scan_path)
+                else:
+                    verifier.verify_file(args.scan_path)
+                generator.set_files_processed(verifier.files_checked)
+                generator.add_issues(verifier.issues_found)
         
         # Generate the report
         report_path = generator.generate_html_report(args.output)
@@ -2810,16 +2866,28 @@ def command_status(args):
         
         reporter = MigrationStatusReporter(path, stats_dir)
         
+        # With --live the issue counts come from checking the files now
+        issues = None
+        if getattr(args, 'live', False):
+            from verifier import Python3CompatibilityVerifier
+            verifier = Python3CompatibilityVerifier(verbose=False)
+            if os.path.isdir(path):
+                verifier.verify_directory(path)
+            else:
+                verifier.verify_file(path)
+            issues = verifier.issues_found
+        report = reporter.generate_status_report(issues=issues)
+        
         if args.json:
             # Export as JSON
-            output = reporter.export_json(args.output if hasattr(args, 'output') else None)
+            output = reporter.export_json(args.output if hasattr(args, 'output') else None, report=report)
             if hasattr(args, 'output') and args.output:
                 print_success(f"Status report exported to: {args.output}")
             else:
                 print(output)
         else:
             # Print colorful terminal report
-            reporter.print_status(color=not args.no_color)
+            reporter.print_status(report=report, color=not args.no_color)
         
         return 0
         
@@ -6633,12 +6701,69 @@ def command_cache(args):
         return 0
     
     elif args.cache_action == 'optimize':
+        max_mb = getattr(args, 'max_mb', None)
+        policy = getattr(args, 'policy', None)
+        evicted = 0
+        if max_mb is not None or policy:
+            evicted = cache.set_limits(int(max_mb * 1024 * 1024) if max_mb is not None else None, policy)
+            print_info(f"Cache limit: {cache.max_bytes / (1024 * 1024):.1f} MB "
+                       f"({cache.eviction_policy.upper()} eviction)")
         print_info(f"Removing cache entries older than {args.max_age} days...")
-        removed = cache.optimize_cache(args.max_age)
+        removed = evicted + cache.optimize_cache(args.max_age)
         print_success(f"Removed {removed} old cache entries")
         
         return 0
     
+    elif args.cache_action == 'export':
+        types = None if args.type == 'all' else [args.type]
+        print_info(f"Exporting {args.type} cache entries to {args.bundle}...")
+        counts = cache.export_bundle(args.bundle, types)
+        size_kb = os.path.getsize(args.bundle) / 1024
+        print_success(f"Exported {counts['entries']} cache entries and "
+                      f"{counts['verifier_results']} verifier results ({size_kb:.1f} KB)")
+        
+        return 0
+    
+    elif args.cache_action == 'import':
+        validate_path(args.bundle)
+        print_info(f"Importing cache bundle {args.bundle}...")
+        try:
+            counts = cache.import_bundle(args.bundle)
+        except ValueError as e:
+            print_error(str(e))
+            return 1
+        print_success(f"Imported {counts['imported']} cache entries "
+                      f"({counts['skipped']} already present) and "
+                      f"{counts['verifier_results']} verifier results")
+        
+        return 0
+    
+    elif args.cache_action == 'benchmark':
+        from ast_table import benchmark_ast_cache
+        
+        print_header("AST Cache Benchmark")
+        validate_path(args.path)
+        target = Path(args.path)
+        files = [str(target)] if target.is_file() else sorted(str(p) for p in target.rglob('*.py'))
+        print_info(f"Timing {len(files)} files ({args.repeat} runs each)...")
+        results = benchmark_ast_cache(files, repeat=args.repeat)
+        
+        if args.json:
+            print(json.dumps(results, indent=2))
+            return 0
+        
+        print(f"\n{Colors.BOLD}{'Bucket':<9}{'Files':>6}{'Parse':>10}{'Unpickle':>10}"
+              f"{'Table':>10}{'Build':>10}{'Speedup':>9}{Colors.ENDC}")
+        for row in results:
+            speedup = row['parse_ms'] / row['table_ms'] if row['table_ms'] else 0
+            print(f"{row['bucket']:<9}{row['files']:>6}{row['parse_ms']:>8.2f}ms"
+                  f"{row['unpickle_ms']:>8.2f}ms{row['table_ms']:>8.2f}ms"
+                  f"{row['build_ms']:>8.2f}ms{speedup:>8.1f}x")
+        print()
+        print_info("Table: load the cached AstTable; Build: load it and rebuild the full tree")
+        
+        return 0
+    
     return 1
 
 
@@ -7127,6 +7252,25 @@ def command_parallel(args):
     try:
         sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
         from parallel_runner import ParallelMigrationRunner, collect_python_files
+        from cache_manager import CacheManager
+        
+        cache_dir = None if getattr(args, 'no_cache', False) else CacheManager.DEFAULT_CACHE_DIR
+        memory_budget = (None if getattr(args, 'memory_budget', None) is None
+                         else args.memory_budget * 1024 * 1024)
+        if args.operation == 'worker' or getattr(args, 'listen', None):
+            from distributed_runner import (DistributedMigrationRunner, WorkerNode,
+                                            parse_address, read_secret)
+            try:
+                secret = read_secret(getattr(args, 'secret', None))
+                address = parse_address(args.path if args.operation == 'worker' else args.listen)
+            except ValueError as e:
+                print_error(str(e))
+                return 1
+        
+        if args.operation == 'worker':
+            node = WorkerNode(address, secret, workers=args.workers, memory_budget=memory_budget)
+            node.run()
+            return 0
         
         # Collect files to process
         if os.path.isfile(args.path):
@@ -7146,10 +7290,25 @@ def command_parallel(args):
         print()
         
         # Create runner
-        runner = ParallelMigrationRunner(
-            workers=args.workers,
-            verbose=args.verbose if hasattr(args, 'verbose') else False
-        )
+        if getattr(args, 'listen', None):
+            runner = DistributedMigrationRunner(
+                address, secret,
+                workers=args.workers,
+                verbose=args.verbose if hasattr(args, 'verbose') else False,
+                cache_dir=cache_dir,
+                chunk_size=getattr(args, 'chunk_size', None),
+                timeout=getattr(args, 'timeout', 60.0)
+            )
+        else:
+            runner = ParallelMigrationRunner(
+                workers=args.workers,
+                verbose=args.verbose if hasattr(args, 'verbose') else False,
+                cache_dir=cache_dir,
+                chunk_size=getattr(args, 'chunk_size', None),
+                backend=getattr(args, 'backend', 'auto'),
+                timeout=getattr(args, 'timeout', 60.0),
+                memory_budget=memory_budget
+            )
         
         # Execute operation
         if args.operation == 'check':
@@ -7444,6 +7603,12 @@ def main():
         help='Enable verbose output'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not reuse or store per-file analyzer results in .py2to3_cache'
+    )
+    
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Wizard command (featured first as it's the beginner-friendly entry point)
@@ -7467,6 +7632,12 @@ def main():
     )
     parser_check.add_argument('path', help='File or directory to check')
     parser_check.add_argument('-r', '--report', help='Save report to file')
+    parser_check.add_argument('-f', '--format', choices=['text', 'ndjson'], default='text',
+                             help='Output format; ndjson writes one JSON record per file as it '
+                                  'is checked, then a summary record (default: text)')
+    parser_check.add_argument('--incremental', action='store_true',
+                             help='Reuse results for files whose content is unchanged since an earlier '
+                                  '--incremental run (stored in .py2to3_cache/)')
     
     # Version-check command
     parser_version_check = subparsers.add_parser(
@@ -7568,6 +7739,9 @@ def main():
     parser_stats_collect.add_argument('--no-compare', action='store_true', help='Do not compare with previous snapshot')
     parser_stats_collect.add_argument('-f', '--format', choices=['text', 'json'], default='text', help='Output format (default: text)')
     parser_stats_collect.add_argument('-o', '--output', help='Output file for statistics (required for JSON format)')
+    parser_stats_collect.add_argument('--backend', choices=['auto', 'serial', 'threads', 'processes'],
+                                      default='auto',
+                                      help='Check files serially, on threads or on processes (default: auto)')
     
     # Stats show
     parser_stats_show = stats_subparsers.add_parser('show', help='Show latest statistics snapshot')
@@ -7917,10 +8091,12 @@ def main():
         help='🚀 Run migration operations in parallel for faster processing',
         description='Speed up large migrations by processing multiple files concurrently'
     )
-    parser_parallel.add_argument('operation', choices=['check', 'fix'],
-                                help='Operation to perform in parallel')
+    parser_parallel.add_argument('operation', choices=['check', 'fix', 'worker'],
+                                help='Operation to perform in parallel, or worker to run the tasks '
+                                     'of a coordinator on this host')
     parser_parallel.add_argument('path',
-                                help='File or directory to process')
+                                help='File or directory to process (for worker: the coordinator\'s '
+                                     'HOST:PORT)')
     parser_parallel.add_argument('-w', '--workers', type=int,
                                 help='Number of worker processes (default: CPU count)')
     parser_parallel.add_argument('-r', '--recursive', action='store_true', default=True,
@@ -7931,6 +8107,24 @@ def main():
                                 help='Create backups before fixing (for fix operation)')
     parser_parallel.add_argument('--dry-run', action='store_true', default=False,
                                 help='Preview changes without applying them (for fix operation)')
+    parser_parallel.add_argument('--chunk-size', type=int,
+                                help='Files per worker task (default: adaptive, about 4 tasks per worker)')
+    parser_parallel.add_argument('--backend', choices=['auto', 'serial', 'threads', 'processes'],
+                                default='auto',
+                                help='Run serially, on threads or on processes (default: auto, '
+                                     'picked from the amount of work)')
+    parser_parallel.add_argument('--timeout', type=float, default=60.0,
+                                help='Seconds allowed per file; slower files are quarantined and '
+                                     'their worker replaced (default: 60, 0: no limit)')
+    parser_parallel.add_argument('--memory-budget', type=int, metavar='MB',
+                                help='Memory the worker processes may use together '
+                                     '(default: 75%% of available memory, 0: no budget)')
+    parser_parallel.add_argument('--listen', metavar='HOST:PORT',
+                                help='Coordinate the run: hand the files out to worker nodes '
+                                     'connecting to this address')
+    parser_parallel.add_argument('--secret',
+                                help='Secret shared by the coordinator and its worker nodes '
+                                     '(default: $PY2TO3_CLUSTER_SECRET)')
     parser_parallel.add_argument('-j', '--json', metavar='FILE',
                                 help='Export results as JSON to specified file')
     parser_parallel.set_defaults(func=command_parallel)
@@ -7982,6 +8176,8 @@ def main():
                               help='Output in JSON format')
     parser_status.add_argument('-o', '--output',
                               help='Export JSON report to file (requires --json)')
+    parser_status.add_argument('--live', action='store_true',
+                              help='Check the files now instead of reading the latest stats snapshot')
     
     # Search command
     parser_search = subparsers.add_parser(
@@ -9445,6 +9641,60 @@ def main():
         default=7,
         help='Remove entries older than N days (default: 7)'
     )
+    parser_cache_optimize.add_argument(
+        '--max-mb',
+        type=float,
+        help='Save a new cache size limit in MB; least used entries are evicted beyond it'
+    )
+    parser_cache_optimize.add_argument(
+        '--policy',
+        choices=['lru', 'lfu'],
+        help='Save a new eviction policy (least recently / least frequently used)'
+    )
+    
+    parser_cache_export = cache_subparsers.add_parser(
+        'export',
+        help='Pack cache entries into a relocatable bundle (e.g. to warm-start CI)'
+    )
+    parser_cache_export.add_argument(
+        'bundle',
+        help='Bundle file to write (e.g. cache.py2to3cache.gz)'
+    )
+    parser_cache_export.add_argument(
+        '--type',
+        choices=['ast', 'patterns', 'analysis', 'all'],
+        default='all',
+        help='Type of cache to export (default: all)'
+    )
+    
+    parser_cache_import = cache_subparsers.add_parser(
+        'import',
+        help='Merge a bundle made by "cache export" into the cache'
+    )
+    parser_cache_import.add_argument(
+        'bundle',
+        help='Bundle file to read'
+    )
+    
+    parser_cache_benchmark = cache_subparsers.add_parser(
+        'benchmark',
+        help='Time loading cached ASTs against parsing, per file-size bucket'
+    )
+    parser_cache_benchmark.add_argument(
+        'path',
+        help='Python file or directory to measure'
+    )
+    parser_cache_benchmark.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Timing runs per file; the fastest is used (default: 3)'
+    )
+    parser_cache_benchmark.add_argument(
+        '--json',
+        action='store_true',
+        help='Output as JSON'
+    )
     
     parser_cache.set_defaults(func=command_cache)
     
@@ -9816,6 +10066,14 @@ def main():
             # If config loading fails, continue with defaults
             pass
     
+    # Analyzers reuse per-file results for unchanged files (opened on first use),
+    # and file listings are shared with later commands over the same tree
+    if not args.no_cache:
+        from analysis_cache import enable_analysis_cache
+        from project_index import enable_index_persistence
+        enable_analysis_cache()
+        enable_index_persistence()
+    
     # Route to appropriate command handler
     if args.command == 'wizard':
         return command_wizard(args)
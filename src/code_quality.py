@@ -12,6 +12,9 @@ import re
 from collections import defaultdict
 from pathlib import Path
 
+from analysis_cache import cached_analysis
+from parsed_file import ParsedFile
+
 
 class CodeQualityAnalyzer:
     """Analyze code quality and complexity metrics for Python files."""
@@ -21,23 +24,29 @@ class CodeQualityAnalyzer:
         self.metrics = {}
         self.summary = {}
         
+    @cached_analysis(version="1")
     def analyze_file(self, file_path):
         """Analyze a single Python file.
         
         Args:
-            file_path: Path to Python file
+            file_path: Path to Python file, or a shared ParsedFile
             
         Returns:
             dict: File metrics
         """
+        if isinstance(file_path, ParsedFile):
+            parsed, file_path = file_path, file_path.path
+        else:
+            parsed = ParsedFile.coerce(file_path)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = parsed.text
             
             # Parse AST
-            try:
-                tree = ast.parse(content)
-            except SyntaxError as e:
+            tree = parsed.tree
+            if tree is None:
+                e = parsed.syntax_error
+                if not isinstance(e, SyntaxError):
+                    raise e
                 return {
                     'error': f'Syntax error: {e}',
                     'loc': 0,
@@ -100,12 +109,28 @@ class CodeQualityAnalyzer:
                 if file.endswith('.py'):
                     python_files.append(os.path.join(root, file))
         
-        # Analyze each file
-        file_metrics = []
-        for file_path in python_files:
-            metrics = self.analyze_file(file_path)
-            if 'error' not in metrics:
-                file_metrics.append(metrics)
+        # Analyze each file, in parallel if worth it
+        from parallel_runner import run_analyzer
+        return run_analyzer(self, python_files)['result']
+    
+    def map_file(self, file_path):
+        """Analyze one file of a parallel run (see parallel_runner.run_analyzer).
+        
+        Returns:
+            dict: File metrics
+        """
+        return self.analyze_file(file_path)
+    
+    def reduce_files(self, results):
+        """Summarize the metrics of a parallel run's files.
+        
+        Args:
+            results: (path, metrics) pairs, in file order
+            
+        Returns:
+            dict: Directory metrics
+        """
+        file_metrics = [metrics for _, metrics in results if 'error' not in metrics]
         
         # Calculate summary statistics
         self.metrics = file_metrics
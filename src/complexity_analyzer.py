@@ -23,6 +23,9 @@ from datetime import datetime
 from collections import defaultdict
 from typing import Dict, List, Tuple, Optional
 
+from analysis_cache import cached_analysis
+from parsed_file import ParsedFile
+
 
 class ComplexityVisitor(ast.NodeVisitor):
     """AST visitor to calculate code complexity metrics."""
@@ -119,12 +122,16 @@ class ComplexityAnalyzer:
     def __init__(self, backup_dir: Optional[str] = None):
         self.backup_dir = backup_dir
         self.results = {}
+        # (directory, compare_backups) of the analyze_directory() run, which
+        # map_file reads on the workers
+        self._run_settings = ('.', False)
         
-    def analyze_file(self, filepath: str) -> Dict:
-        """Analyze a single Python file and return complexity metrics."""
+    @cached_analysis(version="1")
+    def analyze_file(self, filepath) -> Dict:
+        """Analyze a single Python file (path or ParsedFile) and return complexity metrics."""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            parsed = ParsedFile.coerce(filepath)
+            content = parsed.text
             
             # Calculate basic metrics
             lines = content.split('\n')
@@ -135,7 +142,9 @@ class ComplexityAnalyzer:
             
             # Parse AST and calculate complexity
             try:
-                tree = ast.parse(content)
+                tree = parsed.tree
+                if tree is None:
+                    raise parsed.syntax_error
                 visitor = ComplexityVisitor()
                 visitor.visit(tree)
                 
@@ -259,59 +268,29 @@ class ComplexityAnalyzer:
         }
     
     def analyze_directory(self, directory: str, compare_backups: bool = False) -> Dict:
-        """Analyze all Python files in a directory."""
-        results = {
-            'timestamp': datetime.now().isoformat(),
-            'directory': directory,
-            'files': {},
-            'summary': {
-                'total_files': 0,
-                'analyzed': 0,
-                'errors': 0,
-                'syntax_errors': 0
-            }
-        }
-        
+        """Analyze all Python files in a directory (in parallel, if worth it)."""
         # Find all Python files
+        python_files = []
         for root, dirs, files in os.walk(directory):
             # Skip common directories
             dirs[:] = [d for d in dirs if d not in ['.git', '__pycache__', 'venv', '.venv', 'node_modules']]
             
             for file in files:
                 if file.endswith('.py'):
-                    filepath = os.path.join(root, file)
-                    rel_path = os.path.relpath(filepath, directory)
-                    
-                    results['summary']['total_files'] += 1
-                    
-                    if compare_backups and self.backup_dir:
-                        # Try to find backup file
-                        backup_path = os.path.join(self.backup_dir, rel_path)
-                        if os.path.exists(backup_path):
-                            result = self.compare_with_backup(filepath, backup_path)
-                        else:
-                            result = {
-                                'filepath': filepath,
-                                'current': self.analyze_file(filepath),
-                                'comparison': 'no_backup'
-                            }
-                    else:
-                        result = {
-                            'filepath': filepath,
-                            'current': self.analyze_file(filepath),
-                            'comparison': 'no_comparison'
-                        }
-                    
-                    results['files'][rel_path] = result
-                    
-                    # Update summary
-                    current = result.get('current', {})
-                    if current.get('status') == 'success':
-                        results['summary']['analyzed'] += 1
-                    elif current.get('status') == 'syntax_error':
-                        results['summary']['syntax_errors'] += 1
-                    else:
-                        results['summary']['errors'] += 1
+                    python_files.append(os.path.join(root, file))
+        
+        from parallel_runner import run_analyzer
+        self._run_settings = (directory, compare_backups)
+        summary = run_analyzer(self, python_files)
+        results = summary['result']
+        for failed in summary['results']:
+            if not failed['success']:
+                # Crashed or timed out on a worker
+                self._add_result(results, os.path.relpath(failed['file'], directory), {
+                    'filepath': failed['file'],
+                    'current': {'status': 'error', 'error': failed['error']},
+                    'comparison': 'no_comparison'
+                })
         
         # Calculate aggregate metrics
         if compare_backups:
@@ -321,6 +300,56 @@ class ComplexityAnalyzer:
         
         return results
     
+    def map_file(self, filepath: str) -> Dict:
+        """Analyze one file of a parallel run (see parallel_runner.run_analyzer)."""
+        directory, compare_backups = self._run_settings
+        if compare_backups and self.backup_dir:
+            # Try to find backup file
+            backup_path = os.path.join(self.backup_dir, os.path.relpath(filepath, directory))
+            if os.path.exists(backup_path):
+                return self.compare_with_backup(filepath, backup_path)
+            return {
+                'filepath': filepath,
+                'current': self.analyze_file(filepath),
+                'comparison': 'no_backup'
+            }
+        return {
+            'filepath': filepath,
+            'current': self.analyze_file(filepath),
+            'comparison': 'no_comparison'
+        }
+    
+    def reduce_files(self, results: List[Tuple[str, Dict]]) -> Dict:
+        """Collect the results of a parallel run's files, in file order."""
+        directory, _ = self._run_settings
+        merged = {
+            'timestamp': datetime.now().isoformat(),
+            'directory': directory,
+            'files': {},
+            'summary': {
+                'total_files': 0,
+                'analyzed': 0,
+                'errors': 0,
+                'syntax_errors': 0
+            }
+        }
+        for filepath, result in results:
+            self._add_result(merged, os.path.relpath(filepath, directory), result)
+        return merged
+    
+    @staticmethod
+    def _add_result(results: Dict, rel_path: str, result: Dict):
+        """Add one file's result to a directory's results and counts."""
+        results['files'][rel_path] = result
+        results['summary']['total_files'] += 1
+        current = result.get('current', {})
+        if current.get('status') == 'success':
+            results['summary']['analyzed'] += 1
+        elif current.get('status') == 'syntax_error':
+            results['summary']['syntax_errors'] += 1
+        else:
+            results['summary']['errors'] += 1
+    
     def _calculate_basic_summary(self, results: Dict):
         """Calculate summary statistics for basic analysis."""
         metrics = defaultdict(list)
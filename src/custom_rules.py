@@ -14,6 +14,8 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+from literal_prefilter import required_literals
+
 
 class CustomRule:
     """Represents a single custom migration rule."""
@@ -90,6 +92,11 @@ class CustomRule:
             else:
                 pattern = self.pattern
             
+            # Skip the substitution when the pattern's required literal is absent
+            required = required_literals(pattern, flags)
+            if required is not None and not any(literal in content for literal in required):
+                return content, 0
+            
             try:
                 content = re.sub(pattern, self.replacement, content, flags=flags)
             except re.error as e:
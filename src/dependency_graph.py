@@ -18,6 +18,9 @@ from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
+from parsed_file import ParsedFile
+from project_index import list_files
+
 
 class DependencyGraphGenerator:
     """Generates visual dependency graphs for Python codebases."""
@@ -39,18 +42,11 @@ class DependencyGraphGenerator:
         print("📊 Analyzing codebase structure...")
         
         # Find all Python files
-        python_files = []
-        for root, dirs, files in os.walk(self.root_path):
-            # Skip common non-code directories
-            dirs[:] = [d for d in dirs if d not in {
-                '__pycache__', '.git', '.tox', 'venv', 'env',
-                '.venv', 'node_modules', 'dist', 'build', '.pytest_cache'
-            }]
-            
-            for file in files:
-                if file.endswith('.py'):
-                    file_path = Path(root) / file
-                    python_files.append(file_path)
+        # Skip common non-code directories
+        python_files = [Path(path) for path in list_files(self.root_path, exclude={
+            '__pycache__', '.git', '.tox', 'venv', 'env',
+            '.venv', 'node_modules', 'dist', 'build', '.pytest_cache'
+        })]
         
         print(f"  Found {len(python_files)} Python files")
         
@@ -66,16 +62,19 @@ class DependencyGraphGenerator:
         if self.circular_deps:
             print(f"  ⚠️  Detected {len(self.circular_deps)} circular dependency chain(s)")
     
-    def _analyze_file(self, file_path: Path):
-        """Analyze a single Python file."""
+    def _analyze_file(self, file_path):
+        """Analyze a single Python file (Path or ParsedFile)."""
+        parsed = ParsedFile.coerce(file_path)
+        file_path = Path(parsed.path)
         module_name = self._get_module_name(file_path)
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            content = parsed.text
             
             # Parse the AST
-            tree = ast.parse(content, filename=str(file_path))
+            tree = parsed.tree
+            if tree is None:
+                raise parsed.syntax_error
             
             # Count lines of code (excluding blanks and comments)
             lines = [l.strip() for l in content.split('\n')]
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Distributed Migration Runner
+
+Spreads a parallel check or fix over several hosts. A coordinator
+(DistributedMigrationRunner) schedules the files into tasks, longest first,
+exactly as ParallelMigrationRunner does, and hands them out to worker nodes
+(WorkerNode) that connect to it over TCP. Each node runs its tasks on its
+own process pool, with the usual per-file timeouts and memory budget, and
+streams the results back; the coordinator merges them into one summary.
+
+A node asks for as many tasks as it has idle workers, so fast hosts take
+more of the work. When a node's connection drops, or the node stops
+answering, the items it had not reported yet are queued again for the
+other nodes.
+
+Messages are pickled, so the connection is authenticated with a secret
+shared by the coordinator and its nodes; only run them on a trusted
+network. Nodes open the files by the paths the coordinator sends, so every
+host needs the tree at the same path (a shared file system or identical
+checkouts).
+
+Usage:
+    ./py2to3 parallel check src/ --listen 0.0.0.0:7070 --secret S
+    ./py2to3 parallel worker coordinator-host:7070 --secret S    (on each host)
+"""
+
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import AuthenticationError, Client, Listener, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from parallel_runner import ParallelMigrationRunner, _MemoryGovernor, _WorkerPool
+
+# Environment variable read for the shared secret when none is given
+SECRET_ENV = "PY2TO3_CLUSTER_SECRET"
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Parse a HOST:PORT address (HOST may be empty for every interface)."""
+    host, sep, port = address.rpartition(':')
+    if not sep or not port.isdigit():
+        raise ValueError(f"Expected HOST:PORT, got: {address}")
+    return host or '0.0.0.0', int(port)
+
+
+class _Node:
+    """A worker node as seen by the coordinator."""
+
+    def __init__(self, index: int, conn, host: str, workers: int):
+        self.index = index
+        self.conn = conn
+        self.host = host
+        self.workers = workers
+        # Items handed to the node and not reported yet, per task
+        self.assigned: List[List[Any]] = []
+        self.last_seen = time.time()
+        self.tasks = 0
+        self.files = 0
+        self.lost: Optional[str] = None
+
+    def complete(self, items: List[Any]):
+        """Forget items the node reported."""
+        for item in items:
+            for task in self.assigned:
+                if item in task:
+                    task.remove(item)
+                    break
+        self.assigned = [task for task in self.assigned if task]
+        self.files += len(items)
+
+
+class DistributedMigrationRunner(ParallelMigrationRunner):
+    """Coordinates a parallel check or fix run across worker nodes."""
+
+    # A node that sent nothing for this long is considered lost (nodes
+    # check in several times a second, even while busy)
+    NODE_TIMEOUT = 30.0
+    # Without any node connected for this long, the run gives up
+    CONNECT_TIMEOUT = 300.0
+
+    def __init__(self, address: Tuple[str, int], secret: bytes,
+                 workers: Optional[int] = None, verbose: bool = False,
+                 cache_dir: Optional[str] = None, chunk_size: Optional[int] = None,
+                 quiet: bool = False, timeout: Optional[float] = ParallelMigrationRunner.DEFAULT_TIMEOUT,
+                 connect_timeout: float = CONNECT_TIMEOUT):
+        """
+        Initialize the coordinator and start listening for worker nodes.
+
+        Args:
+            address: (host, port) to listen on; port 0 picks a free port
+                (see self.address)
+            secret: Secret the worker nodes authenticate with
+            workers: Workers expected across all nodes, which the tasks are
+                sized for (default: this machine's CPU count)
+            cache_dir: Cache directory of the coordinator; check results for
+                unchanged files are answered from its verification record
+                before any task is sent, and per-file durations recorded in
+                it drive scheduling
+            timeout: Seconds allowed per file on the nodes (None or 0 for
+                no limit)
+            connect_timeout: Seconds a run waits while no node is connected
+                before failing the files left
+        """
+        super().__init__(workers=workers, verbose=verbose, cache_dir=cache_dir,
+                         chunk_size=chunk_size, backend='processes', quiet=quiet,
+                         timeout=timeout)
+        self.connect_timeout = connect_timeout
+        self._listener = Listener(address, authkey=secret)
+        self.address: Tuple[str, int] = self._listener.address
+        self._incoming: "queue.Queue" = queue.Queue()
+        self._nodes: List[_Node] = []
+        self._requeued = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        """Queue connections from worker nodes until the listener closes."""
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (AuthenticationError, EOFError, ConnectionError):
+                # Wrong secret, or the peer gave up during the handshake
+                continue
+            except OSError:
+                return
+            self._incoming.put(conn)
+
+    def close(self):
+        """Stop listening for worker nodes."""
+        self._listener.close()
+
+    def _plan(self, operation: str, file_paths: List[str]) -> Tuple[str, List[List[Any]]]:
+        """Return the tasks to hand out to the nodes, longest first."""
+        history = self._load_history(operation, file_paths)
+        costs = self.estimate_costs(file_paths, history)
+        return 'distributed', self.schedule(file_paths, operation, history, costs)
+
+    def _describe(self, backend: str) -> str:
+        host, port = self.address
+        return f"worker nodes connecting to {host}:{port}"
+
+    def _worker_count(self, backend: str) -> int:
+        return sum(node.workers for node in self._nodes)
+
+    def _join(self, conn, operation: str, options: Dict[str, Any]) -> Optional[_Node]:
+        """Greet a newly connected node, or drop it if it does not say hello."""
+        try:
+            if not conn.poll(5):
+                raise EOFError
+            kind, host, workers = conn.recv()
+            conn.send(('setup', operation, options, self.timeout))
+        except (EOFError, OSError, ValueError, TypeError):
+            conn.close()
+            return None
+        self._log(f"  🖧  {host} joined with {workers} workers")
+        return _Node(len(self._nodes), conn, host, workers)
+
+    def _lose(self, node: _Node, reason: str, tasks: deque):
+        """Drop a node and queue the items it had not reported again."""
+        node.lost = reason
+        node.conn.close()
+        self._log(f"  ⚠️  {node.host} lost ({reason}); requeuing "
+                  f"{sum(len(task) for task in node.assigned)} items")
+        # They were among the longest, so they go first
+        for task in reversed(node.assigned):
+            tasks.appendleft(task)
+            self._requeued += len(task)
+        node.assigned = []
+
+    def _run_chunks(self, operation: str, tasks: List[List[Any]], options: Dict[str, Any],
+                    backend: str = 'distributed'):
+        """Hand tasks out to the nodes, yielding (task, outcome) as results arrive.
+
+        A yielded task is the part of a task a node reported on: the whole
+        task, or a single item its own pool lost a worker on.
+        """
+        tasks = deque(list(task) for task in tasks)
+        self._nodes = []
+        self._requeued = 0
+        connected: Dict[Any, _Node] = {}
+        remaining = sum(len(task) for task in tasks)
+        alone_since = time.time()
+        try:
+            while remaining:
+                while True:
+                    try:
+                        conn = self._incoming.get_nowait()
+                    except queue.Empty:
+                        break
+                    node = self._join(conn, operation, options)
+                    if node is not None:
+                        self._nodes.append(node)
+                        connected[node.conn] = node
+
+                if not connected:
+                    if time.time() - alone_since > self.connect_timeout:
+                        error = RuntimeError(f"no worker node connected for "
+                                             f"{self.connect_timeout:g}s")
+                        while tasks:
+                            yield tasks.popleft(), error
+                        return
+                    time.sleep(0.05)
+                    continue
+
+                for conn in wait(list(connected), 0.25):
+                    node = connected[conn]
+                    try:
+                        message = conn.recv()
+                    except (EOFError, OSError):
+                        del connected[conn]
+                        self._lose(node, "connection lost", tasks)
+                        continue
+                    node.last_seen = time.time()
+                    if message[0] == 'more':
+                        batch = [tasks.popleft() for _ in range(min(message[1], len(tasks)))]
+                        node.assigned.extend(list(task) for task in batch)
+                        node.tasks += len(batch)
+                        try:
+                            conn.send(('tasks', batch))
+                        except OSError:
+                            del connected[conn]
+                            self._lose(node, "connection lost", tasks)
+                    elif message[0] == 'result':
+                        chunk, outcome = message[1], message[2]
+                        node.complete(chunk)
+                        remaining -= len(chunk)
+                        if isinstance(outcome, dict):
+                            outcome['worker'] = (node.index, outcome['worker'])
+                            # On the coordinator's clock, which the run is timed by
+                            outcome['finished'] = time.time()
+                        yield chunk, outcome
+
+                now = time.time()
+                for conn, node in list(connected.items()):
+                    if now - node.last_seen > self.NODE_TIMEOUT:
+                        del connected[conn]
+                        self._lose(node, f"silent for {self.NODE_TIMEOUT:g}s", tasks)
+                if connected:
+                    alone_since = now
+        finally:
+            for conn in connected:
+                try:
+                    conn.send(('done',))
+                except OSError:
+                    pass
+                conn.close()
+
+    def _summarize_nodes(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        summary['nodes'] = [{'host': node.host, 'workers': node.workers, 'tasks': node.tasks,
+                             'files': node.files, 'lost': node.lost} for node in self._nodes]
+        summary['requeued'] = self._requeued
+        return summary
+
+    def check_files(self, file_paths: List[str],
+                    exclude_patterns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Check files on the worker nodes; the summary also lists the 'nodes'."""
+        return self._summarize_nodes(super().check_files(file_paths, exclude_patterns))
+
+    def fix_files(self, file_paths: List[str], backup: bool = True,
+                  dry_run: bool = False) -> Dict[str, Any]:
+        """Fix files on the worker nodes; the summary also lists the 'nodes'."""
+        return self._summarize_nodes(super().fix_files(file_paths, backup, dry_run))
+
+    def map_files(self, analyzer: Any, file_paths: List[str]) -> Dict[str, Any]:
+        """Run an analyzer on the worker nodes; the summary also lists the 'nodes'.
+
+        The analyzer is pickled to the nodes, whose hosts must be able to
+        import its module.
+        """
+        return self._summarize_nodes(super().map_files(analyzer, file_paths))
+
+
+class WorkerNode:
+    """Runs the tasks of a coordinator on this host's process pool."""
+
+    # Seconds between attempts to reach the coordinator, and between
+    # requests for work while the coordinator has none to hand out
+    RETRY_SECONDS = 0.2
+
+    def __init__(self, address: Tuple[str, int], secret: bytes,
+                 workers: Optional[int] = None,
+                 memory_budget: Optional[int] = None, quiet: bool = False):
+        """
+        Args:
+            address: (host, port) of the coordinator
+            secret: Secret shared with the coordinator
+            workers: Worker processes on this host (default: CPU count)
+            memory_budget: Bytes this host's workers may use together
+                (see ParallelMigrationRunner)
+        """
+        self.address = address
+        self.secret = secret
+        # Only used for its defaults and memory budget
+        self._runner = ParallelMigrationRunner(workers=workers, memory_budget=memory_budget,
+                                               quiet=quiet)
+        self.workers = self._runner.workers
+        self.quiet = quiet
+
+    def _log(self, message: str):
+        if not self.quiet:
+            print(message)
+
+    def _connect(self, connect_timeout: float):
+        deadline = time.time() + connect_timeout
+        while True:
+            try:
+                return Client(self.address, authkey=self.secret)
+            except (ConnectionRefusedError, socket.timeout):
+                if time.time() > deadline:
+                    raise
+                time.sleep(self.RETRY_SECONDS)
+
+    def run(self, connect_timeout: float = 60.0) -> Dict[str, int]:
+        """Work for the coordinator until it has nothing left.
+
+        Args:
+            connect_timeout: Seconds to keep trying to reach the coordinator
+
+        Returns:
+            The number of 'tasks' and 'files' this node ran
+        """
+        conn = self._connect(connect_timeout)
+        stats = {'tasks': 0, 'files': 0}
+        try:
+            conn.send(('hello', socket.gethostname(), self.workers))
+            _, operation, options, timeout = conn.recv()
+            host, port = self.address
+            self._log(f"🖧  Working on a {operation} run for {host}:{port} "
+                      f"with {self.workers} workers")
+
+            done = False
+
+            def more(idle: int) -> List[List[Any]]:
+                nonlocal done
+                if done:
+                    return []
+                # Also tells the coordinator that this node is alive
+                conn.send(('more', idle))
+                reply = conn.recv()
+                if reply[0] == 'done':
+                    done = True
+                    return []
+                stats['tasks'] += len(reply[1])
+                return reply[1]
+
+            governor = _MemoryGovernor(self._runner._memory_budget(), self.workers,
+                                       self._runner.MEMORY_RESERVE_BYTES)
+            pool = _WorkerPool(self.workers, operation, options, governor)
+            while not done:
+                for chunk, outcome in pool.run([], timeout, more):
+                    stats['files'] += len(chunk)
+                    conn.send(('result', chunk, outcome))
+                if not done:
+                    time.sleep(self.RETRY_SECONDS)
+        except (EOFError, OSError):
+            # The coordinator finished or went away
+            pass
+        finally:
+            conn.close()
+        self._log(f"✓ Ran {stats['tasks']} tasks ({stats['files']} files)")
+        return stats
+
+
+def read_secret(secret: Optional[str]) -> bytes:
+    """Return the shared secret, from the argument or SECRET_ENV."""
+    secret = secret or os.environ.get(SECRET_ENV)
+    if not secret:
+        raise ValueError(f"A shared secret is required: pass --secret or set {SECRET_ENV}")
+    return secret.encode('utf-8')
@@ -14,6 +14,8 @@ from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
+from analysis_cache import cached_analysis
+
 
 class CodeBlock:
     """Represents a block of code with metadata."""
@@ -64,26 +66,52 @@ class DuplicationDetector:
         if exclude_patterns is None:
             exclude_patterns = ['test_', '__pycache__', '.venv', 'venv', '.git', 'build', 'dist']
         
+        python_files = []
         for root, dirs, files in os.walk(directory):
             # Filter out excluded directories
             dirs[:] = [d for d in dirs if not any(pattern in d for pattern in exclude_patterns)]
             
             for file in files:
                 if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    try:
-                        self.analyze_file(file_path)
-                    except Exception as e:
-                        print(f"Warning: Could not analyze {file_path}: {e}")
+                    python_files.append(os.path.join(root, file))
+        
+        # Extract the blocks in parallel, if worth it
+        from parallel_runner import run_analyzer
+        summary = run_analyzer(self, python_files)
+        for result in summary['results']:
+            if not result['success']:
+                print(f"Warning: Could not analyze {result['file']}: {result['error']}")
+    
+    def map_file(self, file_path: str) -> Tuple[int, List[CodeBlock]]:
+        """Extract one file's blocks in a parallel run (see parallel_runner.run_analyzer)."""
+        return self._extract_blocks(file_path)
+    
+    def reduce_files(self, results: List[Tuple[str, Tuple[int, List[CodeBlock]]]]) -> None:
+        """Add the blocks of a parallel run's files, in file order."""
+        for _, (line_count, blocks) in results:
+            self._add_blocks(line_count, blocks)
     
     def analyze_file(self, file_path: str) -> None:
         """Analyze a single Python file for code blocks."""
+        self._add_blocks(*self._extract_blocks(file_path))
+    
+    def _add_blocks(self, line_count: int, blocks: List[CodeBlock]) -> None:
+        """Count a file and index its blocks."""
+        self.stats['files_analyzed'] += 1
+        self.stats['total_lines'] += line_count
+        
+        for block in blocks:
+            self.blocks.append(block)
+            self.exact_duplicates[block.hash].append(block)
+    
+    @cached_analysis(version="1", config=("min_lines",))
+    def _extract_blocks(self, file_path: str) -> Tuple[int, List[CodeBlock]]:
+        """Return a file's line count and its candidate code blocks."""
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
             lines = content.split('\n')
         
-        self.stats['files_analyzed'] += 1
-        self.stats['total_lines'] += len(lines)
+        blocks = []
         
         # Extract code blocks using a sliding window
         for i in range(len(lines) - self.min_lines + 1):
@@ -112,8 +140,9 @@ class DuplicationDetector:
                 hash_value=block_hash
             )
             
-            self.blocks.append(block)
-            self.exact_duplicates[block_hash].append(block)
+            blocks.append(block)
+        
+        return len(lines), blocks
     
     def _normalize_code(self, code: str) -> str:
         """Normalize code for comparison by removing variable names and whitespace."""
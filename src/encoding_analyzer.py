@@ -152,13 +152,39 @@ class EncodingAnalyzer:
             pattern = '*.py'
         
         path = Path(directory)
-        for py_file in path.glob(pattern):
-            if py_file.is_file():
-                result = self.detect_encoding(str(py_file))
-                self.results.append(result)
+        python_files = [str(py_file) for py_file in path.glob(pattern) if py_file.is_file()]
+        
+        # Detect encodings in parallel, if worth it
+        from parallel_runner import run_analyzer
+        summary = run_analyzer(self, python_files)
+        for failed in summary['results']:
+            if not failed['success']:
+                # Crashed or timed out on a worker
+                self.results.append({
+                    'file': failed['file'],
+                    'detected_encoding': None,
+                    'confidence': 0.0,
+                    'declared_encoding': None,
+                    'has_declaration': False,
+                    'declaration_line': None,
+                    'issues': [f"Error reading file: {failed['error']}"],
+                    'status': 'error'
+                })
+        # Each error in its file's place, as a serial run reports it
+        order = {path: index for index, path in enumerate(python_files)}
+        self.results.sort(key=lambda result: order.get(result['file'], len(order)))
         
         return self.results
     
+    def map_file(self, file_path: str) -> Dict:
+        """Analyze one file of a parallel run (see parallel_runner.run_analyzer)."""
+        return self.detect_encoding(file_path)
+    
+    def reduce_files(self, results: List[Tuple[str, Dict]]) -> List[Dict]:
+        """Collect the results of a parallel run's files, in file order."""
+        self.results = [result for _, result in results]
+        return self.results
+    
     def add_encoding_declaration(
         self,
         file_path: str,
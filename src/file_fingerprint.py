@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+File Fingerprint
+
+Content fingerprints for the caches. A file's fingerprint is the hash of its
+content, but hashing is only done when the file's stat tuple
+(st_dev, st_ino, st_size, st_mtime_ns) changes: the process-wide
+FingerprintService remembers the tuple each digest was computed for, so a
+file is hashed at most once per process while it stays unchanged. Callers
+that persist fingerprints (the cache database, the verification record) can
+pass the stored tuple and digest back in, so unchanged files are not even
+read on the next run.
+
+A file modified within RACY_WINDOW_NS of being hashed could change again
+without its mtime moving, so such stat tuples are never trusted; those files
+are simply hashed again on the next lookup.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+# SHA-1 is faster than MD5 in OpenSSL (several times faster on CPUs with SHA
+# extensions) and collisions are not a concern for cache keys
+HASH_NAME = "sha1"
+
+StatKey = Tuple[int, int, int, int]
+
+
+def content_hash(data: bytes) -> str:
+    """Return the hex digest used to key file content."""
+    return hashlib.new(HASH_NAME, data).hexdigest()
+
+
+def file_content_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file's content in chunks, without holding it in memory."""
+    digest = hashlib.new(HASH_NAME)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stat_key(st: os.stat_result) -> StatKey:
+    """Return the part of a stat result that changes when a file is written."""
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class Fingerprint(NamedTuple):
+    """Content digest of a file, with the stat tuple it is valid for.
+
+    ``stat`` is None when the file was modified too recently for the tuple
+    to be trusted; such fingerprints should not be persisted as reusable.
+    """
+
+    stat: Optional[StatKey]
+    digest: str
+
+
+# A stored (stat tuple, digest) pair, or a callable returning one for a path
+Known = Union[Tuple[StatKey, str], Callable[[str], Optional[Tuple[StatKey, str]]], None]
+
+
+class FingerprintService:
+    """Stat-keyed memo of file content hashes."""
+
+    # Files modified this close to being hashed are hashed again next time
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self):
+        self._entries: Dict[str, Fingerprint] = {}
+        self._lock = threading.Lock()
+        self.hashes = 0
+        self.stat_hits = 0
+
+    def get(self, path: str, known: Known = None) -> Optional[Fingerprint]:
+        """Return the fingerprint of ``path``, hashing it only if needed.
+
+        Args:
+            path: File to fingerprint
+            known: Previously stored (stat tuple, digest) for the file, or a
+                callable taking the absolute path and returning one; it is
+                only consulted when this process has no usable fingerprint
+
+        Returns:
+            The Fingerprint, or None if the file cannot be read
+        """
+        key = os.path.abspath(path)
+        try:
+            current = stat_key(os.stat(key))
+        except OSError:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.stat == current:
+            self.stat_hits += 1
+            return entry
+
+        if callable(known):
+            known = known(key)
+        if known is not None and known[0] is not None and tuple(known[0]) == current:
+            entry = Fingerprint(current, known[1])
+            with self._lock:
+                self._entries[key] = entry
+            self.stat_hits += 1
+            return entry
+
+        hashed_at = time.time_ns()
+        try:
+            digest = file_content_hash(key)
+            after = stat_key(os.stat(key))
+        except OSError:
+            return None
+        self.hashes += 1
+
+        if after != current or current[3] >= hashed_at - self.RACY_WINDOW_NS:
+            # Changed while hashing, or too recently to trust the stat tuple
+            with self._lock:
+                self._entries.pop(key, None)
+            return Fingerprint(None, digest)
+
+        entry = Fingerprint(current, digest)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def fingerprint(self, path: str, known: Known = None) -> str:
+        """Return the content digest of ``path`` ("" if it cannot be read)."""
+        entry = self.get(path, known)
+        return entry.digest if entry is not None else ""
+
+    def forget(self, path: str):
+        """Drop the remembered fingerprint of ``path``."""
+        with self._lock:
+            self._entries.pop(os.path.abspath(path), None)
+
+    def clear(self):
+        """Drop every remembered fingerprint."""
+        with self._lock:
+            self._entries.clear()
+
+
+_shared_service = FingerprintService()
+
+
+def fingerprint_service() -> FingerprintService:
+    """Return the FingerprintService shared by every cache in this process."""
+    return _shared_service
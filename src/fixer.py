@@ -6,27 +6,215 @@ A programmatic tool to automatically fix Python 2 code for Python 3 compatibilit
 
 import ast
 import datetime
+import mmap
 import os
 import re
 import shutil
 import sys
+import tempfile
 from collections import OrderedDict
 
+from literal_prefilter import LiteralPrefilter
+from project_index import list_files
+
+
+class _RewriteEngine:
+    """Single-pass dispatcher over an ordered table of fix patterns.
+
+    The table is compiled once into one alternation of capturing branches, so a
+    file is scanned a single time instead of once per pattern. Matches are
+    dispatched to the owning fix by branch index; each replacement is then
+    rewritten by the remaining fixes so nested matches (e.g. ``xrange``
+    inside a print statement) are still converted. Fixes whose required
+    literal does not occur in the text are left out of the alternation.
+
+    Unlike running the fixes one after another, text a fix consumed is not
+    matched again by a fix that only matches across the replacement and
+    the text after it: ``from ConfigParser import ConfigParser`` becomes
+    ``from configparser import ConfigParser`` (one configparser_imports
+    fix), where sequential passes also applied configparser_direct and
+    produced ``from configparser import configparser as ConfigParser``.
+    """
+
+    # Combined regexes kept per set of left-out fixes
+    DISPATCHER_CACHE_SIZE = 256
+
+    # Inline letters for the flags a fix entry may add via its "flags" key
+    _INLINE_FLAGS = ((re.IGNORECASE, "i"), (re.DOTALL, "s"), (re.VERBOSE, "x"))
+
+    def __init__(self, fix_patterns):
+        self.names = list(fix_patterns.keys())
+        self.compiled = []
+        self.replacements = []
+        self._expand = []
+        self._branches = []
+        self._prefilter = LiteralPrefilter()
+
+        for index, fix_info in enumerate(fix_patterns.values()):
+            flags = re.MULTILINE | fix_info.get("flags", 0)
+            replacement = fix_info["replacement"]
+            self.compiled.append(re.compile(fix_info["pattern"], flags))
+            self.replacements.append(replacement)
+            # Literal replacements skip template expansion entirely
+            self._expand.append("\\" in replacement)
+            self._branches.append(self._scoped(fix_info["pattern"], flags))
+            self._prefilter.add(index, fix_info["pattern"], flags)
+
+        self._dispatchers = {}
+        self._binary = None
+
+    def _scoped(self, pattern, flags):
+        """Wrap a pattern so its extra flags only apply inside its branch."""
+        letters = "".join(
+            letter for flag, letter in self._INLINE_FLAGS if flags & flag
+        )
+        if letters:
+            return "(?%s:%s)" % (letters, pattern)
+        return "(?:%s)" % pattern
+
+    def _dispatcher(self, excluded):
+        """Return the combined regex (and group map) without ``excluded`` fixes."""
+        if excluded not in self._dispatchers:
+            if len(self._dispatchers) >= self.DISPATCHER_CACHE_SIZE:
+                self._dispatchers.clear()
+            parts = []
+            group_map = {}
+            group = 1
+            for index, branch in enumerate(self._branches):
+                if index in excluded:
+                    continue
+                parts.append("(%s)" % branch)
+                group_map[group] = index
+                group += 1 + self.compiled[index].groups
+            regex = re.compile("|".join(parts), re.MULTILINE) if parts else None
+            self._dispatchers[excluded] = (regex, group_map)
+        return self._dispatchers[excluded]
+
+    def rewrite(self, content, excluded=frozenset(), samples=None, max_samples=0):
+        """Rewrite ``content`` in one scan.
+
+        Args:
+            content: Source text to rewrite
+            excluded: Indexes of fixes to leave out of this scan
+            samples: Optional list of per-fix lists that collects up to
+                ``max_samples`` matched snippets for each fix
+
+        Returns:
+            Tuple of (new_content, counts) where counts is a list of match
+            counts aligned with the order of the fix table
+        """
+        counts = [0] * len(self.names)
+        # A fix that cannot match anywhere in content cannot win a branch
+        absent = self._prefilter.absent(content)
+        regex, group_map = self._dispatcher(excluded | absent if absent else excluded)
+        if regex is None:
+            return content, counts
+
+        def _replace(match):
+            index = group_map[match.lastindex]
+            counts[index] += 1
+            if samples is not None and len(samples[index]) < max_samples:
+                samples[index].append(match.group(0))
+            replacement = self.replacements[index]
+            if self._expand[index]:
+                # Re-match the owning pattern so its own group numbers apply
+                own = self.compiled[index].match(match.string, match.start())
+                replacement = own.expand(replacement)
+            nested, nested_counts = self.rewrite(
+                replacement, excluded | {index}, samples, max_samples
+            )
+            for i, count in enumerate(nested_counts):
+                counts[i] += count
+            return nested
+
+        return regex.sub(_replace, content), counts
+
+    def _binary_table(self):
+        """Compile bytes versions of the fix table for streaming rewrites."""
+        if self._binary is None:
+            branches = []
+            compiled = []
+            replacements = []
+            for pattern, replacement in zip(self.compiled, self.replacements):
+                source = pattern.pattern.encode("utf-8")
+                flags = pattern.flags & ~re.UNICODE
+                compiled.append(re.compile(source, flags))
+                replacements.append(replacement.encode("utf-8"))
+                branches.append("(%s)" % self._scoped(pattern.pattern, flags))
+            regex = re.compile("|".join(branches).encode("utf-8"), re.MULTILINE)
+            group_map = self._dispatcher(frozenset())[1]
+            self._binary = (regex, group_map, compiled, replacements)
+        return self._binary
+
+    def rewrite_stream(self, buffer, out):
+        """Rewrite a bytes-like buffer (such as an mmap) into a binary file.
+
+        The whole buffer stays visible to the regex, so matches spanning line
+        breaks behave as in rewrite(); only the output is streamed. Patterns
+        run in bytes mode, so ``\\w``, ``\\s`` and ``\\b`` are ASCII-only here.
+
+        Returns:
+            List of match counts aligned with the order of the fix table
+        """
+        counts = [0] * len(self.names)
+        regex, group_map, compiled, replacements = self._binary_table()
+
+        with memoryview(buffer) as view:
+            pos = 0
+            for match in regex.finditer(buffer):
+                out.write(view[pos:match.start()])
+                index = group_map[match.lastindex]
+                counts[index] += 1
+                replacement = replacements[index]
+                if self._expand[index]:
+                    own = compiled[index].match(buffer, match.start())
+                    replacement = own.expand(replacement)
+                nested, nested_counts = self.rewrite(
+                    replacement.decode("utf-8", "surrogateescape"),
+                    frozenset([index]),
+                )
+                for i, count in enumerate(nested_counts):
+                    counts[i] += count
+                out.write(nested.encode("utf-8", "surrogateescape"))
+                pos = match.end()
+            out.write(view[pos:])
+
+        return counts
+
 
 class Python2to3Fixer:
     """Main class for fixing Python 2 code to be Python 3 compatible."""
 
-    def __init__(self, backup_dir="backup"):
+    # Staged rewrites are backed up and flushed once they reach this size
+    WRITE_BATCH_BYTES = 64 * 1024 * 1024
+
+    # Files at least this large are memory-mapped and streamed to disk
+    STREAM_THRESHOLD_BYTES = 32 * 1024 * 1024
+
+    # Temporary files of a streamed fix are named "<file name>.<random><suffix>"
+    # next to the file (see temp_files)
+    TEMP_SUFFIX = ".py2to3.tmp"
+
+    def __init__(self, backup_dir="backup", verbose=True):
+        """
+        Args:
+            backup_dir: Directory for backups of rewritten files, or None to
+                write fixes without keeping backups
+            verbose: If False, file and directory fixing runs silently
+        """
         self.backup_dir = backup_dir
+        self.verbose = verbose
         self.fixes_applied = []
         self.errors = []
 
-        # Ensure backup directory exists
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
+        # Rewritten files staged by fix_directory until their batch is flushed
+        self._pending_writes = None
+        self._pending_bytes = 0
+        self._failed_writes = []
 
         # Define fix patterns
         self.fix_patterns = self._get_fix_patterns()
+        self._engine = _RewriteEngine(self.fix_patterns)
 
     def _get_fix_patterns(self):
         """Define patterns for common Python 2 to 3 fixes."""
@@ -203,6 +391,46 @@ class Python2to3Fixer:
             ]
         )
 
+    def fix_source(self, source, examples=0):
+        """Fix Python 2 source code held in memory.
+
+        This is the pure core of the fixer: it does not print, touch the
+        filesystem, or record anything in ``fixes_applied``.
+
+        Args:
+            source: Python source text
+            examples: Number of matched snippets to keep per fix under a
+                "matches" key (0 keeps none)
+
+        Returns:
+            Tuple of (new_source, fixes) where fixes is a list of dictionaries
+            with 'fix', 'type', 'description' and 'count' keys
+        """
+        samples = [[] for _ in self._engine.names] if examples else None
+        content, counts = self._engine.rewrite(source, samples=samples, max_samples=examples)
+
+        fixes = []
+        for index, (fix_name, count) in enumerate(zip(self._engine.names, counts)):
+            if count > 0:
+                fix = {
+                    "fix": fix_name,
+                    "type": fix_name,
+                    "description": self.fix_patterns[fix_name]["description"],
+                    "count": count,
+                }
+                if samples is not None:
+                    fix["matches"] = samples[index]
+                fixes.append(fix)
+
+        # Add Python 3 compatibility imports at the top if needed
+        content = self._add_compatibility_imports(content)
+        return content, fixes
+
+    def _log(self, message):
+        """Print a progress message unless running silently."""
+        if self.verbose:
+            print(message)
+
     def fix_file(self, filepath, dry_run=False):
         """Fix a single Python file.
         
@@ -214,71 +442,120 @@ class Python2to3Fixer:
             Dictionary with 'fixes', 'errors', and 'success' keys
         """
         if dry_run:
-            print("Analyzing file (dry run): %s" % filepath)
+            self._log("Analyzing file (dry run): %s" % filepath)
         else:
-            print("Fixing file: %s" % filepath)
-
-        backup_path = None
-        # Create backup only if not in dry-run mode
-        if not dry_run:
-            backup_path = self._create_backup(filepath)
-            if not backup_path:
-                error_msg = "Failed to create backup for %s" % filepath
-                self.errors.append(error_msg)
-                return {
-                    'fixes': self.fixes_applied,
-                    'errors': self.errors,
-                    'success': False
-                }
+            self._log("Fixing file: %s" % filepath)
 
         try:
+            if os.path.getsize(filepath) >= self.STREAM_THRESHOLD_BYTES:
+                return self._fix_large_file(filepath, dry_run)
+
             # Read file content
             with open(filepath) as f:
-                content = f.read()
+                original_content = f.read()
 
-            original_content = content
-            file_fixes = []
+            content, fixes = self.fix_source(original_content)
+            file_fixes = [dict({"file": filepath}, **fix) for fix in fixes]
+            self.fixes_applied.extend(file_fixes)
+
+        except Exception as e:
+            error_msg = f"Error fixing {filepath}: {str(e)}"
+            self.errors.append(error_msg)
+            return {
+                'fixes': self.fixes_applied,
+                'errors': self.errors,
+                'success': False
+            }
+
+        # Write fixed content back to file (only if not dry run). Unchanged
+        # files are never backed up, rewritten or touched.
+        success = True
+        changed = content != original_content
+        if changed and not dry_run:
+            if self._pending_writes is not None:
+                # Inside fix_directory: backups and writes happen in batches
+                self._queue_write(filepath, content)
+            else:
+                success = not self._write_fixed_files([(filepath, content)])
+        if success:
+            self._log_file_fixes(file_fixes, changed, dry_run)
+
+        return {
+            'fixes': self.fixes_applied,
+            'errors': self.errors,
+            'success': success
+        }
+
+    def _log_file_fixes(self, file_fixes, changed, dry_run):
+        """Print the per-file outcome of fix_file."""
+        if not changed:
+            self._log("  No fixes needed")
+        elif dry_run:
+            self._log(
+                "  Would apply %d types of fixes (DRY RUN)"
+                % len(file_fixes)
+            )
+            # In dry run, show what changes would be made
+            for fix in file_fixes:
+                self._log(f"    - {fix['description']} ({fix['count']} occurrence(s))")
+        else:
+            self._log(
+                "  Applied %d types of fixes"
+                % len(file_fixes)
+            )
+
+    def _fix_large_file(self, filepath, dry_run=False):
+        """Fix a file above STREAM_THRESHOLD_BYTES with bounded memory.
 
-            # Apply fixes
-            for fix_name, fix_info in self.fix_patterns.items():
-                content, count = self._apply_fix(content, fix_info)
+        The file is memory-mapped and the rewritten output is streamed to a
+        temporary file next to it, which replaces the original once backed up.
+        """
+        # Dry runs stream into the system temp dir; real runs stay on the
+        # same filesystem so the final rename is atomic.
+        temp_dir = None if dry_run else os.path.dirname(os.path.abspath(filepath))
+        temp_paths = []
+        try:
+            source_path = filepath
+            if self._has_carriage_returns(filepath):
+                # Match the universal-newline reading of small files
+                source_path = self._normalize_newlines(filepath, temp_dir)
+                temp_paths.append(source_path)
+
+            fd, output_path = self._temp_file(filepath, temp_dir)
+            temp_paths.append(output_path)
+            with open(source_path, "rb") as src, os.fdopen(fd, "wb") as out:
+                with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    counts = self._engine.rewrite_stream(buffer, out)
+
+            fixed_path = self._add_compatibility_imports_to_file(output_path, temp_dir)
+            if fixed_path != output_path:
+                temp_paths.append(fixed_path)
+
+            file_fixes = []
+            for fix_name, count in zip(self._engine.names, counts):
                 if count > 0:
-                    fix_entry = {
+                    file_fixes.append({
                         "file": filepath,
                         "fix": fix_name,
                         "type": fix_name,
-                        "description": fix_info["description"],
+                        "description": self.fix_patterns[fix_name]["description"],
                         "count": count,
+                    })
+            self.fixes_applied.extend(file_fixes)
+            changed = bool(file_fixes) or fixed_path != output_path
+
+            if changed and not dry_run:
+                if self.backup_dir and not self._create_backup(filepath):
+                    self.errors.append("Failed to create backup for %s" % filepath)
+                    return {
+                        'fixes': self.fixes_applied,
+                        'errors': self.errors,
+                        'success': False
                     }
-                    self.fixes_applied.append(fix_entry)
-                    file_fixes.append(fix_entry)
-
-            # Add Python 3 compatibility imports at the top if needed
-            content = self._add_compatibility_imports(content)
-
-            # Write fixed content back to file (only if not dry run)
-            if content != original_content:
-                if dry_run:
-                    print(
-                        "  Would apply %d types of fixes (DRY RUN)"
-                        % len(file_fixes)
-                    )
-                    # In dry run, show what changes would be made
-                    for fix in file_fixes:
-                        print(f"    - {fix['description']} ({fix['count']} occurrence(s))")
-                else:
-                    with open(filepath, "w") as f:
-                        f.write(content)
-                    print(
-                        "  Applied %d types of fixes"
-                        % len(file_fixes)
-                    )
-            else:
-                if dry_run:
-                    print("  No fixes needed")
-                else:
-                    print("  No fixes needed")
+                shutil.copymode(filepath, fixed_path)
+                os.replace(fixed_path, filepath)
 
+            self._log_file_fixes(file_fixes, changed, dry_run)
             return {
                 'fixes': self.fixes_applied,
                 'errors': self.errors,
@@ -286,31 +563,151 @@ class Python2to3Fixer:
             }
 
         except Exception as e:
-            error_msg = f"Error fixing {filepath}: {str(e)}"
-            self.errors.append(error_msg)
-            # Restore from backup (only if we created one)
-            if not dry_run and backup_path and os.path.exists(backup_path):
-                shutil.copy2(backup_path, filepath)
+            self.errors.append(f"Error fixing {filepath}: {str(e)}")
             return {
                 'fixes': self.fixes_applied,
                 'errors': self.errors,
                 'success': False
             }
+        finally:
+            for temp_path in temp_paths:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    @staticmethod
+    def _has_carriage_returns(filepath):
+        """Check whether a file contains any carriage return characters."""
+        with open(filepath, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return buffer.find(b"\r") != -1
+
+    @classmethod
+    def _temp_file(cls, filepath, temp_dir):
+        """Create a temporary file for a streamed fix of ``filepath``."""
+        return tempfile.mkstemp(prefix=os.path.basename(filepath) + ".",
+                                suffix=cls.TEMP_SUFFIX, dir=temp_dir)
+
+    @classmethod
+    def temp_files(cls, filepath):
+        """Return the temporary files a streamed fix of ``filepath`` left behind.
+
+        A fix that is killed halfway cannot remove them itself.
+        """
+        directory = os.path.dirname(os.path.abspath(filepath))
+        prefix = os.path.basename(filepath) + "."
+        try:
+            with os.scandir(directory) as it:
+                return [entry.path for entry in it
+                        if entry.name.startswith(prefix) and entry.name.endswith(cls.TEMP_SUFFIX)]
+        except OSError:
+            return []
+
+    @staticmethod
+    def _normalize_newlines(filepath, temp_dir, chunk_size=1024 * 1024):
+        """Stream a copy of a file with CRLF and CR line endings turned into LF."""
+        fd, temp_path = Python2to3Fixer._temp_file(filepath, temp_dir)
+        with open(filepath, "rb") as src, os.fdopen(fd, "wb") as out:
+            pending_cr = False
+            while True:
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                if pending_cr:
+                    chunk = b"\r" + chunk
+                # Hold back a trailing CR in case the next chunk starts with LF
+                pending_cr = chunk.endswith(b"\r")
+                if pending_cr:
+                    chunk = chunk[:-1]
+                out.write(chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n"))
+            if pending_cr:
+                out.write(b"\n")
+        return temp_path
+
+    def _queue_write(self, filepath, content):
+        """Stage a rewritten file, flushing the batch once it grows too large."""
+        self._pending_writes.append((filepath, content))
+        self._pending_bytes += len(content)
+        if self._pending_bytes >= self.WRITE_BATCH_BYTES:
+            self._failed_writes.extend(self._flush_pending_writes())
+
+    def _flush_pending_writes(self):
+        """Back up and write every staged file; return the paths that failed."""
+        pending = self._pending_writes
+        self._pending_writes = []
+        self._pending_bytes = 0
+        return self._write_fixed_files(pending)
+
+    def _write_fixed_files(self, pending):
+        """Back up a batch of changed files, then write their new content.
+
+        Backups are skipped entirely when the fixer has no backup directory.
 
-    def _create_backup(self, filepath):
-        """Create a backup of the file."""
+        Args:
+            pending: List of (filepath, new_content) tuples
+
+        Returns:
+            List of file paths that could not be written
+        """
+        if not pending:
+            return []
+
+        backups = None
+        if self.backup_dir:
+            backups = self._create_backups([filepath for filepath, _ in pending])
+        failed = []
+        for filepath, content in pending:
+            backup_path = backups.get(filepath) if backups is not None else None
+            if backups is not None and not backup_path:
+                self.errors.append("Failed to create backup for %s" % filepath)
+                failed.append(filepath)
+                continue
+            try:
+                with open(filepath, "w") as f:
+                    f.write(content)
+            except Exception as e:
+                self.errors.append(f"Error fixing {filepath}: {str(e)}")
+                # Restore from backup
+                if backup_path and os.path.exists(backup_path):
+                    shutil.copy2(backup_path, filepath)
+                failed.append(filepath)
+        return failed
+
+    def _create_backups(self, filepaths):
+        """Create backups for a batch of files sharing one timestamp.
+
+        Returns:
+            Dictionary mapping each successfully backed up path to its backup
+        """
+        backups = {}
         try:
+            os.makedirs(self.backup_dir, exist_ok=True)
+        except Exception as e:
+            self._log(f"Warning: Failed to create backup directory {self.backup_dir}: {str(e)}")
+            return backups
+
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        used_names = set()
+        for filepath in filepaths:
             filename = os.path.basename(filepath)
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_filename = f"{filename}.{timestamp}.backup"
-            backup_path = os.path.join(self.backup_dir, backup_filename)
+            # Same-named files from different directories in one batch
+            suffix = 1
+            while backup_filename in used_names:
+                backup_filename = f"{filename}.{timestamp}.{suffix}.backup"
+                suffix += 1
+            used_names.add(backup_filename)
 
-            shutil.copy2(filepath, backup_path)
-            return backup_path
+            backup_path = os.path.join(self.backup_dir, backup_filename)
+            try:
+                shutil.copy2(filepath, backup_path)
+                backups[filepath] = backup_path
+            except Exception as e:
+                self._log(f"Warning: Failed to create backup for {filepath}: {str(e)}")
+        return backups
 
-        except Exception as e:
-            print(f"Warning: Failed to create backup for {filepath}: {str(e)}")
-            return None
+    def _create_backup(self, filepath):
+        """Create a backup of the file."""
+        return self._create_backups([filepath]).get(filepath)
 
     def _apply_fix(self, content, fix_info):
         """Apply a single fix to content."""
@@ -325,33 +722,46 @@ class Python2to3Fixer:
         new_content, count = re.subn(pattern, replacement, content, flags=flags)
         return new_content, count
 
-    def _add_compatibility_imports(self, content):
-        """Add Python 3 compatibility imports if needed."""
+    def _compatibility_imports_needed(self, contains):
+        """List the future imports needed, given a substring test for the content."""
         imports_to_add = []
 
         # Check if we need future imports
-        if "print(" in content and "from __future__ import print_function" not in content:
+        if contains("print(") and not contains("from __future__ import print_function"):
             imports_to_add.append("from __future__ import print_function")
 
         if (
-            "unicode_literals" in content
-            and "from __future__ import unicode_literals" not in content
+            contains("unicode_literals")
+            and not contains("from __future__ import unicode_literals")
         ):
             imports_to_add.append("from __future__ import unicode_literals")
 
+        return imports_to_add
+
+    @staticmethod
+    def _import_insert_position(lines):
+        """Return the line index after any shebang and encoding lines."""
+        insert_pos = 0
+
+        # Skip shebang and encoding lines
+        for i, line in enumerate(lines):
+            if line.startswith("#!") or "coding:" in line or "coding=" in line:
+                insert_pos = i + 1
+            elif line.strip() == "":
+                continue
+            else:
+                break
+
+        return insert_pos
+
+    def _add_compatibility_imports(self, content):
+        """Add Python 3 compatibility imports if needed."""
+        imports_to_add = self._compatibility_imports_needed(lambda text: text in content)
+
         if imports_to_add:
             # Find the position to insert imports (after encoding declaration)
             lines = content.split("\n")
-            insert_pos = 0
-
-            # Skip shebang and encoding lines
-            for i, line in enumerate(lines):
-                if line.startswith("#!") or "coding:" in line or "coding=" in line:
-                    insert_pos = i + 1
-                elif line.strip() == "":
-                    continue
-                else:
-                    break
+            insert_pos = self._import_insert_position(lines)
 
             # Insert imports
             for import_line in reversed(imports_to_add):
@@ -361,6 +771,46 @@ class Python2to3Fixer:
 
         return content
 
+    def _add_compatibility_imports_to_file(self, path, temp_dir):
+        """Streaming counterpart of _add_compatibility_imports.
+
+        Returns:
+            Path of a new temporary file with the imports inserted, or
+            ``path`` itself when no imports are needed
+        """
+        if os.path.getsize(path) == 0:
+            return path
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                imports_to_add = self._compatibility_imports_needed(
+                    lambda text: buffer.find(text.encode("utf-8")) != -1
+                )
+        if not imports_to_add:
+            return path
+
+        def _head_lines(f):
+            for raw_line in iter(f.readline, b""):
+                yield raw_line.rstrip(b"\n").decode("utf-8", "surrogateescape")
+
+        with open(path, "rb") as f:
+            insert_pos = self._import_insert_position(_head_lines(f))
+
+        # Reproduce "\n".join() around the inserted lines exactly
+        fd, fixed_path = self._temp_file(path, temp_dir)
+        with open(path, "rb") as src, os.fdopen(fd, "wb") as out:
+            head_ends_with_newline = True
+            for _ in range(insert_pos):
+                raw_line = src.readline()
+                out.write(raw_line)
+                head_ends_with_newline = raw_line.endswith(b"\n")
+            block = "\n".join(imports_to_add).encode("utf-8")
+            if head_ends_with_newline:
+                out.write(block + b"\n")
+            else:
+                out.write(b"\n" + block)
+            shutil.copyfileobj(src, out)
+        return fixed_path
+
     def fix_directory(self, directory, recursive=True, dry_run=False):
         """Fix all Python files in a directory.
         
@@ -373,34 +823,38 @@ class Python2to3Fixer:
             Dictionary with 'fixes' and 'errors' lists
         """
         if dry_run:
-            print("Analyzing directory (dry run): %s" % directory)
+            self._log("Analyzing directory (dry run): %s" % directory)
         else:
-            print("Fixing directory: %s" % directory)
-
-        python_files = []
+            self._log("Fixing directory: %s" % directory)
 
         if recursive:
-            for root, dirs, files in os.walk(directory):
-                for file in files:
-                    if file.endswith(".py"):
-                        python_files.append(os.path.join(root, file))
+            python_files = list_files(directory)
         else:
-            for file in os.listdir(directory):
-                if file.endswith(".py"):
-                    python_files.append(os.path.join(directory, file))
+            python_files = [os.path.join(directory, file) for file in os.listdir(directory)
+                            if file.endswith(".py")]
 
-        print("Found %d Python files to %s" % (len(python_files), "analyze" if dry_run else "fix"))
+        self._log("Found %d Python files to %s" % (len(python_files), "analyze" if dry_run else "fix"))
 
         success_count = 0
-        for filepath in python_files:
-            result = self.fix_file(filepath, dry_run=dry_run)
-            if result.get('success', False):
-                success_count += 1
+        if not dry_run:
+            self._pending_writes = []
+            self._pending_bytes = 0
+            self._failed_writes = []
+        try:
+            for filepath in python_files:
+                result = self.fix_file(filepath, dry_run=dry_run)
+                if result.get('success', False):
+                    success_count += 1
+            if not dry_run:
+                self._failed_writes.extend(self._flush_pending_writes())
+                success_count -= len(self._failed_writes)
+        finally:
+            self._pending_writes = None
 
         if dry_run:
-            print("Successfully analyzed %d out of %d files" % (success_count, len(python_files)))
+            self._log("Successfully analyzed %d out of %d files" % (success_count, len(python_files)))
         else:
-            print("Successfully fixed %d out of %d files" % (success_count, len(python_files)))
+            self._log("Successfully fixed %d out of %d files" % (success_count, len(python_files)))
         
         # Return results in expected format for CLI
         return {
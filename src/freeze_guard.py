@@ -7,6 +7,7 @@ migrated to Python 3, preventing Python 2 patterns from being re-introduced.
 Useful for maintaining migration progress in active development environments.
 """
 
+import io
 import os
 import sys
 import json
@@ -15,6 +16,8 @@ from pathlib import Path
 from typing import List, Dict, Set, Tuple, Optional
 from datetime import datetime
 
+from literal_prefilter import LiteralPrefilter
+
 # Try to import verifier for Python 2 pattern detection
 try:
     from verifier import check_file, PY2_PATTERNS
@@ -115,64 +118,88 @@ class FreezeGuard:
         
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
+                content = f.read()
         except Exception as e:
             print(f"Warning: Could not read {file_path}: {e}", file=sys.stderr)
             return violations
         
-        # Define Python 2 patterns to check
+        # Define Python 2 patterns to check, each with the literals (any one
+        # of) that a line must contain for the check to fire
         patterns = {
             'print statement': [
-                (lambda l: 'print ' in l and not l.strip().startswith('#') and 'print(' not in l, 
+                (('print ',),
+                 lambda l: 'print ' in l and not l.strip().startswith('#') and 'print(' not in l, 
                  'Print statement without parentheses'),
             ],
             'old imports': [
-                (lambda l: 'import urllib2' in l or 'from urllib2' in l, 
+                (('import urllib2', 'from urllib2'),
+                 lambda l: 'import urllib2' in l or 'from urllib2' in l, 
                  'Python 2 urllib2 import'),
-                (lambda l: 'import ConfigParser' in l or 'from ConfigParser' in l,
+                (('import ConfigParser', 'from ConfigParser'),
+                 lambda l: 'import ConfigParser' in l or 'from ConfigParser' in l,
                  'Python 2 ConfigParser import'),
-                (lambda l: 'import Queue' in l or 'from Queue' in l,
+                (('import Queue', 'from Queue'),
+                 lambda l: 'import Queue' in l or 'from Queue' in l,
                  'Python 2 Queue import'),
             ],
             'string types': [
-                (lambda l: 'basestring' in l and not l.strip().startswith('#'),
+                (('basestring',),
+                 lambda l: 'basestring' in l and not l.strip().startswith('#'),
                  'Python 2 basestring usage'),
-                (lambda l: 'unicode(' in l and not l.strip().startswith('#'),
+                (('unicode(',),
+                 lambda l: 'unicode(' in l and not l.strip().startswith('#'),
                  'Python 2 unicode() function'),
             ],
             'dict methods': [
-                (lambda l: '.iteritems()' in l and not l.strip().startswith('#'),
+                (('.iteritems()',),
+                 lambda l: '.iteritems()' in l and not l.strip().startswith('#'),
                  'Python 2 iteritems() method'),
-                (lambda l: '.iterkeys()' in l and not l.strip().startswith('#'),
+                (('.iterkeys()',),
+                 lambda l: '.iterkeys()' in l and not l.strip().startswith('#'),
                  'Python 2 iterkeys() method'),
-                (lambda l: '.itervalues()' in l and not l.strip().startswith('#'),
+                (('.itervalues()',),
+                 lambda l: '.itervalues()' in l and not l.strip().startswith('#'),
                  'Python 2 itervalues() method'),
             ],
             'range': [
-                (lambda l: 'xrange(' in l and not l.strip().startswith('#'),
+                (('xrange(',),
+                 lambda l: 'xrange(' in l and not l.strip().startswith('#'),
                  'Python 2 xrange() function'),
             ],
             'exceptions': [
-                (lambda l: 'except ' in l and ', e' in l and ' as ' not in l,
+                (('except ',),
+                 lambda l: 'except ' in l and ', e' in l and ' as ' not in l,
                  'Python 2 exception syntax'),
             ],
         }
         
-        for line_num, line in enumerate(lines, 1):
-            for category, checks in patterns.items():
-                for check_func, description in checks:
-                    try:
-                        if check_func(line):
-                            violations.append(FreezeViolation(
-                                file_path,
-                                description,
-                                line_num,
-                                line,
-                                "error"
-                            ))
-                    except Exception:
-                        # Skip lines that cause errors in checking
-                        pass
+        # Only run the checks whose literals occur somewhere in the file
+        prefilter = LiteralPrefilter({
+            (category, index): literals
+            for category, checks in patterns.items()
+            for index, (literals, _, _) in enumerate(checks)
+        })
+        active = [
+            patterns[category][index][1:]
+            for category, index in prefilter.candidates(content)
+        ]
+        if not active:
+            return violations
+        
+        for line_num, line in enumerate(io.StringIO(content), 1):
+            for check_func, description in active:
+                try:
+                    if check_func(line):
+                        violations.append(FreezeViolation(
+                            file_path,
+                            description,
+                            line_num,
+                            line,
+                            "error"
+                        ))
+                except Exception:
+                    # Skip lines that cause errors in checking
+                    pass
         
         return violations
     
@@ -15,6 +15,9 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from analysis_cache import cached_analysis
+from project_index import list_files
+
 
 class HealthDimension:
     """Represents a single health dimension with score and details."""
@@ -50,6 +53,12 @@ class MigrationHealthMonitor:
         self.history_file = self.project_path / '.py2to3_health_history.json'
         self.history = self._load_history()
     
+    def _python_files(self, pattern='*.py') -> List[Path]:
+        """List the project's files matching ``pattern`` from the shared project index."""
+        if not self.project_path.is_dir():
+            return []
+        return [Path(path) for path in list_files(self.project_path, pattern=pattern)]
+    
     def _load_history(self) -> List[Dict]:
         """Load historical health data."""
         if self.history_file.exists():
@@ -130,7 +139,7 @@ class MigrationHealthMonitor:
             verifier = Python3CompatibilityVerifier()
             
             # Count Python files and issues
-            python_files = list(self.project_path.rglob('*.py'))
+            python_files = self._python_files()
             if not python_files:
                 return HealthDimension(
                     name='Compatibility',
@@ -230,7 +239,7 @@ class MigrationHealthMonitor:
     def _analyze_code_quality(self) -> HealthDimension:
         """Analyze code quality metrics."""
         try:
-            python_files = list(self.project_path.rglob('*.py'))
+            python_files = self._python_files()
             if not python_files:
                 return HealthDimension(
                     name='Code Quality',
@@ -252,30 +261,16 @@ class MigrationHealthMonitor:
                     continue
                 
                 try:
-                    with open(py_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                        lines = content.split('\n')
-                        total_lines += len(lines)
-                        
-                        if len(lines) > 500:
-                            long_files += 1
-                        
-                        # Try to parse AST
-                        try:
-                            tree = ast.parse(content)
-                            for node in ast.walk(tree):
-                                if isinstance(node, ast.FunctionDef):
-                                    total_functions += 1
-                                    # Check complexity (rough estimate by number of statements)
-                                    if len(node.body) > 20:
-                                        complex_functions += 1
-                                elif isinstance(node, ast.ClassDef):
-                                    total_classes += 1
-                        except:
-                            pass
-                            
+                    quality = self._file_quality(py_file)
                 except Exception:
-                    pass
+                    continue
+                
+                total_lines += quality['lines']
+                if quality['lines'] > 500:
+                    long_files += 1
+                total_functions += quality['functions']
+                total_classes += quality['classes']
+                complex_functions += quality['complex_functions']
             
             # Calculate quality score
             score = 100.0
@@ -337,6 +332,33 @@ class MigrationHealthMonitor:
                 recommendations=['Check file permissions and syntax']
             )
     
+    @cached_analysis(version="1")
+    def _file_quality(self, py_file) -> Dict:
+        """Count lines, functions, classes and complex functions of one file."""
+        with open(py_file, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        quality = {
+            'lines': len(content.split('\n')),
+            'functions': 0,
+            'classes': 0,
+            'complex_functions': 0
+        }
+        
+        # Try to parse AST
+        try:
+            tree = ast.parse(content)
+            for node in ast.walk(tree):
+                if isinstance(node, ast.FunctionDef):
+                    quality['functions'] += 1
+                    # Check complexity (rough estimate by number of statements)
+                    if len(node.body) > 20:
+                        quality['complex_functions'] += 1
+                elif isinstance(node, ast.ClassDef):
+                    quality['classes'] += 1
+        except:
+            pass
+        return quality
+    
     def _analyze_test_coverage(self) -> HealthDimension:
         """Analyze test coverage and presence."""
         try:
@@ -344,12 +366,11 @@ class MigrationHealthMonitor:
             test_files = []
             test_patterns = ['test_*.py', '*_test.py', 'tests.py']
             
-            for pattern in test_patterns:
-                test_files.extend(self.project_path.rglob(pattern))
+            test_files.extend(self._python_files(test_patterns))
             
             # Count source files
             source_files = [
-                f for f in self.project_path.rglob('*.py')
+                f for f in self._python_files()
                 if not any(skip in str(f) for skip in ['test', '__pycache__', '.git', 'venv'])
             ]
             
@@ -549,7 +570,7 @@ class MigrationHealthMonitor:
                 progress_score = (completed_items / total_items) * 100
             else:
                 # No state file - estimate from Python 2 patterns
-                python_files = list(self.project_path.rglob('*.py'))
+                python_files = self._python_files()
                 py2_patterns = 0
                 
                 for py_file in python_files:
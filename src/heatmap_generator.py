@@ -21,6 +21,8 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
 
+from parsed_file import ParsedFile
+
 
 class HeatmapGenerator:
     """Generate interactive heatmap visualizations of migration status."""
@@ -39,11 +41,12 @@ class HeatmapGenerator:
             'low_risk': 0
         }
     
-    def analyze_file(self, filepath: Path) -> Dict:
-        """Analyze a Python file for migration status and complexity."""
+    def analyze_file(self, filepath) -> Dict:
+        """Analyze a Python file (Path or ParsedFile) for migration status and complexity."""
+        parsed = ParsedFile.coerce(filepath)
+        filepath = Path(parsed.path)
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = parsed.text
             
             lines = content.count('\n') + 1
             file_size = len(content)
@@ -76,10 +79,10 @@ class HeatmapGenerator:
                 color = '#ef4444'  # red
             
             # Calculate complexity score
-            try:
-                tree = ast.parse(content)
+            tree = parsed.tree
+            if tree is not None:
                 complexity = self._calculate_complexity(tree)
-            except:
+            else:
                 complexity = lines // 10  # Rough estimate
             
             # Determine risk level
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Issue Store
+
+Compact, columnar storage for verifier issues. A legacy monorepo can yield
+millions of hits that repeat the same file path, description and suggestion,
+so instead of one dict per hit the store keeps:
+
+- interned tables of files, issue kinds (issue, severity, description,
+  suggestion) and code snippets, and
+- one array column per field holding small integer ids (plus the line).
+
+Counts and group-bys run over the integer columns. Issues are only turned
+into the familiar dicts when they are read, e.g. at a report boundary, and
+the store behaves like a read-mostly list of those dicts so existing callers
+keep working.
+"""
+
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class _Missing:
+    """Marker for a field that an issue does not have."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<missing>"
+
+    def __reduce__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+# Sentinel in the line column for a missing or non-integer line
+_NO_LINE = -(2 ** 63)
+
+
+class _InternTable:
+    """Append-only table mapping hashable values to dense integer ids."""
+
+    __slots__ = ("values", "ids")
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.ids: Dict[Any, int] = {}
+
+    def intern(self, value) -> int:
+        """Return the id of ``value``, adding it on first use."""
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def __getstate__(self):
+        return self.values
+
+    def __setstate__(self, values):
+        self.values = values
+        self.ids = {value: index for index, value in enumerate(values)}
+
+
+class IssueStore(Sequence):
+    """Columnar store of verifier issues.
+
+    Indexing and iteration yield fresh dicts with the keys of the verifier's
+    issue dicts (``file``, ``line``, ``issue``, ``severity``,
+    ``description``, ``suggestion``, ``code``); keys an issue did not have
+    are left out. Editing a returned dict does not change the store.
+    """
+
+    FIELDS = ("file", "line", "issue", "severity", "description", "suggestion", "code")
+
+    # Fields making up an interned issue kind
+    KIND_FIELDS = ("issue", "severity", "description", "suggestion")
+
+    def __init__(self, issues=None):
+        """
+        Args:
+            issues: Optional iterable of issue dicts to add
+        """
+        self._files = _InternTable()
+        self._kinds = _InternTable()
+        self._codes = _InternTable()
+        self._file_ids = array("I")
+        self._kind_ids = array("I")
+        self._code_ids = array("I")
+        self._lines = array("q")
+        # Row index -> fields that do not fit the columns (rare)
+        self._extras: Dict[int, Dict[str, Any]] = {}
+        if issues is not None:
+            self.extend(issues)
+
+    def add(self, file, line, issue, severity, description, suggestion, code=MISSING):
+        """Append one issue without building a dict first."""
+        self._file_ids.append(self._files.intern(file))
+        self._kind_ids.append(self._kinds.intern((issue, severity, description, suggestion)))
+        self._code_ids.append(self._codes.intern(code))
+        self._lines.append(line)
+
+    def append(self, issue: Dict[str, Any]):
+        """Append an issue dict."""
+        row = len(self._lines)
+        get = issue.get
+        extras = {key: value for key, value in issue.items() if key not in self.FIELDS}
+
+        line = get("line", MISSING)
+        if type(line) is not int or line == _NO_LINE:
+            if line is not MISSING:
+                extras["line"] = line
+            line = _NO_LINE
+
+        values = {}
+        for field in ("file", "code") + self.KIND_FIELDS:
+            value = get(field, MISSING)
+            try:
+                hash(value)
+            except TypeError:
+                extras[field] = value
+                value = MISSING
+            values[field] = value
+
+        self.add(line=line, **values)
+        if extras:
+            self._extras[row] = extras
+
+    def extend(self, issues):
+        """Append every issue dict (or the rows of another IssueStore)."""
+        for issue in issues:
+            self.append(issue)
+
+    def _row(self, row: int) -> Dict[str, Any]:
+        issue, severity, description, suggestion = self._kinds.values[self._kind_ids[row]]
+        line = self._lines[row]
+        values = (
+            self._files.values[self._file_ids[row]],
+            MISSING if line == _NO_LINE else line,
+            issue,
+            severity,
+            description,
+            suggestion,
+            self._codes.values[self._code_ids[row]],
+        )
+        extras = self._extras.get(row)
+        if extras is None:
+            return {field: value for field, value in zip(self.FIELDS, values) if value is not MISSING}
+
+        result = {}
+        for field, value in zip(self.FIELDS, values):
+            if field in extras:
+                result[field] = extras[field]
+            elif value is not MISSING:
+                result[field] = value
+        for key, value in extras.items():
+            if key not in result:
+                result[key] = value
+        return result
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("issue index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(len(self)):
+            yield self._row(row)
+
+    def __delitem__(self, index):
+        """Delete rows; slices must be contiguous (e.g. ``del store[n:]``)."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("IssueStore only supports contiguous slice deletion")
+        else:
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("issue index out of range")
+            start, stop = index, index + 1
+        if stop <= start:
+            return
+
+        for column in (self._file_ids, self._kind_ids, self._code_ids, self._lines):
+            del column[start:stop]
+        if not self._lines:
+            # Nothing refers to the interned values any more; a store that is
+            # emptied after each file must not keep every path and snippet
+            self._files = _InternTable()
+            self._kinds = _InternTable()
+            self._codes = _InternTable()
+            self._extras = {}
+            return
+        removed = stop - start
+        self._extras = {
+            row if row < start else row - removed: extras
+            for row, extras in self._extras.items()
+            if not start <= row < stop
+        }
+
+    def clear(self):
+        """Remove every issue."""
+        del self[:]
+
+    def __eq__(self, other):
+        if isinstance(other, (IssueStore, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return "IssueStore(%d issues in %d files)" % (len(self), len(self.count_by_file()))
+
+    # Aggregations over the integer columns
+
+    def _count_kind_field(self, position: int) -> Dict[Any, int]:
+        counts: Dict[Any, int] = {}
+        kinds = self._kinds.values
+        for kind_id, count in Counter(self._kind_ids).items():
+            key = kinds[kind_id][position]
+            counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def count_by_file(self) -> Dict[str, int]:
+        """Return the number of issues per file, in first-seen order."""
+        files = self._files.values
+        return {files[file_id]: count for file_id, count in Counter(self._file_ids).items()}
+
+    def count_by_type(self) -> Dict[str, int]:
+        """Return the number of issues per issue type, in first-seen order."""
+        return self._count_kind_field(0)
+
+    def severity_counts(self) -> Dict[str, int]:
+        """Return the number of issues per severity, in first-seen order."""
+        return self._count_kind_field(1)
+
+    def files(self) -> List[str]:
+        """Return the files that have issues, in first-seen order."""
+        return list(self.count_by_file())
+
+    def rows(self, severity: Optional[str] = None, file: Optional[str] = None,
+             issue: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield issue dicts matching every given filter, in insertion order."""
+        kinds = self._kinds.values
+        kind_ok = [
+            (severity is None or kind[1] == severity) and (issue is None or kind[0] == issue)
+            for kind in kinds
+        ]
+        file_id = None
+        if file is not None:
+            file_id = self._files.ids.get(file)
+            if file_id is None:
+                return
+        for row, kind_id in enumerate(self._kind_ids):
+            if kind_ok[kind_id] and (file_id is None or self._file_ids[row] == file_id):
+                yield self._row(row)
+
+    def group_by_file(self, severity: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Return issue dicts grouped by file, in first-seen order."""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self.rows(severity=severity):
+            groups.setdefault(row.get("file"), []).append(row)
+        return groups
+
+    def group_by_type(self, severity: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Return issue dicts grouped by issue type, in first-seen order."""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self.rows(severity=severity):
+            groups.setdefault(row.get("issue"), []).append(row)
+        return groups
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Return every issue as a dict (for JSON and other report output)."""
+        return list(self)
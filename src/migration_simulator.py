@@ -6,7 +6,6 @@ Perfect for planning, demos, and stakeholder presentations.
 """
 
 import os
-import re
 import sys
 import json
 from datetime import datetime
@@ -123,7 +122,7 @@ class MigrationSimulator:
     
     def _simulate_fixes(self, python_files, verbose):
         """Simulate applying fixes without modifying files."""
-        fixer = Python2to3Fixer(backup_dir=".simulation_tmp")
+        fixer = Python2to3Fixer(backup_dir=None, verbose=False)
         
         for filepath in python_files:
             if verbose:
@@ -134,29 +133,19 @@ class MigrationSimulator:
                 with open(filepath, 'r') as f:
                     original_content = f.read()
                 
-                content = original_content
+                # Apply all fix patterns in memory, keeping 3 examples per fix
+                content, fixes = fixer.fix_source(original_content, examples=3)
                 file_changes = []
-                
-                # Apply each fix pattern
-                for fix_name, fix_info in fixer.fix_patterns.items():
-                    pattern = fix_info["pattern"]
-                    replacement = fix_info["replacement"]
+                for fix in fixes:
+                    file_changes.append({
+                        "fix_type": fix["fix"],
+                        "description": fix["description"],
+                        "count": fix["count"],
+                        "matches": fix["matches"]
+                    })
                     
-                    matches = list(re.finditer(pattern, content, re.MULTILINE))
-                    if matches:
-                        count = len(matches)
-                        file_changes.append({
-                            "fix_type": fix_name,
-                            "description": fix_info["description"],
-                            "count": count,
-                            "matches": [m.group(0) for m in matches[:3]]  # First 3 examples
-                        })
-                        
-                        self.simulation_results["changes_by_type"][fix_name] += count
-                        self.simulation_results["total_changes"] += count
-                        
-                        # Apply the fix to content for preview
-                        content = re.sub(pattern, replacement, content, flags=re.MULTILINE)
+                    self.simulation_results["changes_by_type"][fix["fix"]] += fix["count"]
+                    self.simulation_results["total_changes"] += fix["count"]
                 
                 if file_changes:
                     self.simulation_results["changes_by_file"][filepath] = file_changes
@@ -4,39 +4,1198 @@ Parallel Migration Runner for Python 2 to 3 Migration
 
 This module enables parallel processing of migration operations across multiple
 files simultaneously, significantly speeding up large codebase migrations.
+
+Work runs serially, on a thread pool or on a process pool; by default the
+backend is picked from the estimated amount of work, using costs measured
+once per machine by a small probe (see probe_backends).
+
+Besides checks and fixes, any per-file analyzer can be run in parallel
+(see ParallelMigrationRunner.map_files and run_analyzer): it declares a
+map_file(path) method, run on the workers for each file, and a
+reduce_files(results) method that merges the per-file results, in the
+order the files were given, back in the calling process.
+
+With a cache directory, check results are kept in the same content-hash
+keyed verification record that ``check --incremental`` uses: the calling
+process answers unchanged files from it before any work is handed out, and
+stores the results the workers send back, so either command reuses the
+other's results (and cache bundles carry them to other checkouts).
 """
 
+import math
 import os
 import sys
+import tempfile
+import threading
 import time
 import multiprocessing as mp
+from collections import deque
+from multiprocessing.connection import wait
 from pathlib import Path
 from typing import List, Dict, Any, Callable, Optional, Tuple
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from verifier import Python3CompatibilityVerifier
 from fixer import Python2to3Fixer
+from file_fingerprint import fingerprint_service
+from issue_store import IssueStore
+from parsed_file import ParsedFile
+from project_index import list_files
+from verification_record import VerificationRecord
+
+# State of a worker, built once by _init_worker: the operation, its options
+# and the verifier or fixer (or map_files() analyzer). Thread-local, so
+# that thread-pool workers each get their own
+_local = threading.local()
+
+# Read size used when looking for line boundaries to split a file at
+_SPLIT_BLOCK_BYTES = 1024 * 1024
+
+
+def _rss(pid: int) -> Optional[int]:
+    """Return a process's resident memory in bytes, or None where unknown."""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _available_memory() -> Optional[int]:
+    """Return the memory available to new work in bytes, or None where unknown."""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _peak_rss() -> Optional[int]:
+    """Return the peak resident memory of this process in bytes, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes, except on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _init_worker(operation: str, options: Dict[str, Any]):
+    """Build the verifier or fixer once per worker."""
+    state = {'operation': operation, 'options': options}
+    if operation not in ('check', 'fix'):
+        # A map_files() run: the analyzer travels in the options
+        state['analyzer'] = options['analyzer']
+    elif operation == 'check':
+        state['verifier'] = Python3CompatibilityVerifier(verbose=False)
+    else:
+        state['fixer'] = Python2to3Fixer(
+            backup_dir="backup" if options.get('backup') else None, verbose=False
+        )
+    _local.state = state
+
+
+def _mark(index: int):
+    """Record that a pool worker starts on item ``index`` of its task."""
+    progress = getattr(_local, 'progress', None)
+    if progress is not None:
+        # The pool hands the items over one by one, from 'base' on
+        shared, slot, base = progress
+        shared[2 * slot + 1] = time.time()
+        shared[2 * slot] = base + index
+
+
+def _close_worker():
+    """Release the state of a worker running in the calling thread."""
+    state = getattr(_local, 'state', None)
+    if state is None:
+        return
+    del _local.state
+
+
+def _line_ranges(path: str, parts: int) -> List[Tuple[int, int, int]]:
+    """Split a file into about ``parts`` byte ranges of whole lines.
+    
+    Returns:
+        (start, end, first line) of each range, in file order
+    """
+    size = os.path.getsize(path)
+    targets = iter([size * k // parts for k in range(1, parts)])
+    target = next(targets, None)
+    # (offset, line number) at which each range after the first starts
+    bounds = []
+    offset = 0
+    line = 1
+    with open(path, 'rb') as f:
+        while target is not None:
+            block = f.read(_SPLIT_BLOCK_BYTES)
+            if not block:
+                break
+            pos = 0
+            while target is not None:
+                cut = block.find(b"\n", max(target - offset, pos))
+                if cut == -1:
+                    break
+                line += block.count(b"\n", pos, cut + 1)
+                pos = cut + 1
+                bounds.append((offset + pos, line))
+                # Targets inside a line already passed fall on the same boundary
+                while target is not None and target < offset + pos:
+                    target = next(targets, None)
+            line += block.count(b"\n", pos)
+            offset += len(block)
+    
+    starts = [(0, 1)] + bounds
+    ends = [start for start, _ in bounds] + [size]
+    return [(start, end, first_line)
+            for (start, first_line), end in zip(starts, ends) if start < end]
+
+
+def _check_chunk(items: List[Any]) -> Dict[str, Any]:
+    """Check a chunk of files in a worker.
+    
+    Args:
+        items: File paths, or (path, start, end, first line) ranges of
+            files split across tasks
+    
+    Returns:
+        Compact results: 'files' as (file, success, issue count, error,
+        cached, seconds) tuples, the chunk's 'issues' as one IssueStore, the
+        'work' seconds spent on the files, and the 'worker' process with
+        the wall-clock times the chunk 'started' and 'finished' and its
+        'peak_rss' in bytes. When the options ask for 'records', the
+        verification record result of each whole file is in 'records'
+    """
+    state = _local.state
+    verifier = state['verifier']
+    records = {} if state['options'].get('records') else None
+    issues = IssueStore()
+    files = []
+    started = time.time()
+    for index, item in enumerate(items):
+        _mark(index)
+        file_path = item if isinstance(item, str) else item[0]
+        file_start = time.perf_counter()
+        try:
+            if not isinstance(item, str):
+                verifier.issues_found = IssueStore()
+                verifier.verify_range(*item)
+                issues.extend(verifier.issues_found)
+                files.append((file_path, True, len(verifier.issues_found), None, False,
+                              time.perf_counter() - file_start))
+                continue
+            
+            verifier.issues_found = IssueStore()
+            verifier.warnings = []
+            verifier.syntax_errors = []
+            verified = verifier.verify_file(file_path)
+            found = verifier.issues_found
+            issues.extend(found)
+            if records is not None:
+                records[file_path] = verifier.record_result(verified)
+            files.append((file_path, True, len(found), None, False,
+                          time.perf_counter() - file_start))
+        except Exception as e:
+            files.append((file_path, False, 0, str(e), False, time.perf_counter() - file_start))
+    finished = time.time()
+    return {'files': files, 'issues': issues, 'work': sum(row[5] for row in files),
+            'worker': (os.getpid(), threading.get_ident()), 'started': started, 'finished': finished,
+            'peak_rss': _peak_rss(), 'records': records}
+
+
+def _fix_chunk(paths: List[str]) -> Dict[str, Any]:
+    """Fix a chunk of files in a worker.
+    
+    Returns:
+        Compact results: 'files' as (file, success, fix count, error,
+        seconds) tuples, the 'work' seconds spent on the files, and the
+        'worker' process with the wall-clock times the chunk 'started' and
+        'finished' and its 'peak_rss' in bytes
+    """
+    state = _local.state
+    fixer = state['fixer']
+    dry_run = state['options'].get('dry_run', False)
+    files = []
+    started = time.time()
+    for index, file_path in enumerate(paths):
+        _mark(index)
+        file_start = time.perf_counter()
+        try:
+            # The fixer keeps every fix it applied; only this file's are needed
+            fixer.fixes_applied = []
+            fixer.errors = []
+            result = fixer.fix_file(file_path, dry_run=dry_run)
+            files.append((file_path, bool(result.get('success', False)),
+                          len(result.get('fixes', [])), None, time.perf_counter() - file_start))
+        except Exception as e:
+            files.append((file_path, False, 0, str(e), time.perf_counter() - file_start))
+    finished = time.time()
+    return {'files': files, 'work': sum(row[4] for row in files),
+            'worker': (os.getpid(), threading.get_ident()), 'started': started, 'finished': finished,
+            'peak_rss': _peak_rss()}
+
+
+def _map_chunk(paths: List[str]) -> Dict[str, Any]:
+    """Run an analyzer's map_file over a chunk of files in a worker.
+    
+    Returns:
+        Compact results: 'files' as (file, success, mapped result, error,
+        seconds) tuples, the 'work' seconds spent on the files, and the
+        'worker' process with the wall-clock times the chunk 'started' and
+        'finished' and its 'peak_rss' in bytes
+    """
+    analyzer = _local.state['analyzer']
+    files = []
+    started = time.time()
+    for index, file_path in enumerate(paths):
+        _mark(index)
+        file_start = time.perf_counter()
+        try:
+            files.append((file_path, True, analyzer.map_file(file_path), None,
+                          time.perf_counter() - file_start))
+        except Exception as e:
+            files.append((file_path, False, None, str(e), time.perf_counter() - file_start))
+    finished = time.time()
+    return {'files': files, 'work': sum(row[4] for row in files),
+            'worker': (os.getpid(), threading.get_ident()), 'started': started, 'finished': finished,
+            'peak_rss': _peak_rss()}
+
+
+def _chunk_function(operation: str) -> Callable[[List[Any]], Dict[str, Any]]:
+    """Return the function that runs a chunk of an operation in a worker."""
+    if operation == 'check':
+        return _check_chunk
+    if operation == 'fix':
+        return _fix_chunk
+    return _map_chunk
+
+
+class WorkerLost(Exception):
+    """A pool worker was killed or died while working on one item of a task."""
+    
+    def __init__(self, reason: str, seconds: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.seconds = seconds
+    
+    def __reduce__(self):
+        # Sent between hosts by distributed runs
+        return WorkerLost, (self.reason, self.seconds)
+
+
+# Pool workers send results back about this often (in seconds of work),
+# rather than once per task, so the items finished before a worker is lost
+# keep their results
+BATCH_SECONDS = 0.05
+
+
+def _merge_outcomes(outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the outcomes of consecutive batches of a task into one."""
+    merged = dict(outcomes[-1])
+    merged['files'] = [row for outcome in outcomes for row in outcome['files']]
+    merged['work'] = sum(outcome['work'] for outcome in outcomes)
+    merged['started'] = outcomes[0]['started']
+    if 'issues' in merged:
+        merged['issues'] = IssueStore()
+        for outcome in outcomes:
+            merged['issues'].extend(outcome['issues'])
+    if merged.get('records') is not None:
+        merged['records'] = {path: result for outcome in outcomes
+                             for path, result in outcome['records'].items()}
+    return merged
+
+
+def _pool_worker(conn, slot: int, progress, operation: str, options: Dict[str, Any]):
+    """Main loop of a _WorkerPool process: run tasks until told to stop.
+    
+    A task is run in batches of about BATCH_SECONDS of work, sized from the
+    previous batch, and each batch's outcome is sent as (items, outcome) as
+    soon as it is done; None marks the end of the task. Fixes are sent one
+    file at a time, since running a fix again is not free of side effects.
+    """
+    _init_worker(operation, options)
+    task = _chunk_function(operation)
+    try:
+        while True:
+            try:
+                chunk = conn.recv()
+            except EOFError:
+                break
+            if chunk is None:
+                break
+            base = 0
+            size = 1
+            while True:
+                items = chunk[base:base + size]
+                _local.progress = (progress, slot, base)
+                start = time.perf_counter()
+                try:
+                    outcome = task(items)
+                except Exception as e:
+                    outcome = e
+                try:
+                    conn.send((len(items), outcome))
+                except Exception as e:
+                    # The exception itself could not be pickled
+                    conn.send((len(items), RuntimeError(str(e))))
+                base += len(items)
+                if base >= len(chunk):
+                    break
+                if operation != 'fix':
+                    elapsed = time.perf_counter() - start
+                    size = (len(chunk) if elapsed <= 0
+                            else max(1, int(len(items) * BATCH_SECONDS / elapsed)))
+            conn.send(None)
+    finally:
+        _close_worker()
+
+
+class _MemoryGovernor:
+    """Keeps the memory of a process pool's workers within a budget.
+    
+    Worker memory is read from /proc; where that is not available the
+    governor stays out of the way.
+    """
+    
+    # A worker whose memory grew to this multiple of what it used after its
+    # first task is replaced
+    GROWTH_FACTOR = 3.0
+    
+    def __init__(self, budget: Optional[int], workers: int, reserve: int):
+        """
+        Args:
+            budget: Bytes the workers may use together (None: no budget)
+            workers: Size of the pool
+            reserve: Available system memory below which no task is started
+        """
+        self.budget = budget
+        self.workers = workers
+        self.reserve = reserve
+        self.enabled = budget is not None and _rss(os.getpid()) is not None
+        # slot -> memory after the worker's first task
+        self.baseline: Dict[int, int] = {}
+        self.throttled = 0
+        self.recycled = 0
+        self.shrunk = 0
+        self._throttling = False
+    
+    def sample(self, pids: Dict[int, int]) -> Dict[int, int]:
+        """Return the resident memory of each worker slot's process."""
+        if not self.enabled:
+            return {}
+        rss = {}
+        for slot, pid in pids.items():
+            value = _rss(pid)
+            if value is not None:
+                rss[slot] = value
+        return rss
+    
+    def may_dispatch(self, rss: Dict[int, int], busy: int) -> bool:
+        """Whether another task may start, given the workers' memory.
+        
+        The next task is assumed to need as much as the largest worker. One
+        task is always allowed to run, so the run keeps making progress.
+        """
+        if not self.enabled or busy == 0:
+            return True
+        needed = sum(rss.values()) + max(rss.values(), default=0)
+        available = _available_memory()
+        allowed = needed <= self.budget and (available is None or available >= self.reserve)
+        if not allowed and not self._throttling:
+            self.throttled += 1
+        self._throttling = not allowed
+        return allowed
+    
+    def should_recycle(self, slot: int, rss: Optional[int]) -> bool:
+        """Whether a worker that just finished a task should be replaced."""
+        if not self.enabled or rss is None:
+            return False
+        baseline = self.baseline.setdefault(slot, rss)
+        if rss > self.budget / self.workers or rss > baseline * self.GROWTH_FACTOR:
+            del self.baseline[slot]
+            self.recycled += 1
+            return True
+        return False
+
+
+class _WorkerPool:
+    """Process pool whose workers can be killed and replaced one at a time.
+    
+    Each worker runs one task at a time, received over its own pipe, sends
+    back outcomes in batches (see _pool_worker), and records in shared
+    memory which item of the task it is on and since when. A worker that
+    spends longer than the timeout on one item, or dies, is replaced by a
+    fresh process; the batches it sent are reported, the item it was on is
+    reported lost, and the other items not sent back are run again first.
+    
+    Fix workers are not killed for time: a fixer stopped halfway leaves its
+    temporary files behind, and the file would never get fixed. A fix over
+    the budget is only reported (see ParallelMigrationRunner.timeout).
+    """
+    
+    def __init__(self, workers: int, operation: str, options: Dict[str, Any],
+                 governor: Optional[_MemoryGovernor] = None):
+        self.workers = workers
+        self.operation = operation
+        self.options = options
+        self.governor = governor or _MemoryGovernor(None, workers, 0)
+        self._context = mp.get_context()
+        # Per slot: index of the current item (-1 before the first), start time
+        self._progress = self._context.RawArray('d', 2 * workers)
+        # Per slot: (process, connection), or None until first needed
+        self._slots: List[Optional[Tuple[Any, Any]]] = [None] * workers
+        # Batches of results received from the workers
+        self.batches = 0
+    
+    def _start(self, slot: int):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_pool_worker, daemon=True,
+            args=(child_conn, slot, self._progress, self.operation, self.options)
+        )
+        process.start()
+        child_conn.close()
+        self._slots[slot] = (process, parent_conn)
+    
+    def _stop(self, slot: int):
+        """Let an idle worker exit, then discard it."""
+        process, conn = self._slots[slot]
+        try:
+            conn.send(None)
+        except OSError:
+            pass
+        process.join(timeout=5)
+        self._discard(slot)
+    
+    def _discard(self, slot: int):
+        process, conn = self._slots[slot]
+        if process.is_alive():
+            process.kill()
+        process.join()
+        conn.close()
+        self._slots[slot] = None
+    
+    def run(self, tasks: List[List[Any]], timeout: Optional[float] = None,
+            more: Optional[Callable[[int], List[List[Any]]]] = None):
+        """Run tasks, yielding (task, outcome) as they complete.
+        
+        The outcome is the task's result, the exception that made one of
+        its batches fail (the yielded task is then just that batch), or
+        WorkerLost for the one item a worker was lost on. A task whose
+        worker was lost is yielded in parts: the batches it sent, the lost
+        item, and later the rest of its items.
+        
+        Args:
+            more: Called at least every quarter second with the number of
+                workers that have nothing queued; returns further tasks to
+                run (possibly none). The run ends once no task is left
+        """
+        queue = deque(tasks)
+        # slot -> task it is running
+        busy: Dict[int, List[Any]] = {}
+        # slot -> (items, outcome) of the batches of its task received so far
+        received: Dict[int, List[Tuple[int, Any]]] = {}
+        governor = self.governor
+        if self.operation == 'fix':
+            timeout = None
+        poll = min(0.25, timeout / 4) if timeout else None
+        if governor.enabled or more is not None:
+            poll = min(poll or 0.25, 0.25)
+        
+        def refill():
+            if more is not None:
+                queue.extend(more(max(0, self.workers - len(busy) - len(queue))))
+        
+        try:
+            refill()
+            while queue or busy:
+                rss = governor.sample({slot: entry[0].pid for slot, entry in enumerate(self._slots)
+                                       if entry is not None})
+                for slot in range(self.workers):
+                    if not queue:
+                        break
+                    if slot in busy:
+                        continue
+                    if not governor.may_dispatch(rss, len(busy)):
+                        # Shrink the pool: idle workers give their memory back
+                        for idle in range(self.workers):
+                            if idle not in busy and self._slots[idle] is not None:
+                                self._stop(idle)
+                                rss.pop(idle, None)
+                                governor.shrunk += 1
+                        if not governor.may_dispatch(rss, len(busy)):
+                            break
+                    if self._slots[slot] is not None and not self._slots[slot][0].is_alive():
+                        self._discard(slot)
+                    if self._slots[slot] is None:
+                        self._start(slot)
+                    self._progress[2 * slot] = -1
+                    self._progress[2 * slot + 1] = time.time()
+                    chunk = queue.popleft()
+                    self._slots[slot][1].send(chunk)
+                    busy[slot] = chunk
+                    received[slot] = []
+                
+                ready = set(wait([self._slots[slot][1] for slot in busy]
+                                 + [self._slots[slot][0].sentinel for slot in busy], poll))
+                for slot in list(busy):
+                    process, conn = self._slots[slot]
+                    done = False
+                    try:
+                        while not done and (conn in ready or conn.poll()):
+                            ready.discard(conn)
+                            batch = conn.recv()
+                            if batch is None:
+                                done = True
+                            else:
+                                received[slot].append(batch)
+                                self.batches += 1
+                    except (EOFError, OSError):
+                        pass
+                    if done:
+                        if governor.should_recycle(slot, _rss(process.pid)):
+                            self._stop(slot)
+                        yield from self._finished(slot, busy.pop(slot), received.pop(slot))
+                        continue
+                    
+                    index = int(self._progress[2 * slot])
+                    seconds = time.time() - self._progress[2 * slot + 1]
+                    if process.sentinel in ready or not process.is_alive():
+                        process.join()
+                        code = process.exitcode
+                        reason = (f"worker killed by signal {-code}" if code is not None and code < 0
+                                  else f"worker exited with code {code}")
+                        if code == -9:
+                            # SIGKILL, which is what the kernel's OOM killer sends
+                            reason += " (possibly out of memory)"
+                    elif timeout and index >= 0 and seconds > timeout:
+                        reason = f"timed out after {timeout:g}s"
+                    else:
+                        continue
+                    
+                    self._discard(slot)
+                    chunk = busy.pop(slot)
+                    batches = received.pop(slot)
+                    if index < 0:
+                        # Lost before starting on any item: fail the whole task
+                        self._clean_up(chunk)
+                        yield chunk, WorkerLost(reason, seconds)
+                        continue
+                    sent = sum(items for items, _ in batches)
+                    if batches:
+                        yield from self._finished(slot, chunk[:sent], batches)
+                    # Items finished since the last batch are run again
+                    rest = chunk[sent:index] + chunk[index + 1:] if index >= sent else chunk[sent:]
+                    if rest:
+                        queue.appendleft(rest)
+                    if sent <= index < len(chunk):
+                        self._clean_up([chunk[index]])
+                        yield [chunk[index]], WorkerLost(reason, seconds)
+                
+                refill()
+        finally:
+            self.close()
+    
+    def _clean_up(self, items: List[Any]):
+        """Remove the temporary files a lost fix worker left next to its files."""
+        if self.operation != 'fix':
+            return
+        for path in items:
+            for leftover in Python2to3Fixer.temp_files(path):
+                try:
+                    os.remove(leftover)
+                except OSError:
+                    pass
+    
+    @staticmethod
+    def _finished(slot: int, chunk: List[Any], batches: List[Tuple[int, Any]]):
+        """Yield (task, outcome) for the items of a task's received batches.
+        
+        The batches' results are merged into one outcome; a batch that
+        raised is yielded on its own with its exception.
+        """
+        items = []
+        results = []
+        start = 0
+        for count, outcome in batches:
+            if isinstance(outcome, Exception):
+                yield chunk[start:start + count], outcome
+            else:
+                items.extend(chunk[start:start + count])
+                results.append(outcome)
+            start += count
+        if results:
+            merged = _merge_outcomes(results)
+            merged['worker'] = slot
+            yield items, merged
+    
+    def close(self):
+        """Stop every worker."""
+        for slot, entry in enumerate(self._slots):
+            if entry is None:
+                continue
+            process, conn = entry
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for slot, entry in enumerate(self._slots):
+            if entry is None:
+                continue
+            process, conn = entry
+            process.join(timeout=5)
+            self._discard(slot)
+
+
+# Probe results of this process, reused by every runner it creates (see
+# ParallelMigrationRunner.calibrate)
+_process_calibration: Optional[Dict[str, float]] = None
+
+# Source of the files the probe checks: a few common Python 2 constructs
+_PROBE_SOURCE = """import urllib2
+from StringIO import StringIO
+
+
+class Report(object):
+    def __init__(self, items):
+        self.items = dict((k, v) for k, v in items.iteritems())
+
+    def render(self, out):
+        for key in sorted(self.items.keys()):
+            print >>out, "%s: %s" % (key, self.items[key])
+        if self.items.has_key('total'):
+            print "total", self.items['total']
+        return unicode(out.getvalue())
+"""
+
+
+def _probe_files(probe_dir: str, prefix: str) -> Tuple[List[str], str]:
+    """Write the probe's small files and its large file under ``prefix``."""
+    small = []
+    for i in range(16):
+        path = os.path.join(probe_dir, f'{prefix}{i}.py')
+        with open(path, 'w') as f:
+            f.write(_PROBE_SOURCE)
+        small.append(path)
+    large = os.path.join(probe_dir, f'{prefix}_large.py')
+    with open(large, 'w') as f:
+        f.write(_PROBE_SOURCE * 200)
+    return small, large
+
+
+def _cold_caches():
+    """Forget parsed files and fingerprints, so the next check starts cold."""
+    ParsedFile.clear_registry()
+    fingerprint_service().clear()
+
+
+def probe_backends() -> Dict[str, float]:
+    """Measure the costs that the choice of execution backend is based on.
+    
+    Checks a few generated files serially and on two threads, and starts a
+    one-process pool. Takes a fraction of a second. This is a calibration
+    of the verifier only: other operations (fix, map_files analyzers) are
+    assumed to scale the same way.
+    
+    Every timed phase starts with empty per-process caches, and the two
+    threads check separate copies of the files, so that no phase reuses
+    another's parses.
+    
+    Returns:
+        'file_seconds' and 'byte_seconds' of a check, the 'thread_speedup'
+        of two threads over one, and 'process_start' seconds of a process
+        pool worker (start-up, initializer and shutdown)
+    """
+    with tempfile.TemporaryDirectory() as probe_dir:
+        small, large = _probe_files(probe_dir, 'probe')
+        copies = _probe_files(probe_dir, 'copy')
+        large_bytes = os.path.getsize(large)
+        
+        _init_worker('check', {})
+        try:
+            _cold_caches()
+            start = time.perf_counter()
+            _check_chunk(small)
+            small_seconds = time.perf_counter() - start
+            _cold_caches()
+            start = time.perf_counter()
+            _check_chunk([large])
+            large_seconds = time.perf_counter() - start
+        finally:
+            _close_worker()
+        
+        file_seconds = small_seconds / len(small)
+        byte_seconds = max(0.0, large_seconds - file_seconds) / large_bytes
+        
+        # Two threads each doing the serial run's work, against the serial run
+        _cold_caches()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2, initializer=_init_worker,
+                                initargs=('check', {})) as executor:
+            list(executor.map(_check_chunk, [small + [large], copies[0] + [copies[1]]]))
+        thread_seconds = time.perf_counter() - start
+        _cold_caches()
+        
+        start = time.perf_counter()
+        list(_WorkerPool(1, 'check', {}).run([[]]))
+        process_start = time.perf_counter() - start
+    
+    return {
+        'file_seconds': file_seconds,
+        'byte_seconds': byte_seconds,
+        'thread_speedup': 2 * (small_seconds + large_seconds) / thread_seconds if thread_seconds > 0 else 1.0,
+        'process_start': process_start,
+    }
 
 
 class ParallelMigrationRunner:
     """Runs migration operations in parallel across multiple files."""
     
-    def __init__(self, workers: Optional[int] = None, verbose: bool = False):
+    # Adaptive chunking aims at this many chunks per worker: enough to even
+    # out files of different sizes, few enough to amortize per-task overhead
+    CHUNKS_PER_WORKER = 4
+    MAX_CHUNK_SIZE = 512
+    
+    # Cost model for files without a recorded duration (seconds)
+    FILE_COST = 0.001
+    BYTE_COST = 1e-7
+    
+    # Checked files at least this large may be split into line ranges run
+    # as separate tasks (the verifier only runs line-based checks on them)
+    SPLIT_THRESHOLD_BYTES = Python3CompatibilityVerifier.STREAM_THRESHOLD_BYTES
+    MIN_RANGE_BYTES = 4 * 1024 * 1024
+    
+    BACKENDS = ('auto', 'serial', 'threads', 'processes')
+    # Runs estimated below this many seconds of work are run serially
+    # without probing: no pool can start faster than that
+    SERIAL_WORK_SECONDS = 0.05
+    # A pool backend is only picked if it is estimated to take at most this
+    # fraction of the time of the simpler backend
+    BACKEND_MARGIN = 0.8
+    # Probe results are kept in the cache directory under this name
+    PROBE_FILE = "backend_probe.json"
+    
+    # Wall-clock seconds a worker may spend on one file (or line range)
+    DEFAULT_TIMEOUT = 60.0
+    
+    # Without an explicit budget, process workers may use together this
+    # fraction of the memory available when the run starts
+    DEFAULT_MEMORY_FRACTION = 0.75
+    # No new task is started while less memory than this is available
+    MEMORY_RESERVE_BYTES = 256 * 1024 * 1024
+    
+    def __init__(self, workers: Optional[int] = None, verbose: bool = False,
+                 cache_dir: Optional[str] = None, chunk_size: Optional[int] = None,
+                 backend: str = 'auto', quiet: bool = False,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 memory_budget: Optional[int] = None):
         """
         Initialize parallel migration runner.
         
         Args:
-            workers: Number of worker processes (default: CPU count)
+            workers: Number of worker processes or threads (default: CPU count)
             verbose: Enable verbose output
+            cache_dir: Cache directory; check results for unchanged files
+                are reused from its verification record (shared with
+                ``check --incremental``), and per-file durations and probe
+                results recorded in it drive scheduling (default: no cache)
+            chunk_size: Files per task (default: adaptive, see chunk_size_for)
+            backend: 'serial', 'threads', 'processes', or 'auto' to pick one
+                per run (see choose_backend)
+            quiet: Print nothing while running
+            timeout: Seconds allowed per file (None or 0 for no limit). A
+                process worker checking a file over the limit is killed and
+                replaced; fixes, which must not be left half-written, and
+                the serial and thread backends only report a file over it.
+                Either way the file is quarantined in the summary
+            memory_budget: Bytes the process workers may use together
+                (default: DEFAULT_MEMORY_FRACTION of the available memory;
+                0 for no budget). Near it, new tasks wait, idle workers
+                are stopped, and workers that grew too large are replaced
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
         self.workers = workers or mp.cpu_count()
         self.verbose = verbose
+        self.cache_dir = cache_dir
+        self.chunk_size = chunk_size
+        self.backend = backend
+        self.quiet = quiet
+        self.timeout = timeout
+        self.memory_budget = memory_budget
         self.results = []
+        # Issues found by the last check_files() run
+        self.issues = IssueStore()
+        # Memory governor of the last process-backend run
+        self._governor: Optional[_MemoryGovernor] = None
+        self._calibration: Optional[Dict[str, float]] = None
+    
+    def _log(self, message: str):
+        """Print a progress message unless running quietly."""
+        if not self.quiet:
+            print(message)
+    
+    def chunk_size_for(self, file_count: int) -> int:
+        """Return the number of files per task for a run over file_count files."""
+        if self.chunk_size:
+            return self.chunk_size
+        target = math.ceil(file_count / (self.workers * self.CHUNKS_PER_WORKER))
+        return max(1, min(self.MAX_CHUNK_SIZE, target))
+    
+    @staticmethod
+    def _file_sizes(file_paths: List[str]) -> List[int]:
+        """Return the size of each file (0 if it cannot be read)."""
+        sizes = []
+        for file_path in file_paths:
+            try:
+                sizes.append(os.path.getsize(file_path))
+            except OSError:
+                sizes.append(0)
+        return sizes
+    
+    def estimate_costs(self, file_paths: List[str],
+                       history: Optional[Dict[str, Tuple[int, float]]] = None,
+                       sizes: Optional[List[int]] = None) -> List[float]:
+        """Estimate the seconds each file will take.
+        
+        A file with a recorded duration costs that duration, scaled by how
+        much the file has grown or shrunk since. Other files are costed by
+        size, at the rate measured over the recorded files when there are
+        any, else at the rate measured by the probe once it has run.
+        
+        Args:
+            file_paths: Files to estimate
+            history: (size, seconds) recorded per file by earlier runs
+            sizes: Sizes of the files, if already known
+        """
+        history = history or {}
+        if sizes is None:
+            sizes = self._file_sizes(file_paths)
+        
+        file_cost, byte_cost = self.FILE_COST, self.BYTE_COST
+        if self._calibration is not None:
+            file_cost = self._calibration['file_seconds']
+            byte_cost = self._calibration['byte_seconds']
+        recorded_bytes = sum(size for size, _ in history.values())
+        if recorded_bytes:
+            recorded_seconds = sum(seconds for _, seconds in history.values())
+            byte_cost = max(0.0, recorded_seconds - file_cost * len(history)) / recorded_bytes
+        
+        costs = []
+        for file_path, size in zip(file_paths, sizes):
+            recorded = history.get(file_path)
+            if recorded is None:
+                costs.append(file_cost + size * byte_cost)
+            elif recorded[0] > 0:
+                costs.append(recorded[1] * size / recorded[0])
+            else:
+                costs.append(recorded[1])
+        return costs
+    
+    def calibrate(self) -> Dict[str, float]:
+        """Return the probe results for this machine, probing if needed.
+        
+        Results are reused from the cache directory when they were measured
+        with the same Python, CPU count and verifier version, and otherwise
+        from an earlier probe of this process (runners without a cache
+        directory, such as those of run_analyzer, would probe every time).
+        """
+        global _process_calibration
+        if self._calibration is not None:
+            return self._calibration
+        
+        key = {'python': sys.version, 'cpus': os.cpu_count(),
+               'verifier': Python3CompatibilityVerifier.VERIFIER_VERSION}
+        probe_path = Path(self.cache_dir) / self.PROBE_FILE if self.cache_dir else None
+        if probe_path is not None:
+            try:
+                with open(probe_path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                if stored.get('key') == key:
+                    self._calibration = _process_calibration = stored['costs']
+                    return self._calibration
+            except (OSError, ValueError, KeyError, AttributeError):
+                pass
+        
+        if _process_calibration is None:
+            _process_calibration = probe_backends()
+        self._calibration = dict(_process_calibration)
+        if probe_path is not None:
+            try:
+                probe_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(probe_path, 'w', encoding='utf-8') as f:
+                    json.dump({'key': key, 'costs': self._calibration}, f)
+            except OSError:
+                pass
+        return self._calibration
+    
+    def choose_backend(self, work_seconds: float) -> str:
+        """Pick the backend expected to finish work_seconds of work first.
+        
+        Serial runs pay no start-up cost; threads divide the work by the
+        speedup the probe measured for them (little, while the GIL is held
+        by the checks); processes divide it by the number of workers but pay
+        the probe's measured process start-up.
+        """
+        if self.backend != 'auto':
+            return self.backend
+        if work_seconds < self.SERIAL_WORK_SECONDS or self.workers == 1:
+            return 'serial'
+        
+        costs = self.calibrate()
+        estimates = {
+            'serial': work_seconds,
+            'threads': work_seconds / max(1.0, min(costs['thread_speedup'], self.workers)),
+            'processes': costs['process_start'] + work_seconds / self.workers,
+        }
+        choice = 'serial'
+        for backend in ('threads', 'processes'):
+            if estimates[backend] < estimates[choice] * self.BACKEND_MARGIN:
+                choice = backend
+        return choice
+    
+    def _plan(self, operation: str, file_paths: List[str]) -> Tuple[str, List[List[Any]]]:
+        """Return the backend and the tasks to run an operation with."""
+        history = self._load_history(operation, file_paths)
+        sizes = self._file_sizes(file_paths)
+        costs = self.estimate_costs(file_paths, history, sizes)
+        if (self.backend == 'auto' and self._calibration is None
+                and sum(costs) >= self.SERIAL_WORK_SECONDS and self.workers > 1):
+            # Cost again at the rates measured on this machine
+            self.calibrate()
+            costs = self.estimate_costs(file_paths, history, sizes)
+        backend = self.choose_backend(sum(costs))
+        return backend, self.schedule(file_paths, operation, history, costs)
+    
+    def schedule(self, file_paths: List[str], operation: str = 'check',
+                 history: Optional[Dict[str, Tuple[int, float]]] = None,
+                 costs: Optional[List[float]] = None) -> List[List[Any]]:
+        """Group files into tasks, most expensive first.
         
+        Files are taken longest-first and closed into a task once it holds
+        its share of the estimated work or chunk_size_for() files, so large
+        files run early instead of becoming the tail of the run. For checks,
+        a file above SPLIT_THRESHOLD_BYTES whose cost exceeds a task's share
+        is split into (path, start, end, first line) ranges.
+        
+        Args:
+            file_paths: Files to process
+            operation: 'check' or 'fix' (fixed files are never split)
+            history: (size, seconds) recorded per file by earlier runs
+            costs: Estimated cost of each file (default: estimate_costs())
+            
+        Returns:
+            Tasks in submission order, each a list of files and ranges
+        """
+        if costs is None:
+            costs = self.estimate_costs(file_paths, history)
+        max_files = self.chunk_size_for(len(file_paths))
+        # An explicit chunk size fixes the number of files per task
+        share = (math.inf if self.chunk_size
+                 else sum(costs) / (self.workers * self.CHUNKS_PER_WORKER))
+        
+        tasks = []
+        chunk, chunk_cost = [], 0.0
+        for cost, file_path in sorted(zip(costs, file_paths), key=lambda pair: -pair[0]):
+            if operation == 'check' and cost > share:
+                ranges = self._split(file_path, cost, share)
+                if len(ranges) > 1:
+                    tasks.extend((cost / len(ranges), [(file_path, *r)]) for r in ranges)
+                    continue
+            chunk.append(file_path)
+            chunk_cost += cost
+            if len(chunk) >= max_files or chunk_cost >= share:
+                tasks.append((chunk_cost, chunk))
+                chunk, chunk_cost = [], 0.0
+        if chunk:
+            tasks.append((chunk_cost, chunk))
+        
+        tasks.sort(key=lambda task: -task[0])
+        return [items for _, items in tasks]
+    
+    def _split(self, file_path: str, cost: float, share: float) -> List[Tuple[int, int, int]]:
+        """Return the line ranges to check a file in, or [] to keep it whole."""
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            return []
+        if size < self.SPLIT_THRESHOLD_BYTES:
+            return []
+        parts = min(self.workers, math.ceil(cost / share), size // self.MIN_RANGE_BYTES)
+        if parts < 2:
+            return []
+        try:
+            return _line_ranges(file_path, parts)
+        except OSError:
+            return []
+    
+    def _load_history(self, operation: str, file_paths: List[str]) -> Dict[str, Tuple[int, float]]:
+        """Return the per-file durations recorded in the cache, if any."""
+        if not self.cache_dir:
+            return {}
+        from cache_manager import CacheManager
+        with CacheManager(self.cache_dir) as cache:
+            return cache.get_timings(operation, file_paths)
+    
+    def _save_history(self, operation: str, timings: Dict[str, float]):
+        """Record this run's per-file durations in the cache."""
+        if not self.cache_dir or not timings:
+            return
+        from cache_manager import CacheManager
+        recorded = {}
+        for file_path, seconds in timings.items():
+            try:
+                recorded[file_path] = (os.path.getsize(file_path), seconds)
+            except OSError:
+                continue
+        with CacheManager(self.cache_dir) as cache:
+            cache.set_timings(operation, recorded)
+    
+    def _run_chunks(self, operation: str, tasks: List[List[Any]], options: Dict[str, Any],
+                    backend: str = 'processes'):
+        """Run an operation over tasks, yielding (task, outcome) as they complete.
+        
+        Tasks are submitted in order, so the pool starts them in that order.
+        The outcome is the chunk function's result, the exception that made
+        the whole task fail, or WorkerLost for an item a process worker was
+        killed or died on.
+        """
+        task = _chunk_function(operation)
+        if backend == 'serial':
+            _init_worker(operation, options)
+            try:
+                for chunk in tasks:
+                    try:
+                        outcome = task(chunk)
+                    except Exception as e:
+                        outcome = e
+                    yield chunk, outcome
+            finally:
+                _close_worker()
+            return
+        
+        if backend == 'processes':
+            self._governor = _MemoryGovernor(self._memory_budget(), self.workers,
+                                             self.MEMORY_RESERVE_BYTES)
+            pool = _WorkerPool(self.workers, operation, options, self._governor)
+            yield from pool.run(tasks, self.timeout)
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                initargs=(operation, options)) as executor:
+            future_to_chunk = {executor.submit(task, chunk): chunk for chunk in tasks}
+            for future in as_completed(future_to_chunk):
+                chunk = future_to_chunk[future]
+                try:
+                    yield chunk, future.result()
+                except Exception as e:
+                    yield chunk, e
+    
+    def _memory_budget(self) -> Optional[int]:
+        """Return the byte budget of the process workers, or None for none."""
+        if self.memory_budget == 0:
+            return None
+        if self.memory_budget:
+            return self.memory_budget
+        available = _available_memory()
+        return int(available * self.DEFAULT_MEMORY_FRACTION) if available else None
+    
+    def _quarantine_entry(self, file_path: str, seconds: float,
+                          lost: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Return a file's quarantine entry, or None if it ran within budget.
+        
+        Args:
+            lost: Reason per file whose worker was killed or died on it
+        """
+        reason = lost.get(file_path)
+        if reason is None and self.timeout and seconds > self.timeout:
+            reason = f"took {seconds:.1f}s, over the {self.timeout:g}s budget"
+        if reason is None:
+            return None
+        return {'file': file_path, 'reason': reason, 'seconds': seconds}
+    
+    def _worker_count(self, backend: str) -> int:
+        """Return the number of workers a run on a backend had."""
+        return 1 if backend == 'serial' else self.workers
+    
+    def _run_summary(self, file_paths: List[str], results: List[Dict[str, Any]],
+                     start_time: float, elapsed_time: float, backend: str,
+                     tasks: List[List[Any]], outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the summary fields shared by check and fix runs.
+        
+        Args:
+            start_time: Wall-clock time the run started
+            backend: Backend the run used
+            tasks: The tasks the run was scheduled as
+            outcomes: Results of the tasks that completed
+        """
+        workers = self._worker_count(backend)
+        successful = sum(1 for r in results if r.get('success', False))
+        work_time = sum(outcome['work'] for outcome in outcomes)
+        # Worker time not spent on files: process start-up, task and result
+        # transfer, scheduling and idle workers at the end of the run
+        busy_workers = min(workers, len(tasks))
+        overhead = max(0.0, elapsed_time * busy_workers - work_time)
+        
+        # The tail is the end of the run during which some worker had
+        # nothing left to do; a worker that never got a task idles throughout
+        last_finished = {}
+        for outcome in outcomes:
+            worker = outcome['worker']
+            last_finished[worker] = max(last_finished.get(worker, 0.0), outcome['finished'])
+        end_time = start_time + elapsed_time
+        if len(last_finished) < workers or not last_finished:
+            first_idle = start_time
+        else:
+            first_idle = min(last_finished.values())
+        tail_latency = max(0.0, end_time - first_idle) if outcomes else 0.0
+        
+        capacity = elapsed_time * workers
+        
+        # Peak memory per worker, as reported by the workers; thread and
+        # serial workers share (and report) one process
+        peaks: Dict[Any, int] = {}
+        for outcome in outcomes:
+            if outcome.get('peak_rss') is None:
+                continue
+            key = 0 if backend == 'threads' else outcome['worker']
+            peaks[key] = max(peaks.get(key, 0), outcome['peak_rss'])
+        governor = self._governor if backend == 'processes' else None
+        
+        return {
+            'total_files': len(file_paths),
+            'successful': successful,
+            'failed': len(results) - successful,
+            'elapsed_time': elapsed_time,
+            'files_per_second': len(file_paths) / elapsed_time if elapsed_time > 0 else 0,
+            'workers': workers,
+            'backend': backend,
+            'chunk_size': self.chunk_size_for(len(file_paths)),
+            'chunks': len(tasks),
+            'split_files': len({item[0] for chunk in tasks for item in chunk
+                                if not isinstance(item, str)}),
+            'work_time': work_time,
+            'utilization': min(1.0, work_time / capacity) if capacity > 0 else 0.0,
+            'tail_latency': tail_latency,
+            'overhead_per_file_ms': overhead * 1000 / len(file_paths) if file_paths else 0.0,
+            'worker_peak_memory': [peaks[key] for key in sorted(peaks)],
+            'memory_budget': governor.budget if governor is not None and governor.enabled else None,
+            'memory_throttled': governor.throttled if governor is not None else 0,
+            'workers_recycled': governor.recycled if governor is not None else 0,
+            'workers_stopped': governor.shrunk if governor is not None else 0,
+        }
+    
     def check_files(self, file_paths: List[str], 
                    exclude_patterns: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -49,61 +1208,156 @@ class ParallelMigrationRunner:
         Returns:
             Dictionary with aggregated results
         """
-        print(f"🚀 Starting parallel compatibility check with {self.workers} workers...")
-        print(f"📁 Checking {len(file_paths)} files")
-        
         start_time = time.time()
+        record = self._open_record()
+        stored, pending = self._from_record(record, file_paths)
+        
+        backend, tasks = self._plan('check', [path for path, _ in pending])
+        self._log(f"🚀 Starting compatibility check with {self._describe(backend)}...")
+        self._log(f"📁 Checking {len(file_paths)} files")
+        
+        # Rows of files split into ranges are merged once every range is in
+        ranges_left = {}
+        for chunk in tasks:
+            for item in chunk:
+                if not isinstance(item, str):
+                    ranges_left[item[0]] = ranges_left.get(item[0], 0) + 1
+        split_rows = {}
+        
         results = []
+        issues = IssueStore()
+        outcomes = []
+        timings = {}
+        lost = {}
+        quarantined = []
+        completed = 0
         
-        with ProcessPoolExecutor(max_workers=self.workers) as executor:
-            future_to_file = {
-                executor.submit(self._check_single_file, fp, exclude_patterns): fp 
-                for fp in file_paths
-            }
+        for file_path, result in stored:
+            issues.extend({'file': file_path, **issue} for issue in result['issues'])
+            completed += 1
+            count = len(result['issues'])
+            self._log(f"  [{completed}/{len(file_paths)}] {'✓' if count == 0 else '✗'} "
+                      f"{file_path} {f'({count} issues)' if count else ''}")
+            results.append({'file': file_path, 'success': True, 'issues': count, 'cached': True})
+        
+        fingerprints = dict(pending)
+        options = {'records': record is not None}
+        for chunk, outcome in self._run_chunks('check', tasks, options, backend):
+            if isinstance(outcome, Exception):
+                seconds = outcome.seconds if isinstance(outcome, WorkerLost) else 0.0
+                rows = [(item if isinstance(item, str) else item[0], False, 0, str(outcome), False,
+                         seconds) for item in chunk]
+                if isinstance(outcome, WorkerLost):
+                    lost.update((row[0], outcome.reason) for row in rows)
+            else:
+                rows = outcome['files']
+                issues.extend(outcome['issues'])
+                outcomes.append(outcome)
+                self._store_records(record, fingerprints, outcome.get('records'))
             
-            completed = 0
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-                completed += 1
+            for row in rows:
+                file_path = row[0]
+                if file_path in ranges_left:
+                    split_rows.setdefault(file_path, []).append(row)
+                    ranges_left[file_path] -= 1
+                    if ranges_left[file_path]:
+                        continue
+                    parts = split_rows.pop(file_path)
+                    errors = [part[3] for part in parts if part[3] is not None]
+                    row = (file_path, not errors, sum(part[2] for part in parts),
+                           errors[0] if errors else None, False, sum(part[5] for part in parts))
                 
-                try:
-                    result = future.result()
-                    results.append(result)
-                    
-                    # Progress indicator
-                    status = "✓" if result['issues'] == 0 else "✗"
-                    issues_str = f"({result['issues']} issues)" if result['issues'] > 0 else ""
-                    print(f"  [{completed}/{len(file_paths)}] {status} {file_path} {issues_str}")
-                    
-                except Exception as e:
-                    print(f"  [{completed}/{len(file_paths)}] ✗ {file_path} (ERROR: {e})")
-                    results.append({
-                        'file': file_path,
-                        'success': False,
-                        'issues': 0,
-                        'error': str(e)
-                    })
+                file_path, success, issue_count, error, cached, seconds = row
+                completed += 1
+                entry = self._quarantine_entry(file_path, seconds, lost)
+                if entry is not None:
+                    quarantined.append(entry)
+                    # Scheduled first next time
+                    timings[file_path] = seconds
+                if error is not None:
+                    self._log(f"  [{completed}/{len(file_paths)}] ✗ {file_path} (ERROR: {error})")
+                    results.append({'file': file_path, 'success': False, 'issues': 0, 'error': error})
+                    continue
+                if not cached:
+                    timings[file_path] = seconds
+                # Progress indicator
+                status = "✓" if issue_count == 0 else "✗"
+                issues_str = f"({issue_count} issues)" if issue_count > 0 else ""
+                self._log(f"  [{completed}/{len(file_paths)}] {status} {file_path} {issues_str}")
+                results.append({'file': file_path, 'success': success, 'issues': issue_count,
+                                'cached': cached})
         
         elapsed_time = time.time() - start_time
+        self._save_history('check', timings)
+        if record is not None:
+            record.save()
         
-        # Aggregate results
-        total_issues = sum(r.get('issues', 0) for r in results)
-        successful = sum(1 for r in results if r.get('success', False))
-        failed = len(results) - successful
+        # Issues travel in compact form; expand them per file for the report
+        by_file = issues.group_by_file()
+        for result in results:
+            if result['success']:
+                details = by_file.get(result['file'], [])
+                if result['file'] in ranges_left:
+                    # Ranges complete in any order
+                    details.sort(key=lambda issue: issue['line'])
+                result['issue_details'] = details
         
-        summary = {
-            'total_files': len(file_paths),
-            'successful': successful,
-            'failed': failed,
-            'total_issues': total_issues,
-            'elapsed_time': elapsed_time,
-            'files_per_second': len(file_paths) / elapsed_time if elapsed_time > 0 else 0,
-            'workers': self.workers,
+        self.issues = issues
+        summary = self._run_summary(file_paths, results, start_time, elapsed_time, backend,
+                                    tasks, outcomes)
+        summary.update({
+            'total_issues': sum(r.get('issues', 0) for r in results),
+            'cached': sum(1 for r in results if r.get('cached', False)),
+            'quarantined': quarantined,
             'results': results
-        }
+        })
         
         return summary
     
+    def _open_record(self) -> Optional[VerificationRecord]:
+        """Return the verification record kept in the cache directory, if any."""
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, os.path.basename(VerificationRecord.DEFAULT_PATH))
+        return VerificationRecord(path, Python3CompatibilityVerifier(verbose=False).pattern_fingerprint())
+    
+    @staticmethod
+    def _from_record(record: Optional[VerificationRecord], file_paths: List[str]
+                     ) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[Tuple[str, Any]]]:
+        """Split files into those answered by the record and those to check.
+        
+        Returns:
+            (file, stored result) pairs, and (file, fingerprint) pairs of the
+            files to check (fingerprint None when nothing is to be stored)
+        """
+        if record is None:
+            return [], [(path, None) for path in file_paths]
+        stored = []
+        pending = []
+        for path in file_paths:
+            # Unchanged files are answered from their stat tuple, unread
+            fingerprint = fingerprint_service().get(path, known=record.known_fingerprint)
+            if fingerprint is not None:
+                record.note_file(os.path.abspath(path), fingerprint)
+                result = record.get(fingerprint.digest)
+                if result is not None:
+                    stored.append((path, result))
+                    continue
+            pending.append((path, fingerprint))
+        return stored, pending
+    
+    @staticmethod
+    def _store_records(record: Optional[VerificationRecord], fingerprints: Dict[str, Any],
+                       results: Optional[Dict[str, Dict[str, Any]]]):
+        """Store the workers' results for files that did not change while checked."""
+        if record is None or not results:
+            return
+        for path, result in results.items():
+            before = fingerprints.get(path)
+            after = fingerprint_service().get(path) if before is not None else None
+            if after is not None and after.digest == before.digest:
+                record.put(before.digest, result)
+    
     def fix_files(self, file_paths: List[str], 
                   backup: bool = True,
                   dry_run: bool = False) -> Dict[str, Any]:
@@ -119,120 +1373,156 @@ class ParallelMigrationRunner:
             Dictionary with aggregated results
         """
         action = "Simulating" if dry_run else "Applying"
-        print(f"🚀 {action} fixes in parallel with {self.workers} workers...")
-        print(f"📁 Processing {len(file_paths)} files")
+        backend, tasks = self._plan('fix', file_paths)
+        self._log(f"🚀 {action} fixes with {self._describe(backend)}...")
+        self._log(f"📁 Processing {len(file_paths)} files")
         
         start_time = time.time()
         results = []
+        outcomes = []
+        timings = {}
+        lost = {}
+        quarantined = []
+        completed = 0
         
-        with ProcessPoolExecutor(max_workers=self.workers) as executor:
-            future_to_file = {
-                executor.submit(self._fix_single_file, fp, backup, dry_run): fp 
-                for fp in file_paths
-            }
+        options = {'backup': backup, 'dry_run': dry_run}
+        for chunk, outcome in self._run_chunks('fix', tasks, options, backend):
+            if isinstance(outcome, Exception):
+                seconds = outcome.seconds if isinstance(outcome, WorkerLost) else 0.0
+                rows = [(file_path, False, 0, str(outcome), seconds) for file_path in chunk]
+                if isinstance(outcome, WorkerLost):
+                    lost.update((file_path, outcome.reason) for file_path in chunk)
+            else:
+                rows = outcome['files']
+                outcomes.append(outcome)
             
-            completed = 0
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
+            for file_path, success, fix_count, error, seconds in rows:
                 completed += 1
-                
-                try:
-                    result = future.result()
-                    results.append(result)
-                    
-                    # Progress indicator
-                    status = "✓" if result.get('success', False) else "✗"
-                    fixes_str = f"({result.get('fixes_applied', 0)} fixes)" if result.get('fixes_applied', 0) > 0 else ""
-                    print(f"  [{completed}/{len(file_paths)}] {status} {file_path} {fixes_str}")
-                    
-                except Exception as e:
-                    print(f"  [{completed}/{len(file_paths)}] ✗ {file_path} (ERROR: {e})")
-                    results.append({
-                        'file': file_path,
-                        'success': False,
-                        'fixes_applied': 0,
-                        'error': str(e)
-                    })
+                entry = self._quarantine_entry(file_path, seconds, lost)
+                if entry is not None:
+                    quarantined.append(entry)
+                    # Scheduled first next time
+                    timings[file_path] = seconds
+                if error is not None:
+                    self._log(f"  [{completed}/{len(file_paths)}] ✗ {file_path} (ERROR: {error})")
+                    results.append({'file': file_path, 'success': False,
+                                    'fixes_applied': 0, 'error': error})
+                    continue
+                timings[file_path] = seconds
+                # Progress indicator
+                status = "✓" if success else "✗"
+                fixes_str = f"({fix_count} fixes)" if fix_count > 0 else ""
+                self._log(f"  [{completed}/{len(file_paths)}] {status} {file_path} {fixes_str}")
+                results.append({'file': file_path, 'success': success,
+                                'fixes_applied': fix_count, 'dry_run': dry_run})
         
         elapsed_time = time.time() - start_time
+        self._save_history('fix', timings)
         
-        # Aggregate results
-        total_fixes = sum(r.get('fixes_applied', 0) for r in results)
-        successful = sum(1 for r in results if r.get('success', False))
-        failed = len(results) - successful
-        
-        summary = {
-            'total_files': len(file_paths),
-            'successful': successful,
-            'failed': failed,
-            'total_fixes': total_fixes,
-            'elapsed_time': elapsed_time,
-            'files_per_second': len(file_paths) / elapsed_time if elapsed_time > 0 else 0,
-            'workers': self.workers,
+        summary = self._run_summary(file_paths, results, start_time, elapsed_time, backend,
+                                    tasks, outcomes)
+        summary.update({
+            'total_fixes': sum(r.get('fixes_applied', 0) for r in results),
             'dry_run': dry_run,
+            'quarantined': quarantined,
             'results': results
-        }
+        })
         
         return summary
     
-    @staticmethod
-    def _check_single_file(file_path: str, 
-                          exclude_patterns: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Check a single file for Python 3 compatibility."""
-        try:
-            # Create a verifier instance (it collects issues internally)
-            verifier = Python3CompatibilityVerifier()
-            
-            # Suppress print output by redirecting stdout temporarily
-            import io
-            import contextlib
+    def map_files(self, analyzer: Any, file_paths: List[str]) -> Dict[str, Any]:
+        """
+        Run a per-file analyzer over files in parallel and merge its results.
+        
+        The analyzer declares the two halves of the run:
+        
+        - map_file(path): analyzes one file on a worker and returns a
+          picklable result. It must not rely on changes to the analyzer
+          made by other calls: each process worker has its own copy, and
+          thread workers share one.
+        - reduce_files(results): merges the (path, result) pairs of the
+          files that were analyzed, in the order of file_paths, in this
+          process; whatever it returns is the summary's 'result'.
+        
+        Files are scheduled, timed out and quarantined as in check runs,
+        with their durations recorded under the analyzer's class name.
+        Caching is up to map_file (e.g. through @cached_analysis).
+        
+        Args:
+            analyzer: Object with map_file() and reduce_files(); it is
+                copied to process workers, so it must be picklable where
+                processes are not forked
+            file_paths: Files to analyze
             
-            f = io.StringIO()
-            with contextlib.redirect_stdout(f):
-                verifier.verify_file(file_path)
+        Returns:
+            Dictionary with aggregated results
+        """
+        operation = type(analyzer).__name__
+        backend, tasks = self._plan(operation, file_paths)
+        self._log(f"🚀 Running {operation} with {self._describe(backend)}...")
+        self._log(f"📁 Analyzing {len(file_paths)} files")
+        
+        start_time = time.time()
+        results = []
+        mapped = {}
+        outcomes = []
+        timings = {}
+        lost = {}
+        quarantined = []
+        completed = 0
+        
+        options = {'analyzer': analyzer}
+        for chunk, outcome in self._run_chunks(operation, tasks, options, backend):
+            if isinstance(outcome, Exception):
+                seconds = outcome.seconds if isinstance(outcome, WorkerLost) else 0.0
+                rows = [(file_path, False, None, str(outcome), seconds) for file_path in chunk]
+                if isinstance(outcome, WorkerLost):
+                    lost.update((file_path, outcome.reason) for file_path in chunk)
+            else:
+                rows = outcome['files']
+                outcomes.append(outcome)
             
-            return {
-                'file': file_path,
-                'success': True,
-                'issues': len(verifier.issues_found),
-                'issue_details': verifier.issues_found
-            }
-        except Exception as e:
-            return {
-                'file': file_path,
-                'success': False,
-                'issues': 0,
-                'error': str(e)
-            }
+            for file_path, success, value, error, seconds in rows:
+                completed += 1
+                entry = self._quarantine_entry(file_path, seconds, lost)
+                if entry is not None:
+                    quarantined.append(entry)
+                    # Scheduled first next time
+                    timings[file_path] = seconds
+                if error is not None:
+                    self._log(f"  [{completed}/{len(file_paths)}] ✗ {file_path} (ERROR: {error})")
+                    results.append({'file': file_path, 'success': False, 'error': error})
+                    continue
+                timings[file_path] = seconds
+                mapped[file_path] = value
+                self._log(f"  [{completed}/{len(file_paths)}] ✓ {file_path}")
+                results.append({'file': file_path, 'success': True})
+        
+        elapsed_time = time.time() - start_time
+        self._save_history(operation, timings)
+        
+        # Results arrive as tasks complete; report them in the order given
+        order = {file_path: index for index, file_path in enumerate(file_paths)}
+        results.sort(key=lambda result: order.get(result['file'], len(order)))
+        
+        summary = self._run_summary(file_paths, results, start_time, elapsed_time, backend,
+                                    tasks, outcomes)
+        summary.update({
+            'analyzer': operation,
+            'quarantined': quarantined,
+            'results': results,
+            'result': analyzer.reduce_files([(file_path, mapped[file_path])
+                                             for file_path in file_paths if file_path in mapped]),
+        })
+        
+        return summary
     
-    @staticmethod
-    def _fix_single_file(file_path: str, backup: bool = True, 
-                        dry_run: bool = False) -> Dict[str, Any]:
-        """Fix a single file for Python 3 compatibility."""
-        try:
-            fixer = Python2to3Fixer()
-            
-            # Suppress print output by redirecting stdout temporarily
-            import io
-            import contextlib
-            
-            f = io.StringIO()
-            with contextlib.redirect_stdout(f):
-                result = fixer.fix_file(file_path, dry_run=dry_run)
-            
-            return {
-                'file': file_path,
-                'success': result.get('success', False),
-                'fixes_applied': len(result.get('fixes', [])),
-                'dry_run': dry_run
-            }
-        except Exception as e:
-            return {
-                'file': file_path,
-                'success': False,
-                'fixes_applied': 0,
-                'error': str(e)
-            }
+    def _describe(self, backend: str) -> str:
+        """Describe the workers of a backend for progress output."""
+        if backend == 'serial':
+            return "1 worker (serial)"
+        kind = "threads" if backend == 'threads' else "processes"
+        return f"{self.workers} worker {kind}"
     
     def print_summary(self, summary: Dict[str, Any], operation: str = "check"):
         """Print a formatted summary of the parallel operation."""
@@ -242,7 +1532,13 @@ class ParallelMigrationRunner:
         
         print(f"\n⚙️  Configuration:")
         print(f"   Workers: {summary['workers']}")
+        if 'backend' in summary:
+            print(f"   Backend: {summary['backend']}")
         print(f"   Total files: {summary['total_files']}")
+        if 'chunk_size' in summary:
+            print(f"   Chunk size: {summary['chunk_size']} files ({summary['chunks']} tasks)")
+        if summary.get('split_files'):
+            print(f"   Split into line ranges: {summary['split_files']} files")
         
         print(f"\n📈 Results:")
         print(f"   ✓ Successful: {summary['successful']}")
@@ -250,23 +1546,69 @@ class ParallelMigrationRunner:
         
         if operation == "check":
             print(f"   ⚠️  Total issues: {summary['total_issues']}")
+            if summary.get('cached'):
+                print(f"   ♻️  Reused from cache: {summary['cached']}")
         else:
             print(f"   🔧 Total fixes: {summary['total_fixes']}")
             if summary.get('dry_run'):
                 print(f"   ℹ️  Mode: DRY RUN (no changes made)")
         
+        if summary.get('quarantined'):
+            print(f"\n🚧 Quarantined (crashed or over the per-file time budget):")
+            for entry in summary['quarantined'][:10]:
+                print(f"   {entry['file']}: {entry['reason']}")
+            if len(summary['quarantined']) > 10:
+                print(f"   ... and {len(summary['quarantined']) - 10} more")
+        
+        if summary.get('worker_peak_memory'):
+            peaks = summary['worker_peak_memory']
+            shown = ", ".join(f"{peak / (1024 * 1024):.0f} MB" for peak in peaks[:8])
+            more = f", ... ({len(peaks)} workers)" if len(peaks) > 8 else ""
+            print(f"\n🧠 Memory:")
+            print(f"   Peak per worker: {shown}{more}")
+            if summary.get('memory_budget'):
+                print(f"   Budget: {summary['memory_budget'] / (1024 * 1024):.0f} MB")
+            if summary.get('memory_throttled') or summary.get('workers_recycled'):
+                print(f"   Dispatch throttled {summary['memory_throttled']} time(s); "
+                      f"{summary['workers_stopped']} idle worker(s) stopped, "
+                      f"{summary['workers_recycled']} grown worker(s) replaced")
+        
+        if summary.get('nodes'):
+            print(f"\n🖧  Worker nodes:")
+            for node in summary['nodes']:
+                lost = f" (lost: {node['lost']}; unfinished work requeued)" if node['lost'] else ""
+                print(f"   {node['host']}: {node['workers']} workers, "
+                      f"{node['files']} files{lost}")
+        
         print(f"\n⏱️  Performance:")
         print(f"   Time: {summary['elapsed_time']:.2f}s")
         print(f"   Speed: {summary['files_per_second']:.2f} files/second")
         
-        # Calculate speedup estimate
-        estimated_serial_time = summary['elapsed_time'] * summary['workers']
-        speedup = estimated_serial_time / summary['elapsed_time'] if summary['elapsed_time'] > 0 else 0
-        print(f"   Speedup: ~{speedup:.1f}x faster than serial processing")
+        if 'utilization' in summary:
+            print(f"   Worker utilization: {summary['utilization']:.0%} "
+                  f"(share of the workers' time spent on files)")
+            print(f"   Tail latency: {summary['tail_latency']:.2f}s "
+                  f"(end of the run with idle workers)")
+            print(f"   Overhead: {summary['overhead_per_file_ms']:.2f} ms/file "
+                  f"(start-up, transfer and idle time)")
         
         print("\n" + "=" * 70)
 
 
+def run_analyzer(analyzer: Any, file_paths: List[str], backend: str = 'auto',
+                 workers: Optional[int] = None) -> Dict[str, Any]:
+    """Run an analyzer's map_file/reduce_files over files on a quiet runner.
+    
+    This is how the analyzers' directory methods go parallel; small runs
+    stay in the calling process (see ParallelMigrationRunner.choose_backend).
+    
+    Returns:
+        The map_files() summary; its 'result' is what reduce_files returned
+    """
+    runner = ParallelMigrationRunner(workers=workers, backend=backend, quiet=True)
+    return runner.map_files(analyzer, file_paths)
+
+
 def collect_python_files(directory: str, recursive: bool = True,
                          exclude_patterns: Optional[List[str]] = None) -> List[str]:
     """
@@ -280,23 +1622,12 @@ def collect_python_files(directory: str, recursive: bool = True,
     Returns:
         List of Python file paths
     """
-    python_files = []
     exclude_patterns = exclude_patterns or ['__pycache__', '.git', 'venv', '.venv']
     
     if recursive:
-        for root, dirs, files in os.walk(directory):
-            # Filter out excluded directories
-            dirs[:] = [d for d in dirs if not any(pattern in d for pattern in exclude_patterns)]
-            
-            for file in files:
-                if file.endswith('.py'):
-                    python_files.append(os.path.join(root, file))
-    else:
-        for file in os.listdir(directory):
-            if file.endswith('.py'):
-                python_files.append(os.path.join(directory, file))
-    
-    return sorted(python_files)
+        return list_files(directory, exclude=lambda d: any(pattern in d for pattern in exclude_patterns))
+    return sorted(os.path.join(directory, file) for file in os.listdir(directory)
+                  if file.endswith('.py'))
 
 
 def main():
@@ -322,12 +1653,18 @@ Examples:
   
   # Export results as JSON
   %(prog)s check src/ --json results.json
+  
+  # Spread a check over several hosts: coordinate here, work on each host
+  %(prog)s check src/ --listen 0.0.0.0:7070 --secret S --workers 32
+  %(prog)s worker coordinator-host:7070 --secret S
         """
     )
     
-    parser.add_argument('operation', choices=['check', 'fix'],
-                       help='Operation to perform in parallel')
-    parser.add_argument('path', help='File or directory to process')
+    parser.add_argument('operation', choices=['check', 'fix', 'worker'],
+                       help='Operation to perform in parallel, or worker to run the tasks '
+                            'of a coordinator on this host')
+    parser.add_argument('path', help='File or directory to process '
+                                     '(for worker: the coordinator\'s HOST:PORT)')
     parser.add_argument('--workers', '-w', type=int,
                        help='Number of worker processes (default: CPU count)')
     parser.add_argument('--recursive', '-r', action='store_true', default=True,
@@ -340,9 +1677,43 @@ Examples:
                        help='Export results as JSON to specified file')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Enable verbose output')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Check every file instead of reusing cached results')
+    parser.add_argument('--chunk-size', type=int,
+                       help='Files per worker task (default: adaptive)')
+    parser.add_argument('--backend', choices=ParallelMigrationRunner.BACKENDS, default='auto',
+                       help='Run serially, on threads or on processes (default: auto)')
+    parser.add_argument('--timeout', type=float, default=ParallelMigrationRunner.DEFAULT_TIMEOUT,
+                       help='Seconds allowed per file before it is quarantined (0: no limit)')
+    parser.add_argument('--memory-budget', type=int, metavar='MB',
+                       help='Memory the worker processes may use together '
+                            '(default: 75%% of available memory, 0: no budget)')
+    parser.add_argument('--listen', metavar='HOST:PORT',
+                       help='Coordinate the run: hand the files out to worker nodes '
+                            'connecting to this address')
+    parser.add_argument('--secret',
+                       help='Secret shared by the coordinator and its worker nodes '
+                            '(default: $PY2TO3_CLUSTER_SECRET)')
     
     args = parser.parse_args()
     
+    from cache_manager import CacheManager
+    cache_dir = None if args.no_cache else CacheManager.DEFAULT_CACHE_DIR
+    memory_budget = None if args.memory_budget is None else args.memory_budget * 1024 * 1024
+    if args.operation == 'worker' or args.listen:
+        from distributed_runner import (DistributedMigrationRunner, WorkerNode,
+                                        parse_address, read_secret)
+        try:
+            secret = read_secret(args.secret)
+            address = parse_address(args.path if args.operation == 'worker' else args.listen)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+    
+    if args.operation == 'worker':
+        WorkerNode(address, secret, workers=args.workers, memory_budget=memory_budget).run()
+        return 0
+    
     # Collect files to process
     if os.path.isfile(args.path):
         files = [args.path]
@@ -356,7 +1727,23 @@ Examples:
         return 1
     
     # Create runner
-    runner = ParallelMigrationRunner(workers=args.workers, verbose=args.verbose)
+    if args.listen:
+        runner = DistributedMigrationRunner(
+            address, secret,
+            workers=args.workers, verbose=args.verbose,
+            cache_dir=cache_dir,
+            chunk_size=args.chunk_size,
+            timeout=args.timeout
+        )
+    else:
+        runner = ParallelMigrationRunner(
+            workers=args.workers, verbose=args.verbose,
+            cache_dir=cache_dir,
+            chunk_size=args.chunk_size,
+            backend=args.backend,
+            timeout=args.timeout,
+            memory_budget=memory_budget
+        )
     
     # Execute operation
     if args.operation == 'check':
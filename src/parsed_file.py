@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Parsed File
+
+A shared, parse-once view of a Python source file. The raw bytes, decoded
+text, line offsets, tokens and AST are each computed lazily on first access
+and then reused, so the verifier and the analyzers can hand the same object
+around instead of re-reading and re-parsing the file.
+
+Analyzers accept either a path or a ParsedFile; ParsedFile.coerce() turns a
+path into a ParsedFile through a small per-process registry, so several
+analyzers run in one process share a single parse of each unchanged file.
+The registry is bounded by the size of the files it holds, since each entry
+keeps the content together with its tokens and AST.
+"""
+
+import ast
+import io
+import os
+import threading
+import tokenize
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Union
+
+# Value of ParsedFile._tokens once tokenizing has failed
+_TOKENIZE_FAILED: List[tokenize.TokenInfo] = []
+
+
+class ParsedFile:
+    """Lazily parsed view of one Python source file.
+
+    The AST is shared between consumers and must not be mutated.
+    """
+
+    # Number of parsed files kept by the per-process registry
+    REGISTRY_SIZE = 128
+
+    # Total source bytes kept by the registry; tokens and AST take roughly
+    # ten times the source size on top of it
+    REGISTRY_MAX_BYTES = 8 * 1024 * 1024
+
+    _registry: "OrderedDict[str, ParsedFile]" = OrderedDict()
+    _registry_bytes = 0
+    # Guards the registry, which the thread backend's workers share
+    _registry_lock = threading.Lock()
+
+    # (st_mtime_ns, st_size) of the file when registered
+    _signature = None
+
+    def __init__(self, path: Union[str, Path], source: Optional[Union[str, bytes]] = None):
+        """
+        Args:
+            path: Path of the file (used for reading and in reported results)
+            source: Optional in-memory content (bytes or text) to use instead
+                of reading ``path``
+        """
+        self.path = str(path)
+        # True if the content was given rather than read from ``path``
+        self.in_memory = source is not None
+        self._raw = source if isinstance(source, bytes) else None
+        self._text = source if isinstance(source, str) else None
+        self.encoding = "utf-8"
+        self._lines = None
+        self._line_offsets = None
+        self._tokens = None
+        self._tree = None
+        self._parsed = False
+        self.syntax_error: Optional[Exception] = None
+
+    @classmethod
+    def coerce(cls, target: Union[str, Path, "ParsedFile"]) -> "ParsedFile":
+        """Return ``target`` if it is a ParsedFile, else the shared one for its path."""
+        if isinstance(target, ParsedFile):
+            return target
+        return cls.open(target)
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "ParsedFile":
+        """Return the registry entry for ``path``, creating it if the file changed."""
+        key = os.path.abspath(str(path))
+        try:
+            stat = os.stat(key)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            # Let the first attribute access report the error
+            return cls(path)
+
+        with cls._registry_lock:
+            parsed = cls._registry.get(key)
+            if parsed is not None and parsed.path == str(path) and parsed._signature == signature:
+                cls._registry.move_to_end(key)
+                return parsed
+
+            parsed = cls(path)
+            parsed._signature = signature
+            stale = cls._registry.pop(key, None)
+            if stale is not None:
+                cls._registry_bytes -= stale._signature[1]
+            # A file larger than the whole budget is parsed but not shared
+            if signature[1] > cls.REGISTRY_MAX_BYTES:
+                return parsed
+            cls._registry[key] = parsed
+            cls._registry_bytes += signature[1]
+            while len(cls._registry) > cls.REGISTRY_SIZE or cls._registry_bytes > cls.REGISTRY_MAX_BYTES:
+                _, evicted = cls._registry.popitem(last=False)
+                cls._registry_bytes -= evicted._signature[1]
+            return parsed
+
+    @classmethod
+    def clear_registry(cls):
+        """Drop every shared ParsedFile."""
+        with cls._registry_lock:
+            cls._registry.clear()
+            cls._registry_bytes = 0
+
+    @property
+    def raw(self) -> bytes:
+        """Raw file content."""
+        if self._raw is None:
+            if self._text is not None:
+                self._raw = self._text.encode(self.encoding)
+            else:
+                with open(self.path, "rb") as f:
+                    self._raw = f.read()
+        return self._raw
+
+    @property
+    def text(self) -> str:
+        """Decoded content with universal newlines.
+
+        Decodes as UTF-8 and falls back to latin-1 (recorded in ``encoding``).
+        """
+        if self._text is None:
+            try:
+                text = self.raw.decode("utf-8")
+            except UnicodeDecodeError:
+                text = self.raw.decode("latin-1")
+                self.encoding = "latin-1"
+            if "\r" in text:
+                text = text.replace("\r\n", "\n").replace("\r", "\n")
+            self._text = text
+        return self._text
+
+    @property
+    def lines(self) -> List[str]:
+        """Lines of the decoded text, as returned by str.splitlines()."""
+        if self._lines is None:
+            self._lines = self.text.splitlines()
+        return self._lines
+
+    @property
+    def line_offsets(self) -> List[int]:
+        """Offset in ``text`` at which each newline-separated line starts."""
+        if self._line_offsets is None:
+            text = self.text
+            offsets = [0]
+            pos = text.find("\n")
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = text.find("\n", pos + 1)
+            self._line_offsets = offsets
+        return self._line_offsets
+
+    @property
+    def tokens(self) -> Optional[List[tokenize.TokenInfo]]:
+        """Token stream of the text, or None if it cannot be tokenized."""
+        if self._tokens is None:
+            try:
+                self._tokens = list(tokenize.generate_tokens(io.StringIO(self.text).readline))
+            except (tokenize.TokenError, SyntaxError):
+                # Remembered, so the text is not tokenized again
+                self._tokens = _TOKENIZE_FAILED
+        return None if self._tokens is _TOKENIZE_FAILED else self._tokens
+
+    @property
+    def tree(self) -> Optional[ast.AST]:
+        """Module AST, or None if the text is not valid Python 3.
+
+        The parse error (usually a SyntaxError, or a ValueError for source
+        with null bytes) is kept in ``syntax_error``.
+        """
+        if not self._parsed:
+            try:
+                self._tree = ast.parse(self.text, filename=self.path)
+            except (SyntaxError, ValueError) as e:
+                self.syntax_error = e
+            self._parsed = True
+        return self._tree
+
+    def __repr__(self):
+        return f"ParsedFile({self.path!r})"
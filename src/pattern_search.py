@@ -6,13 +6,16 @@ Search for specific Python 2 patterns in your codebase with context and highligh
 This tool helps identify patterns before migration and track specific issues.
 """
 
-import os
+import io
 import re
 import json
 from pathlib import Path
 from typing import List, Dict, Any, Tuple
 from collections import defaultdict
 
+from literal_prefilter import LiteralPrefilter
+from project_index import list_files
+
 
 class PatternSearcher:
     """Search for Python 2 patterns in codebase."""
@@ -127,6 +130,11 @@ class PatternSearcher:
         self.context_lines = context_lines
         self.results = defaultdict(list)
         self.stats = defaultdict(int)
+        self._compiled = {
+            name: re.compile(info['regex'], re.MULTILINE)
+            for name, info in self.PATTERNS.items()
+        }
+        self._prefilter = LiteralPrefilter(self._compiled)
         
     def search(self, patterns: List[str] = None, include_all: bool = False) -> Dict[str, List[Dict[str, Any]]]:
         """Search for patterns in Python files.
@@ -157,32 +165,29 @@ class PatternSearcher:
     
     def _find_python_files(self) -> List[Path]:
         """Find all Python files in the directory tree."""
-        python_files = []
-        
         if self.root_path.is_file():
             if self.root_path.suffix == '.py':
                 return [self.root_path]
             return []
         
-        for root, dirs, files in os.walk(self.root_path):
-            # Skip common directories
-            dirs[:] = [d for d in dirs if d not in {'.git', '__pycache__', '.tox', 'venv', 'env', 'node_modules', '.eggs'}]
-            
-            for file in files:
-                if file.endswith('.py'):
-                    python_files.append(Path(root) / file)
-        
-        return python_files
+        # Skip common directories
+        skip = {'.git', '__pycache__', '.tox', 'venv', 'env', 'node_modules', '.eggs'}
+        return [Path(path) for path in list_files(self.root_path, exclude=skip)]
     
     def _search_file(self, file_path: Path, patterns: List[str]):
         """Search a single file for patterns."""
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
+                content = f.read()
+            
+            # Skip patterns whose required literal is not in the file
+            active = self._prefilter.candidates(content, patterns)
+            if not active:
+                return
+            lines = io.StringIO(content).readlines()
             
-            for pattern_name in patterns:
-                pattern_info = self.PATTERNS[pattern_name]
-                regex = re.compile(pattern_info['regex'], re.MULTILINE)
+            for pattern_name in active:
+                regex = self._compiled[pattern_name]
                 
                 for line_num, line in enumerate(lines, start=1):
                     matches = regex.finditer(line)
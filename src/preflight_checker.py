@@ -13,6 +13,8 @@ import subprocess
 from pathlib import Path
 from datetime import datetime
 
+from project_index import list_files
+
 
 class PreflightCheck:
     """Represents a single preflight check with its result."""
@@ -54,6 +56,10 @@ class PreflightChecker:
         self.project_path = Path(project_path).resolve()
         self.checks = []
     
+    def _python_files(self, skip=('venv', 'env', '__pycache__')):
+        """List the project's Python files, skipping hidden directories and ``skip``."""
+        return list_files(self.project_path, exclude=lambda d: d.startswith('.') or d in skip)
+    
     def run_all_checks(self, backup_dir='backup'):
         """Run all preflight checks.
         
@@ -254,15 +260,12 @@ class PreflightChecker:
             
             # Estimate project size
             project_size = 0
-            for root, dirs, files in os.walk(self.project_path):
-                # Skip hidden dirs and common large directories
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['venv', 'env', 'node_modules', '__pycache__']]
-                for file in files:
-                    if file.endswith('.py'):
-                        try:
-                            project_size += os.path.getsize(os.path.join(root, file))
-                        except OSError:
-                            pass
+            # Skip hidden dirs and common large directories
+            for file_path in self._python_files(skip=('venv', 'env', 'node_modules', '__pycache__')):
+                try:
+                    project_size += os.path.getsize(file_path)
+                except OSError:
+                    pass
             
             project_size_mb = project_size / (1024**2)
             
@@ -346,20 +349,9 @@ class PreflightChecker:
     
     def _check_file_permissions(self):
         """Check if Python files are writable."""
-        python_files = []
-        unwritable = []
-        
-        for root, dirs, files in os.walk(self.project_path):
-            # Skip hidden and virtual environment directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['venv', 'env', '__pycache__']]
-            
-            for file in files:
-                if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    python_files.append(file_path)
-                    
-                    if not os.access(file_path, os.W_OK):
-                        unwritable.append(file_path)
+        python_files = self._python_files()
+        unwritable = [file_path for file_path in python_files
+                      if not os.access(file_path, os.W_OK)]
         
         if unwritable:
             return PreflightCheck(
@@ -399,26 +391,18 @@ class PreflightChecker:
     
     def _check_python_files(self):
         """Check for Python files and estimate migration scope."""
-        python_files = []
+        python_files = self._python_files()
         py2_indicators = 0
         
-        for root, dirs, files in os.walk(self.project_path):
-            # Skip hidden and virtual environment directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['venv', 'env', '__pycache__']]
-            
-            for file in files:
-                if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    python_files.append(file_path)
-                    
-                    # Quick scan for Python 2 indicators
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read(10000)  # Read first 10KB
-                            if any(indicator in content for indicator in ['print ', 'import urllib2', 'from __future__ import', 'basestring', '.iteritems()']):
-                                py2_indicators += 1
-                    except Exception:
-                        pass
+        for file_path in python_files:
+            # Quick scan for Python 2 indicators
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read(10000)  # Read first 10KB
+                    if any(indicator in content for indicator in ['print ', 'import urllib2', 'from __future__ import', 'basestring', '.iteritems()']):
+                        py2_indicators += 1
+            except Exception:
+                pass
         
         if not python_files:
             return PreflightCheck(
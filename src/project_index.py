@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Project File Index
+
+One listing of a project's files, shared by the tools that scan it. The
+checkers, fixers and analyzers ask the ProjectFileIndex for their files
+instead of each walking the tree, and filter the shared listing with their
+own name patterns and excluded directories:
+
+- inside a git work tree the listing comes from ``git ls-files`` (tracked
+  files plus untracked ones not ignored by .gitignore, minus deleted ones),
+  and nested repositories and submodules, which git does not look into,
+  are walked as below;
+- elsewhere the tree is walked with os.scandir, skipping PRUNED_DIRS and the
+  paths matched by the .gitignore files found on the way.
+
+A listing records the mtime of each directory it covers. Adding, removing or
+renaming a file changes its directory's mtime, so a listing is reused while
+those mtimes (and those of the .gitignore files) are unchanged: checking
+them costs a stat per directory instead of reading every directory. As in
+the FingerprintService, directories modified within RACY_WINDOW_NS of being
+listed are not trusted, and such listings are rebuilt on the next lookup.
+
+With enable_index_persistence() (the CLI does this unless ``--no-cache`` is
+given) listings are also kept in the cache directory, so separate commands
+run over the same tree, such as the steps of ``ci_helper.py full-check``,
+reuse the first command's listing.
+"""
+
+import fnmatch
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+# Directories never listed, whatever the ignore files say
+PRUNED_DIRS = frozenset({'.git', '.hg', '.svn', '__pycache__'})
+
+INDEX_FILE = 'file_index.json'
+
+# At most this many roots are kept in the persisted index file
+MAX_PERSISTED_ROOTS = 16
+
+# A collection of directory names to skip, or a predicate on a directory name
+Exclude = Union[Iterable[str], Callable[[str], bool], None]
+
+
+def _translate(pattern: str) -> str:
+    """Translate a .gitignore glob into a regular expression."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            chars = pattern[i + 1:end].replace('\\', '\\\\')
+            if chars.startswith('!'):
+                chars = '^' + chars[1:]
+            parts.append('[' + chars + ']')
+            i = end + 1
+        else:
+            if pattern[i] == '\\' and i + 1 < len(pattern):
+                i += 1
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(parts) + r'\Z'
+
+
+class _IgnoreRule:
+    """One pattern line of a .gitignore file."""
+
+    def __init__(self, base: str, line: str):
+        self.base = base
+        self.negate = line.startswith('!')
+        if self.negate:
+            line = line[1:]
+        self.dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        # A pattern containing a slash is relative to the .gitignore's directory
+        self.anchored = '/' in line
+        self.regex = re.compile(_translate(line.lstrip('/')))
+
+    def matches(self, rel: str, name: str, is_dir: bool) -> bool:
+        """Tell whether the rule matches ``rel`` (a '/'-separated path)."""
+        if self.dir_only and not is_dir:
+            return False
+        if not self.anchored:
+            return bool(self.regex.match(name))
+        if self.base:
+            if not rel.startswith(self.base + '/'):
+                return False
+            rel = rel[len(self.base) + 1:]
+        return bool(self.regex.match(rel))
+
+
+def _read_ignore_file(path: str, base: str) -> List[_IgnoreRule]:
+    """Parse the rules of the .gitignore at ``path`` (its directory is ``base``)."""
+    rules = []
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.rstrip('\n').rstrip()
+                if line and not line.startswith('#'):
+                    rules.append(_IgnoreRule(base, line))
+    except OSError:
+        pass
+    return rules
+
+
+def _ignored(rules: List[_IgnoreRule], rel: str, name: str, is_dir: bool) -> bool:
+    """Apply ``rules`` in order; the last matching rule decides."""
+    ignored = False
+    for rule in rules:
+        if ignored == rule.negate and rule.matches(rel, name, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+class ProjectFileIndex:
+    """Listing of the files under a directory, reused while it is unchanged."""
+
+    # Directories modified this close to being listed are listed again next time
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self, root: str, use_git: bool = True, cache_dir: Optional[str] = None):
+        """Set up an index of ``root``; nothing is read until it is used.
+
+        Args:
+            root: Directory to index
+            use_git: Take the listing from ``git ls-files`` inside a work tree
+            cache_dir: Directory where listings are persisted (None: not persisted)
+        """
+        self.root = os.path.realpath(root)
+        self.use_git = use_git
+        self.cache_dir = cache_dir
+        self.source: Optional[str] = None
+        self.listings = 0
+        self.updates = 0
+        self.reuses = 0
+        self._files: Optional[List[str]] = None
+        self._dirs: Dict[str, int] = {}
+        self._ignores: Dict[str, int] = {}
+        self._listed_ns = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # Listing ---------------------------------------------------------------
+
+    def _git_listing(self) -> Optional[Tuple[List[str], List[str]]]:
+        """List the work tree with git, or return None outside a work tree.
+
+        Returns:
+            The listed files, and the directories git does not look into
+            (nested repositories and submodules), which are to be scanned
+        """
+        try:
+            result = subprocess.run(
+                ['git', '-C', self.root, 'ls-files', '-z', '-t', '--stage',
+                 '--cached', '--others', '--deleted', '--exclude-standard'],
+                capture_output=True, timeout=60
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if result.returncode != 0:
+            return None
+        files = set()
+        deleted = set()
+        dirs = set()
+        for entry in result.stdout.split(b'\0'):
+            if not entry:
+                continue
+            entry = entry.decode('utf-8', 'surrogateescape')
+            tag, rel = entry[0], entry[2:]
+            mode = None
+            if tag != '?':
+                # '<mode> <object> <stage>\t<path>' for index entries
+                stage, rel = rel.split('\t', 1)
+                mode = stage.split(' ', 1)[0]
+            if tag == 'R':
+                # Tracked files deleted from the work tree are listed twice
+                deleted.add(rel)
+            elif rel.endswith('/') or mode == '160000':
+                # An untracked nested repository, or a submodule
+                dirs.add(rel.rstrip('/'))
+            else:
+                files.add(rel)
+        files -= deleted
+        if os.sep != '/':
+            files = {rel.replace('/', os.sep) for rel in files}
+            dirs = {rel.replace('/', os.sep) for rel in dirs}
+        return (sorted(rel for rel in files if not PRUNED_DIRS.intersection(rel.split(os.sep)[:-1])),
+                sorted(rel for rel in dirs if not PRUNED_DIRS.intersection(rel.split(os.sep))))
+
+    def _scan(self, files: List[str], start: str = '', rules: Optional[List[_IgnoreRule]] = None,
+              known: Optional[Dict[str, int]] = None) -> bool:
+        """Walk from ``start`` with os.scandir, applying the .gitignore files found.
+
+        Files are added to ``files`` and directory mtimes recorded. Directories
+        in ``known`` are already listed and not entered. Returns False if a
+        known directory gained a .gitignore, which needs a full listing.
+        """
+        stack: List[Tuple[str, List[_IgnoreRule]]] = [(start, rules or [])]
+        while stack:
+            rel_dir, rules = stack.pop()
+            path = os.path.join(self.root, rel_dir) if rel_dir else self.root
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            if any(entry.name == '.gitignore' for entry in entries):
+                ignore_rel = os.path.join(rel_dir, '.gitignore')
+                if known and ignore_rel not in self._ignores:
+                    return False
+                try:
+                    self._ignores[ignore_rel] = os.stat(os.path.join(self.root, ignore_rel)).st_mtime_ns
+                except OSError:
+                    pass
+                rules = rules + _read_ignore_file(os.path.join(path, '.gitignore'),
+                                                  rel_dir.replace(os.sep, '/'))
+            for entry in entries:
+                rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if is_dir and (entry.name in PRUNED_DIRS or (known and rel in known)):
+                    continue
+                if rules and _ignored(rules, rel.replace(os.sep, '/'), entry.name, is_dir):
+                    continue
+                if is_dir:
+                    stack.append((rel, rules))
+                else:
+                    files.append(rel)
+            self._dirs[rel_dir] = mtime_ns
+        return True
+
+    def _rules_above(self, rel_dir: str) -> List[_IgnoreRule]:
+        """Collect the ignore rules of the directories enclosing ``rel_dir``."""
+        rules = []
+        ancestors = []
+        head = rel_dir
+        while head:
+            head = os.path.dirname(head)
+            ancestors.append(head)
+        for ancestor in reversed(ancestors):
+            ignore_rel = os.path.join(ancestor, '.gitignore')
+            if ignore_rel in self._ignores:
+                rules += _read_ignore_file(os.path.join(self.root, ignore_rel),
+                                           ancestor.replace(os.sep, '/'))
+        return rules
+
+    def _record_dirs(self, files: List[str]):
+        """Record the mtimes of the directories holding the git-listed files."""
+        dirs = {''}
+        for rel in files:
+            head = os.path.dirname(rel)
+            while head and head not in dirs:
+                dirs.add(head)
+                head = os.path.dirname(head)
+        for rel_dir in dirs:
+            try:
+                self._dirs[rel_dir] = os.stat(os.path.join(self.root, rel_dir)).st_mtime_ns
+            except OSError:
+                pass
+        for rel in files:
+            if os.path.basename(rel) == '.gitignore':
+                try:
+                    self._ignores[rel] = os.stat(os.path.join(self.root, rel)).st_mtime_ns
+                except OSError:
+                    pass
+
+    def _list(self):
+        """Build the listing from scratch."""
+        self._dirs = {}
+        self._ignores = {}
+        listed = self._git_listing() if self.use_git else None
+        if listed and (listed[0] or listed[1]):
+            files, nested = listed
+            self.source = 'git'
+            self._record_dirs(files + nested)
+            for rel_dir in nested:
+                self._scan(files, rel_dir, self._rules_above(rel_dir))
+            files.sort()
+        else:
+            # An empty git listing may mean the root itself is ignored
+            self.source = 'scan'
+            files = []
+            self._scan(files)
+            files.sort()
+        self._files = files
+        self.listings += 1
+
+    def _update(self, changed: List[str]) -> bool:
+        """Rescan the ``changed`` directories of a scanned listing.
+
+        Only the entries of each changed directory are read again (a new
+        subdirectory is walked); the rest of the listing is kept. Returns
+        False if a full listing is needed instead.
+        """
+        gone = [rel for rel in changed if not os.path.isdir(os.path.join(self.root, rel))]
+        if '' in gone:
+            return False
+        changed = set(changed)
+        gone = set(gone)
+        drop = tuple(rel + os.sep for rel in gone)
+        files = [rel for rel in self._files
+                 if os.path.dirname(rel) not in changed and not rel.startswith(drop)]
+        for rel in list(self._dirs):
+            if rel in gone or rel.startswith(drop):
+                del self._dirs[rel]
+        for rel_dir in sorted(changed.difference(gone)):
+            if not self._scan(files, rel_dir, self._rules_above(rel_dir), self._dirs):
+                return False
+        files.sort()
+        self._files = files
+        self.updates += 1
+        return True
+
+    def _changed_dirs(self) -> Optional[List[str]]:
+        """Return the directories changed since the listing, or None to list again.
+
+        Directories recorded within RACY_WINDOW_NS of the listing time could
+        have changed since without their mtime moving, so they count as changed.
+        """
+        racy = self._listed_ns - self.RACY_WINDOW_NS
+        for rel, mtime_ns in self._ignores.items():
+            try:
+                if mtime_ns >= racy or os.stat(os.path.join(self.root, rel)).st_mtime_ns != mtime_ns:
+                    return None
+            except OSError:
+                return None
+        changed = []
+        for rel, mtime_ns in self._dirs.items():
+            try:
+                if mtime_ns >= racy or os.stat(os.path.join(self.root, rel)).st_mtime_ns != mtime_ns:
+                    changed.append(rel)
+            except OSError:
+                changed.append(rel)
+        return changed
+
+    def listing(self) -> List[str]:
+        """Return the sorted paths of all indexed files, relative to the root."""
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                self._load()
+            started = time.time_ns()
+            changed = self._changed_dirs() if self._files is not None else None
+            if changed == []:
+                self.reuses += 1
+                return self._files
+            if changed is None or self.source == 'git' or not self._update(changed):
+                self._list()
+            self._listed_ns = started
+            self._save()
+            return self._files
+
+    def covers(self, directory: str) -> bool:
+        """Tell whether ``directory`` is a listed directory of this index."""
+        rel = os.path.relpath(os.path.realpath(directory), self.root)
+        if rel == '.':
+            return True
+        if rel.startswith(os.pardir):
+            return False
+        self.listing()
+        return rel in self._dirs
+
+    # Persistence -----------------------------------------------------------
+
+    def _index_path(self) -> Optional[str]:
+        return os.path.join(self.cache_dir, INDEX_FILE) if self.cache_dir else None
+
+    def _read_index(self) -> Dict:
+        path = self._index_path()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self):
+        """Take the persisted listing of this root, if there is one."""
+        if not self.cache_dir:
+            return
+        entry = self._read_index().get(self.root)
+        if not entry or entry.get('use_git') != self.use_git:
+            return
+        self.source = entry['source']
+        self._files = entry['files']
+        self._dirs = entry['dirs']
+        self._ignores = entry['ignores']
+        self._listed_ns = entry['listed_ns']
+
+    def _save(self):
+        """Persist the listing; the index file keeps the most recent roots."""
+        path = self._index_path()
+        if not path:
+            return
+        index = self._read_index()
+        index.pop(self.root, None)
+        index[self.root] = {
+            'use_git': self.use_git, 'source': self.source, 'files': self._files,
+            'dirs': self._dirs, 'ignores': self._ignores, 'listed_ns': self._listed_ns,
+        }
+        while len(index) > MAX_PERSISTED_ROOTS:
+            index.pop(next(iter(index)))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = '%s.%d.tmp' % (path, os.getpid())
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(temp_path, path)
+        except OSError:
+            pass
+
+    # Queries ---------------------------------------------------------------
+
+    def files(self, directory: Optional[str] = None, pattern: Union[str, Iterable[str], None] = '*.py',
+              exclude: Exclude = None) -> List[str]:
+        """Return the files under ``directory`` whose names match ``pattern``.
+
+        Args:
+            directory: Directory inside the root (default: the root); returned
+                paths are joined to it as given, like os.walk's
+            pattern: Glob (or globs) for file names; None matches every file
+            exclude: Directory names to skip, or a predicate on a directory name;
+                files below a skipped directory are left out
+
+        Returns:
+            Sorted list of file paths
+        """
+        directory = self.root if directory is None else os.fspath(directory)
+        sub = os.path.relpath(os.path.realpath(directory), self.root)
+        prefix = '' if sub == '.' else sub + os.sep
+        if pattern is None:
+            patterns = None
+        else:
+            patterns = (pattern,) if isinstance(pattern, str) else tuple(pattern)
+        if exclude is None or callable(exclude):
+            skip = exclude
+        else:
+            names = frozenset(exclude)
+            skip = names.__contains__
+        skipped: Dict[str, bool] = {}
+
+        def is_skipped(head: str) -> bool:
+            if head not in skipped:
+                parent, _, name = head.rpartition(os.sep)
+                skipped[head] = (bool(parent) and is_skipped(parent)) or skip(name)
+            return skipped[head]
+
+        found = []
+        for rel in self.listing():
+            if not rel.startswith(prefix):
+                continue
+            tail = rel[len(prefix):]
+            head, _, name = tail.rpartition(os.sep)
+            if patterns is not None and not any(fnmatch.fnmatchcase(name, p) for p in patterns):
+                continue
+            if head and skip is not None and is_skipped(head):
+                continue
+            found.append(os.path.join(directory, tail))
+        return found
+
+
+_lock = threading.Lock()
+_indexes: Dict[str, ProjectFileIndex] = {}
+_cache_dir: Optional[str] = None
+
+
+def enable_index_persistence(cache_dir: Optional[str] = None):
+    """Persist listings in ``cache_dir`` (default: the CacheManager's directory)."""
+    global _cache_dir
+    if cache_dir is None:
+        from cache_manager import CacheManager
+
+        cache_dir = CacheManager.DEFAULT_CACHE_DIR
+    with _lock:
+        _cache_dir = cache_dir
+        _indexes.clear()
+
+
+def disable_index_persistence():
+    """Keep listings in this process only."""
+    global _cache_dir
+    with _lock:
+        _cache_dir = None
+        _indexes.clear()
+
+
+def project_index(directory: str) -> ProjectFileIndex:
+    """Return the process-wide index covering ``directory``.
+
+    The index of an enclosing directory is reused when it lists
+    ``directory``; otherwise an index rooted at ``directory`` is created.
+    """
+    root = os.path.realpath(directory)
+    with _lock:
+        index = _indexes.get(root)
+        if index is None:
+            for candidate in list(_indexes.values()):
+                if root.startswith(candidate.root.rstrip(os.sep) + os.sep) and candidate.covers(root):
+                    return candidate
+            index = _indexes[root] = ProjectFileIndex(root, cache_dir=_cache_dir)
+    return index
+
+
+def list_files(directory: str, pattern: Union[str, Iterable[str], None] = '*.py',
+               exclude: Exclude = None) -> List[str]:
+    """List the files under ``directory`` from the shared project index.
+
+    See ProjectFileIndex.files() for the arguments.
+    """
+    return project_index(directory).files(directory, pattern=pattern, exclude=exclude)
@@ -14,6 +14,8 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+from project_index import list_files
+
 
 class ReadinessChecker:
     """Comprehensive migration readiness and safety assessment."""
@@ -25,7 +27,13 @@ class ReadinessChecker:
         self.max_score = 0
         self.recommendations = []
         self.warnings = []
-        
+
+    def _python_files(self) -> List[Path]:
+        """List the project's Python files from the shared project index."""
+        if not self.root_path.is_dir():
+            return []
+        return [Path(path) for path in list_files(self.root_path)]
+
     def assess_pre_migration_readiness(self) -> Dict:
         """Assess if project is ready to start migration."""
         print("🔍 Assessing Pre-Migration Readiness...\n")
@@ -420,7 +428,7 @@ class ReadinessChecker:
     
     def _check_no_syntax_errors(self, results: Dict):
         """Check for Python syntax errors."""
-        python_files = list(self.root_path.rglob("*.py"))
+        python_files = self._python_files()
         syntax_errors = []
         
         for py_file in python_files[:20]:  # Check first 20 files
@@ -456,7 +464,7 @@ class ReadinessChecker:
                 passed = "error" not in result.stdout.lower() or "0 issues" in result.stdout.lower()
             else:
                 # Basic check: can files be compiled with Python 3?
-                python_files = list(self.root_path.rglob("*.py"))[:10]
+                python_files = self._python_files()[:10]
                 errors = 0
                 for py_file in python_files:
                     try:
@@ -480,7 +488,7 @@ class ReadinessChecker:
     
     def _check_no_python2_imports(self, results: Dict):
         """Check for Python 2 specific imports."""
-        python_files = list(self.root_path.rglob("*.py"))
+        python_files = self._python_files()
         py2_imports = []
         
         py2_modules = ['__builtin__', 'urllib2', 'urlparse', 'ConfigParser', 
@@ -506,7 +514,7 @@ class ReadinessChecker:
     
     def _check_no_python2_syntax(self, results: Dict):
         """Check for Python 2 specific syntax."""
-        python_files = list(self.root_path.rglob("*.py"))
+        python_files = self._python_files()
         py2_syntax = []
         
         patterns = ['print ', 'except ', ', e:', 'xrange(', '.iteritems()', 
@@ -639,7 +647,7 @@ class ReadinessChecker:
     
     def _check_type_hints_added(self, results: Dict):
         """Check if type hints were added."""
-        python_files = list(self.root_path.rglob("*.py"))
+        python_files = self._python_files()
         files_with_hints = 0
         
         for py_file in python_files[:20]:
@@ -660,7 +668,7 @@ class ReadinessChecker:
     
     def _check_modernization_complete(self, results: Dict):
         """Check if code uses modern Python 3 features."""
-        python_files = list(self.root_path.rglob("*.py"))
+        python_files = self._python_files()
         modern_features = 0
         
         for py_file in python_files[:20]:
@@ -86,9 +86,14 @@ class MigrationReportCard:
             float: Score from 0-100
         """
         try:
+            from analysis_cache import active_cache
             from verifier import Python3CompatibilityVerifier
             
             verifier = Python3CompatibilityVerifier()
+            cache = active_cache()
+            if cache is not None:
+                # Unchanged files are answered from the incremental record
+                verifier.open_record(os.path.join(cache.cache_dir, 'verification_record.json'))
             
             # Count Python files
             py_files = list(self.project_path.rglob('*.py'))
@@ -109,6 +114,7 @@ class MigrationReportCard:
                         verifier.verify_file(str(file))
                     except:
                         pass
+            verifier.save_record()
             
             issues = verifier.issues_found
             
@@ -23,6 +23,8 @@ class MigrationReportGenerator:
             'statistics': defaultdict(int),
             'errors': []
         }
+        # Verifier IssueStores added with add_issues(), rendered lazily
+        self.issue_stores = []
 
     def add_fix(self, file_path, fix_type, description, line_number=None, 
                 before_code=None, after_code=None):
@@ -52,6 +54,37 @@ class MigrationReportGenerator:
         })
         self.report_data['statistics'][f'{severity}_count'] += 1
 
+    def add_issues(self, issues):
+        """Add every issue of a verifier IssueStore to the report.
+
+        The store is kept as is; its issues are only converted to report
+        entries while the report is rendered or exported.
+        """
+        self.issue_stores.append(issues)
+        for severity, count in issues.severity_counts().items():
+            self.report_data['statistics'][f'{severity}_count'] += count
+
+    def _issue_count(self):
+        """Return the number of issues, including those in issue stores."""
+        return len(self.report_data['issues_found']) + sum(len(store) for store in self.issue_stores)
+
+    def _iter_issues(self, severity=None):
+        """Yield report issue entries, optionally only of one severity."""
+        for issue in self.report_data['issues_found']:
+            if severity is None or issue['severity'] == severity:
+                yield issue
+        for store in self.issue_stores:
+            for issue in store.rows(severity=severity):
+                yield {
+                    'file': issue['file'],
+                    'type': issue['issue'],
+                    'description': issue['description'],
+                    'severity': issue['severity'],
+                    'line': issue.get('line'),
+                    'code': issue.get('code'),
+                    'suggestion': issue.get('suggestion')
+                }
+
     def add_error(self, file_path, error_message):
         """Add an error to the report."""
         self.report_data['errors'].append({
@@ -109,7 +142,7 @@ class MigrationReportGenerator:
     def _build_summary(self):
         """Build the summary section."""
         total_fixes = len(self.report_data['fixes_applied'])
-        total_issues = len(self.report_data['issues_found'])
+        total_issues = self._issue_count()
         total_errors = len(self.report_data['errors'])
         files_processed = self.report_data['files_processed']
         
@@ -282,9 +315,7 @@ class MigrationReportGenerator:
 
     def _build_issues_section(self):
         """Build the issues section."""
-        issues = self.report_data['issues_found']
-        
-        if not issues:
+        if not self._issue_count():
             return """
             <section class="issues">
                 <h2>⚠️ Remaining Issues</h2>
@@ -292,8 +323,8 @@ class MigrationReportGenerator:
             </section>"""
         
         # Group issues by severity
-        errors = [i for i in issues if i['severity'] == 'error']
-        warnings = [i for i in issues if i['severity'] == 'warning']
+        errors = list(self._iter_issues('error'))
+        warnings = list(self._iter_issues('warning'))
         
         issues_html = []
         
@@ -908,14 +939,14 @@ class MigrationReportGenerator:
             'timestamp': self.report_data['timestamp'].isoformat(),
             'files_processed': self.report_data['files_processed'],
             'total_fixes': len(self.report_data['fixes_applied']),
-            'total_issues': len(self.report_data['issues_found']),
+            'total_issues': self._issue_count(),
             'total_errors': len(self.report_data['errors']),
             'statistics': dict(self.report_data['statistics']),
             'fixes_applied': [
                 {**fix, 'timestamp': fix['timestamp'].isoformat()}
                 for fix in self.report_data['fixes_applied']
             ],
-            'issues_found': self.report_data['issues_found'],
+            'issues_found': list(self._iter_issues()),
             'errors': [
                 {**error, 'timestamp': error['timestamp'].isoformat()}
                 for error in self.report_data['errors']
@@ -20,6 +20,8 @@ from pathlib import Path
 from typing import List, Dict, Any, Tuple
 from collections import defaultdict
 
+from analysis_cache import cached_analysis
+
 
 class SecurityIssue:
     """Represents a security issue found in code"""
@@ -203,6 +205,15 @@ class SecurityAuditor:
     
     def audit_file(self, filepath: str) -> List[SecurityIssue]:
         """Audit a single Python file for security issues"""
+        issues = self._audit_file(filepath)
+        for issue in issues:
+            self.stats[issue.category] += 1
+            self.stats[f'severity_{issue.severity}'] += 1
+        return issues
+    
+    @cached_analysis(version="1", config=("patterns",))
+    def _audit_file(self, filepath: str) -> List[SecurityIssue]:
+        """Find the security issues in one file (without counting them)"""
         issues = []
         
         try:
@@ -225,8 +236,6 @@ class SecurityAuditor:
                                 remediation=pattern_info['remediation']
                             )
                             issues.append(issue)
-                            self.stats[category] += 1
-                            self.stats[f'severity_{pattern_info["severity"]}'] += 1
             
             # AST-based checks for more complex patterns
             try:
@@ -265,8 +274,6 @@ class SecurityAuditor:
                                         remediation='Use environment variables or a secrets management system'
                                     )
                                     issues.append(issue)
-                                    self.stats['secrets'] += 1
-                                    self.stats['severity_CRITICAL'] += 1
             
             # Check for unsafe deserialization
             if isinstance(node, ast.Call):
@@ -283,17 +290,15 @@ class SecurityAuditor:
                                 remediation='Avoid deserializing untrusted data. Use JSON for safe data exchange'
                             )
                             issues.append(issue)
-                            self.stats['deserialization'] += 1
-                            self.stats['severity_HIGH'] += 1
         
         return issues
     
     def audit_directory(self, directory: str, exclude_patterns: List[str] = None) -> List[SecurityIssue]:
-        """Audit all Python files in a directory"""
+        """Audit all Python files in a directory (in parallel, if worth it)"""
         if exclude_patterns is None:
             exclude_patterns = ['venv', '__pycache__', '.git', 'node_modules', 'tests']
         
-        all_issues = []
+        python_files = []
         
         for root, dirs, files in os.walk(directory):
             # Filter out excluded directories
@@ -301,14 +306,31 @@ class SecurityAuditor:
             
             for file in files:
                 if file.endswith('.py'):
-                    filepath = os.path.join(root, file)
-                    if self.verbose:
-                        print(f"Auditing: {filepath}")
-                    issues = self.audit_file(filepath)
-                    all_issues.extend(issues)
+                    python_files.append(os.path.join(root, file))
         
-        self.issues = all_issues
-        return all_issues
+        from parallel_runner import run_analyzer
+        summary = run_analyzer(self, python_files)
+        if self.verbose:
+            for result in summary['results']:
+                if not result['success']:
+                    print(f"Error auditing {result['file']}: {result['error']}")
+        return summary['result']
+    
+    def map_file(self, filepath: str) -> List[SecurityIssue]:
+        """Audit one file of a parallel run (see parallel_runner.run_analyzer)"""
+        if self.verbose:
+            print(f"Auditing: {filepath}")
+        return self._audit_file(filepath)
+    
+    def reduce_files(self, results: List[Tuple[str, List[SecurityIssue]]]) -> List[SecurityIssue]:
+        """Collect and count the issues of a parallel run's files, in file order"""
+        self.issues = []
+        for _, issues in results:
+            for issue in issues:
+                self.stats[issue.category] += 1
+                self.stats[f'severity_{issue.severity}'] += 1
+            self.issues.extend(issues)
+        return self.issues
     
     def generate_report(self, output_format: str = 'text') -> str:
         """Generate security audit report"""
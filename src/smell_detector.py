@@ -12,7 +12,10 @@ import os
 import re
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+from analysis_cache import cached_analysis
+from parsed_file import ParsedFile
 
 
 @dataclass
@@ -37,17 +40,20 @@ class CodeSmellDetector:
         self.max_nesting = max_nesting
         self.smells: List[CodeSmell] = []
         
-    def analyze_file(self, filepath: str) -> List[CodeSmell]:
-        """Analyze a single Python file for code smells."""
+    @cached_analysis(version="1", config=("max_function_length", "max_parameters", "max_nesting"))
+    def analyze_file(self, filepath) -> List[CodeSmell]:
+        """Analyze a single Python file (path or ParsedFile) for code smells."""
+        parsed = ParsedFile.coerce(filepath)
+        filepath = parsed.path
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-                lines = content.splitlines()
+            lines = parsed.lines
             
             # Parse the AST
-            try:
-                tree = ast.parse(content, filename=filepath)
-            except SyntaxError as e:
+            tree = parsed.tree
+            if tree is None:
+                e = parsed.syntax_error
+                if not isinstance(e, SyntaxError):
+                    raise e
                 return [CodeSmell(
                     category='syntax',
                     severity='high',
@@ -86,8 +92,8 @@ class CodeSmellDetector:
             )]
     
     def analyze_directory(self, directory: str, recursive: bool = True) -> List[CodeSmell]:
-        """Analyze all Python files in a directory."""
-        all_smells = []
+        """Analyze all Python files in a directory (in parallel, if worth it)."""
+        python_files = []
         
         for root, dirs, files in os.walk(directory):
             # Skip hidden directories and common exclusions
@@ -95,14 +101,38 @@ class CodeSmellDetector:
             
             for file in files:
                 if file.endswith('.py'):
-                    filepath = os.path.join(root, file)
-                    all_smells.extend(self.analyze_file(filepath))
+                    python_files.append(os.path.join(root, file))
             
             if not recursive:
                 break
         
-        self.smells = all_smells
-        return all_smells
+        from parallel_runner import run_analyzer
+        summary = run_analyzer(self, python_files)
+        for result in summary['results']:
+            if not result['success']:
+                # Crashed or timed out on a worker
+                self.smells.append(CodeSmell(
+                    category='error',
+                    severity='high',
+                    file=result['file'],
+                    line=0,
+                    column=0,
+                    message=f"Error analyzing file: {result['error']}",
+                    suggestion='Check if the file is valid Python code'
+                ))
+        # Each error in its file's place, as a serial run reports it
+        order = {path: index for index, path in enumerate(python_files)}
+        self.smells.sort(key=lambda smell: order.get(smell.file, len(order)))
+        return self.smells
+    
+    def map_file(self, filepath: str) -> List[CodeSmell]:
+        """Analyze one file of a parallel run (see parallel_runner.run_analyzer)."""
+        return self.analyze_file(filepath)
+    
+    def reduce_files(self, results: List[Tuple[str, List[CodeSmell]]]) -> List[CodeSmell]:
+        """Collect the smells of a parallel run's files, in file order."""
+        self.smells = [smell for _, smells in results for smell in smells]
+        return self.smells
     
     def _detect_long_functions(self, tree: ast.AST, filepath: str, lines: List[str]) -> List[CodeSmell]:
         """Detect functions that are too long."""
@@ -9,7 +9,6 @@ Provides insights into migration status, trends, and bottlenecks.
 import datetime
 import json
 import os
-from collections import defaultdict
 from pathlib import Path
 
 
@@ -27,11 +26,13 @@ class MigrationStatsTracker:
         self.project_path = Path(project_path).resolve()
         self.stats_dir = self.project_path / self.STATS_DIR
         
-    def collect_stats(self, scan_path=None):
+    def collect_stats(self, scan_path=None, backend='auto'):
         """Collect current migration statistics.
         
         Args:
             scan_path: Path to scan (defaults to project_path)
+            backend: How a directory's files are checked: 'serial',
+                'threads', 'processes', or 'auto' to pick by amount of work
             
         Returns:
             dict: Statistics dictionary
@@ -39,47 +40,33 @@ class MigrationStatsTracker:
         from verifier import Python3CompatibilityVerifier
         
         scan_path = scan_path or self.project_path
-        verifier = Python3CompatibilityVerifier()
+        
+        # Collect file statistics
+        python_files = []
+        if os.path.isdir(scan_path):
+            from project_index import list_files
+            # Skip hidden and virtual environment directories
+            python_files = list_files(scan_path, exclude=lambda d: d.startswith('.') or d in ['venv', 'env', '__pycache__'])
         
         # Collect issues
         if os.path.isdir(scan_path):
-            verifier.verify_directory(scan_path)
+            from parallel_runner import ParallelMigrationRunner
+            runner = ParallelMigrationRunner(backend=backend, quiet=True)
+            runner.check_files(python_files)
+            issues = runner.issues
         else:
+            verifier = Python3CompatibilityVerifier()
             verifier.verify_file(scan_path)
+            issues = verifier.issues_found
         
-        issues = verifier.issues_found
-        
-        # Collect file statistics
-        python_files = []
-        for root, dirs, files in os.walk(scan_path):
-            # Skip hidden and virtual environment directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['venv', 'env', '__pycache__']]
-            
-            for file in files:
-                if file.endswith('.py'):
-                    python_files.append(os.path.join(root, file))
-        
-        # Analyze issues
-        files_with_issues = set()
-        issue_types = defaultdict(int)
-        severity_counts = defaultdict(int)
-        file_issue_counts = defaultdict(int)
-        
-        for issue in issues:
-            file_path = issue.get('file', '')
-            files_with_issues.add(file_path)
-            
-            issue_type = issue.get('type', 'unknown')
-            issue_types[issue_type] += 1
-            
-            severity = issue.get('severity', 'unknown')
-            severity_counts[severity] += 1
-            
-            file_issue_counts[file_path] += 1
+        # Analyze issues (counted straight from the verifier's issue store)
+        file_issue_counts = issues.count_by_file()
+        issue_types = issues.count_by_type()
+        severity_counts = issues.severity_counts()
         
         # Calculate statistics
         total_files = len(python_files)
-        files_with_issues_count = len(files_with_issues)
+        files_with_issues_count = len(file_issue_counts)
         clean_files = total_files - files_with_issues_count
         
         progress_pct = (clean_files / total_files * 100) if total_files > 0 else 0
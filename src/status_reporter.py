@@ -17,6 +17,17 @@ from pathlib import Path
 class MigrationStatusReporter:
     """Generate quick status reports for migration progress."""
     
+    # Verifier severities mapped onto the reporter's levels
+    SEVERITY_LEVELS = {
+        'critical': 'critical',
+        'error': 'critical',
+        'high': 'high',
+        'medium': 'medium',
+        'warning': 'medium',
+        'low': 'low',
+        'info': 'low',
+    }
+    
     def __init__(self, project_path='.', stats_dir='.migration_stats'):
         self.project_path = Path(project_path).resolve()
         self.stats_dir = Path(stats_dir)
@@ -192,10 +203,34 @@ class MigrationStatusReporter:
         
         return recommendations
     
-    def generate_status_report(self):
-        """Generate comprehensive status report."""
-        stats = self._get_latest_stats()
-        prev_stats = self._get_previous_stats()
+    def _stats_from_issues(self, issues):
+        """Build stats from a live verifier IssueStore instead of a snapshot."""
+        stats = {
+            'total_issues': len(issues),
+            'files_with_issues': len(issues.count_by_file()),
+            'critical_issues': 0,
+            'high_issues': 0,
+            'medium_issues': 0,
+            'low_issues': 0,
+        }
+        for severity, count in issues.severity_counts().items():
+            level = self.SEVERITY_LEVELS.get(severity, 'medium')
+            stats[f'{level}_issues'] += count
+        return stats
+    
+    def generate_status_report(self, issues=None):
+        """Generate comprehensive status report.
+        
+        Args:
+            issues: Optional IssueStore from a verifier run; when given, its
+                counts are reported instead of the latest stats snapshot
+        """
+        if issues is not None:
+            stats = self._stats_from_issues(issues)
+            prev_stats = self._get_latest_stats()
+        else:
+            stats = self._get_latest_stats()
+            prev_stats = self._get_previous_stats()
         git_status = self._get_git_status()
         backup_info = self._get_backup_info()
         python_files = self._count_python_files()
@@ -365,9 +400,10 @@ class MigrationStatusReporter:
         bar = f"[{bar_color}{'█' * filled}{GRAY}{'░' * empty}{RESET}]"
         return bar
     
-    def export_json(self, output_path=None):
+    def export_json(self, output_path=None, report=None):
         """Export status report as JSON."""
-        report = self.generate_status_report()
+        if report is None:
+            report = self.generate_status_report()
         
         if output_path:
             with open(output_path, 'w') as f:
@@ -274,7 +274,7 @@ class TypeHintsGenerator:
         Returns:
             List of processing results
         """
-        results = []
+        python_files = []
         directory_path = Path(directory_path)
         
         for root, dirs, files in os.walk(directory_path):
@@ -283,12 +283,49 @@ class TypeHintsGenerator:
             
             for file in files:
                 if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    result = self.process_file(file_path)
-                    results.append(result)
-        
+                    python_files.append(os.path.join(root, file))
+        
+        # Process the files in parallel, if worth it
+        from parallel_runner import run_analyzer
+        summary = run_analyzer(self, python_files)
+        results = summary['result']
+        for failed in summary['results']:
+            if not failed['success']:
+                # Crashed or timed out on a worker
+                results.append({'success': False, 'error': failed['error'], 'file': failed['file']})
+        # Each error in its file's place, as a serial run reports it
+        order = {path: index for index, path in enumerate(python_files)}
+        results.sort(key=lambda result: order.get(result.get('file'), len(order)))
         return results
     
+    def map_file(self, file_path: str) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Process one file of a parallel run (see parallel_runner.run_analyzer).
+        
+        Returns:
+            The processing result and the statistics of this file alone
+        """
+        # A generator of its own, so that the counts of concurrent files
+        # do not mix
+        generator = TypeHintsGenerator(dry_run=self.dry_run)
+        return generator.process_file(file_path), generator.stats
+    
+    def reduce_files(self, results: List[Tuple[str, Tuple[Dict[str, Any], Dict[str, int]]]]) -> List[Dict[str, Any]]:
+        """Merge the results and statistics of a parallel run's files.
+        
+        Args:
+            results: (path, map_file() result) pairs, in file order
+            
+        Returns:
+            List of processing results
+        """
+        processed = []
+        for _, (result, stats) in results:
+            for key, count in stats.items():
+                self.stats[key] += count
+            self.changes_made.extend(result.get('changes', []) if result.get('modified') else [])
+            processed.append(result)
+        return processed
+    
     def _add_type_hints(self, content: str, function_info: Dict, existing_typing_imports: Set) -> Tuple[str, List[Dict]]:
         """Add type hints to the content.
         
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Verification Record
+
+Persistent per-file verifier results for incremental checks. Results are
+keyed by a hash of the file content, so an unchanged file (even if moved or
+copied) is answered from the record instead of being scanned again. The
+whole record is tagged with a fingerprint of the active pattern set; when the
+patterns, custom rules or verifier version change, the fingerprint no longer
+matches and every stored result is discarded.
+
+The record also keeps the stat tuple each file's hash was computed for, so
+the shared FingerprintService can answer unchanged files on the next run
+without reading them.
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from file_fingerprint import Fingerprint, StatKey
+
+
+class VerificationRecord:
+    """Content-hash keyed store of per-file verification results."""
+
+    RECORD_VERSION = 2
+    DEFAULT_PATH = os.path.join(".py2to3_cache", "verification_record.json")
+
+    # Least recently used results are dropped beyond this many entries
+    MAX_ENTRIES = 200000
+
+    def __init__(self, path: Optional[str] = None, fingerprint: str = ""):
+        """
+        Args:
+            path: JSON file holding the record (default:
+                .py2to3_cache/verification_record.json)
+            fingerprint: Fingerprint of the active pattern set; stored
+                results made under a different fingerprint are discarded
+        """
+        self.path = path or self.DEFAULT_PATH
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Absolute path -> [st_dev, st_ino, st_size, st_mtime_ns, digest]
+        self.files: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = False
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != self.RECORD_VERSION
+            or data.get("fingerprint") != self.fingerprint
+        ):
+            # Patterns (or the record format) changed: start over
+            self.invalidated = True
+            self._dirty = True
+            return
+        self.entries = data.get("entries", {})
+        self.files = data.get("files", {})
+
+    def known_fingerprint(self, path: str) -> Optional[Tuple[StatKey, str]]:
+        """Return the stored (stat tuple, digest) for an absolute path, or None."""
+        known = self.files.get(path)
+        if known is None:
+            return None
+        return tuple(known[:4]), known[4]
+
+    def note_file(self, path: str, fingerprint: Fingerprint):
+        """Remember the stat tuple a file's digest is valid for."""
+        if fingerprint.stat is None:
+            if self.files.pop(path, None) is not None:
+                self._dirty = True
+            return
+        known = [*fingerprint.stat, fingerprint.digest]
+        if self.files.get(path) != known:
+            self.files[path] = known
+            self._dirty = True
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored result for a content hash, or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["used"] = time.time()
+        self._dirty = True
+        return entry["result"]
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store the result for a content hash."""
+        self.entries[key] = {"used": time.time(), "result": result}
+        self._dirty = True
+
+    def merge(self, entries: Dict[str, Dict[str, Any]]) -> int:
+        """Add results made elsewhere under the same fingerprint, keeping existing ones.
+
+        Returns:
+            Number of results added
+        """
+        added = 0
+        for key, entry in entries.items():
+            if key not in self.entries and isinstance(entry, dict) and "result" in entry:
+                self.entries[key] = entry
+                added += 1
+        if added:
+            self._dirty = True
+        return added
+
+    def save(self):
+        """Write the record to disk if it changed (atomically)."""
+        if not self._dirty:
+            return
+        if len(self.entries) > self.MAX_ENTRIES:
+            newest = sorted(self.entries.items(), key=lambda item: item[1]["used"], reverse=True)
+            self.entries = dict(newest[: self.MAX_ENTRIES])
+        if len(self.files) > self.MAX_ENTRIES:
+            self.files = {
+                path: known for path, known in self.files.items() if known[4] in self.entries
+            }
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "version": self.RECORD_VERSION,
+                        "fingerprint": self.fingerprint,
+                        "entries": self.entries,
+                        "files": self.files,
+                    },
+                    f,
+                    separators=(",", ":"),
+                )
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        self._dirty = False
@@ -5,25 +5,85 @@ A programmatic tool to verify Python 3 compatibility and detect remaining Python
 """
 
 import ast
+import bisect
 import datetime
+import hashlib
+import json
 import os
 import re
 import subprocess
 import sys
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict
+
+from file_fingerprint import content_hash, fingerprint_service
+from issue_store import IssueStore
+from literal_prefilter import LiteralPrefilter
+from parsed_file import ParsedFile
+from project_index import list_files
+from verification_record import VerificationRecord
 
 
 class Python3CompatibilityVerifier:
     """Main class for verifying Python 3 compatibility."""
 
-    def __init__(self):
-        self.issues_found = []
+    # Bump when a change to the checks alters results for the same patterns
+    VERIFIER_VERSION = "2"
+
+    # Custom rules file whose content is part of the pattern fingerprint
+    CUSTOM_RULES_FILE = ".py2to3_custom_rules.json"
+
+    # Files at least this large are verified in bounded windows of lines
+    STREAM_THRESHOLD_BYTES = 32 * 1024 * 1024
+    STREAM_WINDOW_CHARS = 1024 * 1024
+
+    # Modules removed or renamed in Python 3, with their replacement
+    PROBLEMATIC_IMPORTS = {
+        "urllib2": "Use urllib.request instead",
+        "urlparse": "Use urllib.parse instead",
+        "ConfigParser": "Use configparser instead",
+        "cPickle": "Use pickle instead",
+        "StringIO": "Use io instead",
+        "HTMLParser": "Use html.parser instead",
+        "Queue": "Use queue instead",
+        "thread": "Use _thread instead",
+        "commands": "Use subprocess instead",
+        "md5": "Use hashlib instead",
+        "sha": "Use hashlib instead",
+    }
+
+    def __init__(self, verbose=True, record=None):
+        """
+        Args:
+            verbose: If False, file and directory verification runs silently
+            record: Optional VerificationRecord (or True for the default one)
+                used to answer unchanged files from earlier runs; see
+                open_record()
+        """
+        self.verbose = verbose
+        self.issues_found = IssueStore()
         self.warnings = []
         self.files_checked = 0
         self.syntax_errors = []
 
         # Define patterns that indicate Python 2 compatibility issues
         self.issue_patterns = self._get_issue_patterns()
+        self._compiled_patterns = [
+            (issue_name, issue_info, re.compile(issue_info["pattern"], re.MULTILINE))
+            for issue_name, issue_info in self.issue_patterns.items()
+        ]
+        # Patterns whose required literal is missing from a buffer are skipped
+        self._prefilter = LiteralPrefilter(
+            {index: regex for index, (_, _, regex) in enumerate(self._compiled_patterns)}
+        )
+        self._import_prefilter = LiteralPrefilter(
+            {name: (name,) for name in self.PROBLEMATIC_IMPORTS}
+        )
+
+        self.record = None
+        if record is True:
+            self.open_record()
+        elif record is not None:
+            self.record = record
 
     def _get_issue_patterns(self):
         """Define patterns that indicate Python 2/3 compatibility issues."""
@@ -231,29 +291,184 @@ class Python3CompatibilityVerifier:
             ]
         )
 
+    def pattern_fingerprint(self, custom_rules_file=None):
+        """Return a fingerprint of everything besides file content that shapes results.
+
+        Covers the issue pattern table, the problematic import table, the
+        verifier version, the streaming threshold, the Python version (which
+        decides what parses) and the custom rules file, if present.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(
+            json.dumps(
+                [
+                    self.VERIFIER_VERSION,
+                    list(sys.version_info[:2]),
+                    self.STREAM_THRESHOLD_BYTES,
+                    list(self.issue_patterns.items()),
+                    self.PROBLEMATIC_IMPORTS,
+                ],
+                sort_keys=True,
+            ).encode("utf-8")
+        )
+        try:
+            with open(custom_rules_file or self.CUSTOM_RULES_FILE, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+        return digest.hexdigest()
+
+    def open_record(self, path=None, custom_rules_file=None):
+        """Load (or start) the persistent record used for incremental runs.
+
+        Args:
+            path: Record file (default: VerificationRecord.DEFAULT_PATH)
+            custom_rules_file: Custom rules file to include in the fingerprint
+
+        Returns:
+            The VerificationRecord, also stored as ``self.record``
+        """
+        self.record = VerificationRecord(path, self.pattern_fingerprint(custom_rules_file))
+        return self.record
+
+    def save_record(self):
+        """Write the incremental record back to disk, if one is in use."""
+        if self.record is not None:
+            self.record.save()
+
     def verify_file(self, filepath):
-        """Verify a single Python file for Python 3 compatibility."""
-        print("Verifying file: %s" % filepath)
+        """Verify a single Python file for Python 3 compatibility.
+
+        With a record in use, a file whose content was verified before under
+        the same pattern fingerprint is answered from the record.
+
+        Args:
+            filepath: Path to the file, or a ParsedFile shared with other checks
+        """
+        parsed = ParsedFile.coerce(filepath)
+        filepath = parsed.path
+        self._log("Verifying file: %s" % filepath)
         self.files_checked += 1
 
+        if self.record is None:
+            return self._verify_file(parsed)
+
+        if parsed.in_memory:
+            key = content_hash(parsed.raw)
+        else:
+            # Unchanged files are answered from their stat tuple, unread
+            fingerprint = fingerprint_service().get(filepath, known=self.record.known_fingerprint)
+            if fingerprint is None:
+                return self._verify_file(parsed)
+            self.record.note_file(os.path.abspath(filepath), fingerprint)
+            key = fingerprint.digest
+
+        stored = self.record.get(key)
+        if stored is not None:
+            for issue in stored["issues"]:
+                self.issues_found.append({"file": filepath, **issue})
+            for warning in stored["warnings"]:
+                self.warnings.append({"file": filepath, **warning})
+            if stored["syntax_error"] is not None:
+                self.syntax_errors.append({"file": filepath, "error": stored["syntax_error"]})
+            return stored["verified"]
+
+        issues_start = len(self.issues_found)
+        warnings_start = len(self.warnings)
+        syntax_start = len(self.syntax_errors)
+        verified = self._verify_file(parsed)
+        self.record.put(key, self.record_result(verified, issues_start, warnings_start, syntax_start))
+        return verified
+
+    def record_result(self, verified, issues_start=0, warnings_start=0, syntax_start=0):
+        """Return the result stored in the record for the file verified last.
+
+        Args:
+            verified: What verify_file() returned for the file
+            issues_start, warnings_start, syntax_start: Lengths of the
+                issue, warning and syntax error lists before the file was verified
+        """
+
+        def _without_file(entries):
+            return [{k: v for k, v in entry.items() if k != "file"} for entry in entries]
+
+        syntax_errors = self.syntax_errors[syntax_start:]
+        return {
+            "verified": verified,
+            "issues": _without_file(self.issues_found[issues_start:]),
+            "warnings": _without_file(self.warnings[warnings_start:]),
+            "syntax_error": syntax_errors[0]["error"] if syntax_errors else None,
+        }
+
+    def _verify_file(self, parsed):
+        """Run every check on one file (see verify_file)."""
+        filepath = parsed.path
+
         try:
-            with open(filepath, encoding="utf-8") as f:
-                content = f.read()
+            if os.path.getsize(filepath) >= self.STREAM_THRESHOLD_BYTES:
+                return self._verify_large_file(filepath)
+        except OSError:
+            pass  # Reported by the read below
+
+        try:
+            content = parsed.text
+        except Exception as e:
+            self.issues_found.append(
+                {
+                    "file": filepath,
+                    "line": 1,
+                    "issue": "read_error",
+                    "severity": "error",
+                    "description": "Cannot read file: %s" % str(e),
+                    "suggestion": "Check file encoding and permissions",
+                }
+            )
+            return False
+
+        if parsed.encoding != "utf-8":
+            self.warnings.append(
+                {
+                    "file": filepath,
+                    "line": 1,
+                    "issue": "encoding_issue",
+                    "description": "File encoding issue detected",
+                    "suggestion": "Ensure file is saved with UTF-8 encoding",
+                }
+            )
+
+        # Check for Python 2/3 compatibility issues first
+        self._check_patterns(filepath, content, line_starts=parsed.line_offsets)
+
+        # Check syntax (but don't stop if invalid - Python 2 code may not parse in Python 3)
+        syntax_valid, syntax_error = self._check_syntax(filepath, parsed)
+        if not syntax_valid:
+            self.syntax_errors.append({"file": filepath, "error": syntax_error})
+            # Don't return False here - continue with other checks
+
+        # Additional checks (only if syntax is valid for AST parsing)
+        if syntax_valid:
+            self._check_imports(filepath, parsed)
+        self._check_encoding(filepath, content)
+
+        return True
+
+    def _verify_large_file(self, filepath):
+        """Verify a file above STREAM_THRESHOLD_BYTES with bounded memory.
+
+        Pattern and encoding checks only look at single lines, so the file is
+        fed to them in windows of whole lines. The AST-based syntax and import
+        checks need the whole module in memory and are skipped.
+        """
+        issues_start = len(self.issues_found)
+        try:
+            self._stream_checks(filepath, "utf-8")
         except UnicodeDecodeError:
-            # Try with different encoding
+            # Discard partial results and retry with a permissive encoding
+            del self.issues_found[issues_start:]
             try:
-                with open(filepath, encoding="latin-1") as f:
-                    content = f.read()
-                self.warnings.append(
-                    {
-                        "file": filepath,
-                        "line": 1,
-                        "issue": "encoding_issue",
-                        "description": "File encoding issue detected",
-                        "suggestion": "Ensure file is saved with UTF-8 encoding",
-                    }
-                )
+                self._stream_checks(filepath, "latin-1")
             except Exception as e:
+                del self.issues_found[issues_start:]
                 self.issues_found.append(
                     {
                         "file": filepath,
@@ -265,83 +480,210 @@ class Python3CompatibilityVerifier:
                     }
                 )
                 return False
+            self.warnings.append(
+                {
+                    "file": filepath,
+                    "line": 1,
+                    "issue": "encoding_issue",
+                    "description": "File encoding issue detected",
+                    "suggestion": "Ensure file is saved with UTF-8 encoding",
+                }
+            )
+        except Exception as e:
+            del self.issues_found[issues_start:]
+            self.issues_found.append(
+                {
+                    "file": filepath,
+                    "line": 1,
+                    "issue": "read_error",
+                    "severity": "error",
+                    "description": "Cannot read file: %s" % str(e),
+                    "suggestion": "Check file encoding and permissions",
+                }
+            )
+            return False
 
-        # Check for Python 2/3 compatibility issues first
-        self._check_patterns(filepath, content)
-
-        # Check syntax (but don't stop if invalid - Python 2 code may not parse in Python 3)
-        syntax_valid, syntax_error = self._check_syntax(filepath, content)
-        if not syntax_valid:
-            self.syntax_errors.append({"file": filepath, "error": syntax_error})
-            # Don't return False here - continue with other checks
-
-        # Additional checks (only if syntax is valid for AST parsing)
-        if syntax_valid:
-            self._check_imports(filepath, content)
-        self._check_encoding(filepath, content)
-
+        self.warnings.append(
+            {
+                "file": filepath,
+                "line": 1,
+                "issue": "streamed_file",
+                "description": "Large file verified in streaming mode; syntax and import checks skipped",
+                "suggestion": "Check syntax separately, e.g. with python -m py_compile",
+            }
+        )
         return True
 
+    def _stream_checks(self, filepath, encoding):
+        """Run the line-based checks over a file one window of lines at a time."""
+        head = []
+        has_non_ascii = False
+        first_line = 1
+
+        with open(filepath, encoding=encoding) as f:
+            while True:
+                window = []
+                size = 0
+                for line in f:
+                    window.append(line)
+                    size += len(line)
+                    if size >= self.STREAM_WINDOW_CHARS:
+                        break
+                if not window:
+                    break
+
+                if len(head) < 2:
+                    head.extend(window[: 2 - len(head)])
+                text = "".join(window)
+                if not has_non_ascii:
+                    has_non_ascii = not text.isascii()
+
+                self._check_patterns(filepath, text[:-1] if text.endswith("\n") else text,
+                                     first_line=first_line)
+                first_line += len(window)
+
+        self._check_encoding(filepath, "".join(head), has_non_ascii=has_non_ascii)
+
+    def verify_range(self, filepath, start, end, first_line=1):
+        """Run the line-based pattern checks over one byte range of a file.
+
+        Lets pieces of a very large file be checked separately (and in
+        parallel). As in streaming mode, the syntax, import and encoding
+        checks are not run.
+
+        Args:
+            filepath: Path to the file
+            start: Offset of the first byte; must be the start of a line
+            end: Offset just past the last byte; must be the end of a line
+                (or of the file)
+            first_line: Line number of the line starting at ``start``
+        """
+        with open(filepath, "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                data = f.read(min(self.STREAM_WINDOW_CHARS, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                if remaining > 0 and not data.endswith(b"\n"):
+                    # Windows end on whole lines, so no character is cut in two
+                    rest = f.readline(remaining)
+                    remaining -= len(rest)
+                    data += rest
+                try:
+                    text = data.decode("utf-8")
+                except UnicodeDecodeError:
+                    text = data.decode("latin-1")
+
+                self._check_patterns(filepath, text[:-1] if text.endswith("\n") else text,
+                                     first_line=first_line)
+                first_line += text.count("\n")
+
     def _check_syntax(self, filepath, content):
-        """Check if the file has valid Python 3 syntax."""
-        try:
-            ast.parse(content)
+        """Check if the file has valid Python 3 syntax.
+
+        Args:
+            content: Source text or a ParsedFile (whose AST is reused)
+        """
+        parsed = content if isinstance(content, ParsedFile) else ParsedFile(filepath, content)
+        if parsed.tree is not None:
             return True, None
-        except SyntaxError as e:
+        e = parsed.syntax_error
+        if isinstance(e, SyntaxError):
             return False, f"Line {e.lineno or 'unknown'}: {e.msg}"
-        except Exception as e:
-            return False, str(e)
-
-    def _check_patterns(self, filepath, content):
-        """Check content against known issue patterns."""
-        lines = content.split("\n")
+        return False, str(e)
+
+    def _check_patterns(self, filepath, content, first_line=1, line_starts=None):
+        """Check content against known issue patterns.
+
+        Patterns whose required literal does not occur in ``content`` are
+        skipped. Each remaining pattern scans the whole buffer once; match offsets
+        are mapped to lines through a line-start index. Patterns keep their
+        per-line semantics: at most one issue per line and pattern, and a
+        match that runs into the next line is re-checked within its own line.
+
+        Args:
+            first_line: Line number of the first line of ``content`` when it
+                is a window into a larger file
+            line_starts: Precomputed line-start offsets of ``content``
+        """
+        hits = []
+
+        for pattern_index in self._prefilter.candidates(content):
+            regex = self._compiled_patterns[pattern_index][2]
+            match = regex.search(content)
+            if match is None:
+                continue
+            if line_starts is None:
+                line_starts = self._line_starts(content)
+
+            while match is not None:
+                line_index = bisect.bisect_right(line_starts, match.start()) - 1
+                line_end = self._line_end(content, line_starts, line_index)
+                if match.end() <= line_end or regex.search(content, match.start(), line_end):
+                    hits.append((line_index, pattern_index))
+                # One issue per line: resume the scan on the next line
+                if line_end >= len(content):
+                    break
+                match = regex.search(content, line_end + 1)
+
+        hits.sort()
+        for line_index, pattern_index in hits:
+            issue_name, issue_info, _ = self._compiled_patterns[pattern_index]
+            line = content[line_starts[line_index]:self._line_end(content, line_starts, line_index)]
+            self.issues_found.add(
+                filepath,
+                line_index + first_line,
+                issue_name,
+                issue_info["severity"],
+                issue_info["description"],
+                issue_info["suggestion"],
+                line.strip(),
+            )
 
-        for line_num, line in enumerate(lines, 1):
-            for issue_name, issue_info in self.issue_patterns.items():
-                if re.search(issue_info["pattern"], line):
-                    self.issues_found.append(
-                        {
-                            "file": filepath,
-                            "line": line_num,
-                            "issue": issue_name,
-                            "severity": issue_info["severity"],
-                            "description": issue_info["description"],
-                            "suggestion": issue_info["suggestion"],
-                            "code": line.strip(),
-                        }
-                    )
+    @staticmethod
+    def _line_starts(content):
+        """Return the offset at which each line of ``content`` starts."""
+        starts = [0]
+        find = content.find
+        pos = find("\n")
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find("\n", pos + 1)
+        return starts
+
+    @staticmethod
+    def _line_end(content, line_starts, line_index):
+        """Return the offset of the newline ending a line (or the buffer end)."""
+        if line_index + 1 < len(line_starts):
+            return line_starts[line_index + 1] - 1
+        return len(content)
 
     def _check_imports(self, filepath, content):
-        """Check for problematic imports."""
-        try:
-            tree = ast.parse(content)
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        self._check_import_name(filepath, node.lineno, alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        self._check_import_name(filepath, node.lineno, node.module)
-
-        except Exception:
-            pass  # Syntax errors already caught
+        """Check for problematic imports.
+
+        Args:
+            content: Source text or a ParsedFile (whose AST is reused)
+        """
+        parsed = content if isinstance(content, ParsedFile) else ParsedFile(filepath, content)
+        if not self._import_prefilter.present(parsed.text):
+            return  # No problematic module name occurs anywhere in the file
+        tree = parsed.tree
+        if tree is None:
+            return  # Syntax errors already caught
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    self._check_import_name(filepath, node.lineno, alias.name)
+            elif isinstance(node, ast.ImportFrom):
+                if node.module:
+                    self._check_import_name(filepath, node.lineno, node.module)
 
     def _check_import_name(self, filepath, line_num, import_name):
         """Check if an import name is problematic."""
-        problematic_imports = {
-            "urllib2": "Use urllib.request instead",
-            "urlparse": "Use urllib.parse instead",
-            "ConfigParser": "Use configparser instead",
-            "cPickle": "Use pickle instead",
-            "StringIO": "Use io instead",
-            "HTMLParser": "Use html.parser instead",
-            "Queue": "Use queue instead",
-            "thread": "Use _thread instead",
-            "commands": "Use subprocess instead",
-            "md5": "Use hashlib instead",
-            "sha": "Use hashlib instead",
-        }
+        problematic_imports = self.PROBLEMATIC_IMPORTS
 
         if import_name in problematic_imports:
             self.issues_found.append(
@@ -356,8 +698,13 @@ class Python3CompatibilityVerifier:
                 }
             )
 
-    def _check_encoding(self, filepath, content):
-        """Check for encoding declaration."""
+    def _check_encoding(self, filepath, content, has_non_ascii=None):
+        """Check for encoding declaration.
+
+        Args:
+            has_non_ascii: Precomputed non-ASCII flag when ``content`` only
+                holds the first lines of the file
+        """
         lines = content.split("\n")
         has_encoding = False
 
@@ -367,7 +714,10 @@ class Python3CompatibilityVerifier:
                 has_encoding = True
                 break
 
-        if not has_encoding and any(ord(c) > 127 for c in content):
+        if has_non_ascii is None:
+            has_non_ascii = any(ord(c) > 127 for c in content)
+
+        if not has_encoding and has_non_ascii:
             self.warnings.append(
                 {
                     "file": filepath,
@@ -378,32 +728,97 @@ class Python3CompatibilityVerifier:
                 }
             )
 
-    def verify_directory(self, directory, recursive=True):
-        """Verify all Python files in a directory."""
-        print("Verifying directory: %s" % directory)
+    def _log(self, message):
+        """Print a progress message unless running silently."""
+        if self.verbose:
+            print(message)
 
-        python_files = []
+    @staticmethod
+    def _iter_python_files(directory, recursive=True):
+        """Yield the .py files under ``directory``.
 
+        Recursive listings come from the shared project file index, which
+        lists the tree once and then reuses the listing.
+        """
         if recursive:
-            for root, dirs, files in os.walk(directory):
-                for file in files:
-                    if file.endswith(".py"):
-                        python_files.append(os.path.join(root, file))
+            yield from list_files(directory)
         else:
             for file in os.listdir(directory):
                 if file.endswith(".py"):
-                    python_files.append(os.path.join(directory, file))
+                    yield os.path.join(directory, file)
 
-        print("Found %d Python files to verify" % len(python_files))
+    def verify_directory(self, directory, recursive=True):
+        """Verify all Python files in a directory."""
+        self._log("Verifying directory: %s" % directory)
+
+        python_files = list(self._iter_python_files(directory, recursive))
+
+        self._log("Found %d Python files to verify" % len(python_files))
 
         success_count = 0
         for filepath in python_files:
             if self.verify_file(filepath):
                 success_count += 1
 
-        print("Successfully verified %d out of %d files" % (success_count, len(python_files)))
+        self._log("Successfully verified %d out of %d files" % (success_count, len(python_files)))
+        self.save_record()
         return success_count == len(python_files)
 
+    def iter_results(self, paths, recursive=True, keep=False):
+        """Verify files one at a time, yielding a result record as each completes.
+
+        A directory's files are listed up front (from the shared project file
+        index, see project_index), then verified and yielded one at a time,
+        so the first record arrives before the rest of the tree is checked.
+
+        Args:
+            paths: A file or directory path, or an iterable of them
+            recursive: Whether to descend into subdirectories
+            keep: Also keep each file's results in issues_found, warnings and
+                syntax_errors; by default they are only handed to the caller,
+                so memory stays flat however many files are checked
+
+        Yields:
+            Dict with ``file``, ``verified`` (False if the file could not be
+            read), ``compatible``, ``issues``, ``warnings`` and
+            ``syntax_error`` (message or None)
+        """
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+
+        for path in paths:
+            if os.path.isdir(path):
+                filepaths = self._iter_python_files(path, recursive)
+            else:
+                filepaths = [str(path)]
+
+            for filepath in filepaths:
+                issues_start = len(self.issues_found)
+                warnings_start = len(self.warnings)
+                syntax_start = len(self.syntax_errors)
+
+                verified = self.verify_file(filepath)
+
+                issues = self.issues_found[issues_start:]
+                warnings = self.warnings[warnings_start:]
+                syntax_errors = self.syntax_errors[syntax_start:]
+                if not keep:
+                    del self.issues_found[issues_start:]
+                    del self.warnings[warnings_start:]
+                    del self.syntax_errors[syntax_start:]
+
+                yield {
+                    "file": filepath,
+                    "verified": verified,
+                    "compatible": verified and not syntax_errors
+                    and not any(issue["severity"] == "error" for issue in issues),
+                    "issues": issues,
+                    "warnings": warnings,
+                    "syntax_error": syntax_errors[0]["error"] if syntax_errors else None,
+                }
+
+        self.save_record()
+
     def run_2to3_tool(self, target_path):
         """Run the official 2to3 tool and capture output."""
         try:
@@ -436,8 +851,9 @@ class Python3CompatibilityVerifier:
         report.append("")
 
         # Summary
-        error_count = len([i for i in self.issues_found if i["severity"] == "error"])
-        warning_count = len([i for i in self.issues_found if i["severity"] == "warning"])
+        severity_counts = self.issues_found.severity_counts()
+        error_count = severity_counts.get("error", 0)
+        warning_count = severity_counts.get("warning", 0)
 
         report.append("Summary:")
         report.append("  Errors: %d" % error_count)
@@ -455,29 +871,23 @@ class Python3CompatibilityVerifier:
 
         # Issues by severity
         if self.issues_found:
-            # Group by severity
-            errors = [i for i in self.issues_found if i["severity"] == "error"]
-            warnings = [i for i in self.issues_found if i["severity"] == "warning"]
-
-            if errors:
+            if error_count:
                 report.append("Errors (must fix for Python 3):")
                 report.append("-" * 35)
-                self._add_issues_to_report(report, errors)
+                self._add_issues_to_report(report, self.issues_found.group_by_file("error"))
                 report.append("")
 
-            if warnings:
+            if warning_count:
                 report.append("Warnings (recommended fixes):")
                 report.append("-" * 30)
-                self._add_issues_to_report(report, warnings)
+                self._add_issues_to_report(report, self.issues_found.group_by_file("warning"))
                 report.append("")
 
         # Issue statistics
         if self.issues_found:
             report.append("Issue Statistics:")
             report.append("-" * 20)
-            issue_counts: dict[str, int] = defaultdict(int)
-            for issue in self.issues_found:
-                issue_counts[issue["issue"]] += 1
+            issue_counts = self.issues_found.count_by_type()
 
             for issue_type, count in sorted(issue_counts.items()):
                 report.append("  %s: %d" % (issue_type, count))
@@ -498,13 +908,8 @@ class Python3CompatibilityVerifier:
 
         return "\n".join(report)
 
-    def _add_issues_to_report(self, report, issues):
-        """Add issues to the report."""
-        # Group by file
-        files_with_issues = defaultdict(list)
-        for issue in issues:
-            files_with_issues[issue["file"]].append(issue)
-
+    def _add_issues_to_report(self, report, files_with_issues):
+        """Add issues, grouped by file, to the report."""
         for filepath, file_issues in files_with_issues.items():
             report.append("  File: %s" % filepath)
             for issue in file_issues:
@@ -528,7 +933,7 @@ class Python3CompatibilityVerifier:
 
     def is_python3_compatible(self):
         """Check if the verified code is Python 3 compatible."""
-        error_count = len([i for i in self.issues_found if i["severity"] == "error"])
+        error_count = self.issues_found.severity_counts().get("error", 0)
         return error_count == 0 and len(self.syntax_errors) == 0
 
 
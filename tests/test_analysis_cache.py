@@ -0,0 +1,150 @@
+"""
+Unit tests for cache-through memoization of per-file analyzer results.
+"""
+
+import pytest
+
+from analysis_cache import (
+    active_cache,
+    cached_analysis,
+    disable_analysis_cache,
+    enable_analysis_cache,
+)
+from cache_manager import CacheManager
+from duplication_detector import DuplicationDetector
+from parsed_file import ParsedFile
+from security_auditor import SecurityAuditor
+from smell_detector import CodeSmellDetector
+
+
+class CountingAnalyzer:
+    """Toy analyzer counting how often it really runs."""
+
+    def __init__(self, threshold=1):
+        self.threshold = threshold
+        self.runs = 0
+
+    @cached_analysis(version="1", config=("threshold",))
+    def analyze_file(self, path):
+        self.runs += 1
+        return {"lines": len(ParsedFile.coerce(path).lines), "threshold": self.threshold}
+
+
+@pytest.fixture
+def cache(temp_dir):
+    """Enable the analysis cache for one test."""
+    manager = CacheManager(cache_dir=str(temp_dir / "cache"))
+    enable_analysis_cache(manager)
+    yield manager
+    disable_analysis_cache()
+
+
+@pytest.fixture
+def source(temp_dir):
+    path = temp_dir / "module.py"
+    path.write_text(
+        "import pickle\n"
+        "password = 'hunter2hunter2'\n"
+        "def f(a, b, c, d, e, f, g):\n"
+        "    return pickle.loads(a)\n"
+    )
+    return path
+
+
+@pytest.mark.unit
+class TestCachedAnalysis:
+    """Test keys and bypasses of the decorator."""
+
+    def test_disabled_by_default(self, source):
+        """Test that nothing is cached unless enabled."""
+        analyzer = CountingAnalyzer()
+        analyzer.analyze_file(str(source))
+        analyzer.analyze_file(str(source))
+
+        assert active_cache() is None
+        assert analyzer.runs == 2
+
+    def test_repeat_run_reuses_result(self, cache, source):
+        """Test that a new analyzer instance reuses an unchanged file's result."""
+        first = CountingAnalyzer().analyze_file(str(source))
+        analyzer = CountingAnalyzer()
+        second = analyzer.analyze_file(str(source))
+
+        assert first == second == {"lines": 4, "threshold": 1}
+        assert analyzer.runs == 0
+
+    def test_key_includes_config_and_content(self, cache, source):
+        """Test that configuration or content changes are misses."""
+        CountingAnalyzer().analyze_file(str(source))
+
+        other_config = CountingAnalyzer(threshold=2)
+        assert other_config.analyze_file(str(source))["threshold"] == 2
+        assert other_config.runs == 1
+
+        source.write_text("x = 1\n")
+        changed = CountingAnalyzer()
+        assert changed.analyze_file(str(source))["lines"] == 1
+        assert changed.runs == 1
+
+    def test_bypasses(self, cache, source):
+        """Test the per-instance opt-out and in-memory sources."""
+        opted_out = CountingAnalyzer()
+        opted_out.analysis_cache = False
+        opted_out.analyze_file(str(source))
+        opted_out.analyze_file(str(source))
+        assert opted_out.runs == 2
+
+        analyzer = CountingAnalyzer()
+        in_memory = ParsedFile(str(source), source="x = 1\n")
+        assert analyzer.analyze_file(in_memory)["lines"] == 1
+        assert analyzer.analyze_file(in_memory)["lines"] == 1
+        assert analyzer.runs == 2
+
+
+@pytest.mark.unit
+class TestCachedAnalyzers:
+    """Test analyzers whose per-file results are cached."""
+
+    def test_smell_detector(self, cache, source):
+        """Test that smells are reused per configuration."""
+        first = CodeSmellDetector().analyze_file(str(source))
+        second = CodeSmellDetector().analyze_file(str(source))
+        relaxed = CodeSmellDetector(max_parameters=10).analyze_file(str(source))
+
+        assert first == second
+        assert any(smell.category == "complexity" for smell in first)
+        assert len(relaxed) == len(first) - 1
+
+    def test_security_auditor_counts_hits(self, cache, source):
+        """Test that cached issues are still counted in the stats."""
+        SecurityAuditor().audit_file(str(source))
+        auditor = SecurityAuditor()
+        issues = auditor.audit_file(str(source))
+
+        assert {issue.category for issue in issues} >= {"secrets", "deserialization"}
+        assert auditor.stats["secrets"] >= 1
+        assert sum(v for k, v in auditor.stats.items() if k.startswith("severity_")) == len(issues)
+
+    def test_duplication_detector(self, cache, temp_dir):
+        """Test that cached blocks still feed the duplicate index."""
+        body = "".join("value_%d = compute(%d)\n" % (i, i) for i in range(6))
+        (temp_dir / "a.py").write_text(body)
+        (temp_dir / "b.py").write_text(body)
+
+        DuplicationDetector().analyze_directory(str(temp_dir))
+        detector = DuplicationDetector()
+        detector.analyze_directory(str(temp_dir))
+
+        assert detector.stats["files_analyzed"] == 2
+        assert detector.find_duplicates()
+
+    def test_results_keep_their_path(self, cache, source, temp_dir):
+        """Test that identical files do not share results embedding a path."""
+        copy = temp_dir / "copy.py"
+        copy.write_text(source.read_text())
+
+        original = SecurityAuditor().audit_file(str(source))
+        copied = SecurityAuditor().audit_file(str(copy))
+
+        assert {issue.filename for issue in original} == {str(source)}
+        assert {issue.filename for issue in copied} == {str(copy)}
@@ -0,0 +1,138 @@
+"""
+Unit tests for the flattened AST cache format.
+"""
+
+import ast
+import marshal
+
+import pytest
+
+from ast_table import AstCostModel, AstTable, benchmark_ast_cache, size_bucket
+from cache_manager import CacheManager
+
+SOURCE = '''
+import os
+from collections import OrderedDict as OD
+
+
+class Config(object):
+    """Settings."""
+
+    def load(self, path, retries=3):
+        total = -1 + 2 ** 10
+        for line in open(path):
+            print(line.strip(), b"raw", 1.5, 2j, ..., None, True)
+        return {"a": [1, 2], "b": (3,)}
+
+
+def helper(*args, **kwargs):
+    return lambda x: x if x else -x
+'''
+
+
+def _dump(tree):
+    return ast.dump(tree, include_attributes=True)
+
+
+@pytest.mark.unit
+class TestAstTable:
+    """Test flattening, querying and rebuilding trees."""
+
+    def test_round_trip(self):
+        """Test that a rebuilt tree equals the parsed one and compiles."""
+        tree = ast.parse(SOURCE)
+        table = AstTable.loads(AstTable.from_tree(tree).dumps())
+        rebuilt = table.to_ast()
+
+        assert _dump(rebuilt) == _dump(tree)
+        compile(rebuilt, "<table>", "exec")
+
+    def test_int_and_tuple_leaves(self):
+        """Test that leaf values are not confused with row indices."""
+        tree = ast.Module(body=[ast.Expr(ast.Constant(value=(0, 1)))], type_ignores=[])
+        tree.body.append(ast.Expr(ast.Constant(value=0)))
+        rebuilt = AstTable.from_tree(tree).to_ast()
+
+        assert rebuilt.body[0].value.value == (0, 1)
+        assert rebuilt.body[1].value.value == 0
+
+    def test_queries(self):
+        """Test answering questions without rebuilding the tree."""
+        table = AstTable.from_tree(ast.parse(SOURCE))
+
+        functions = list(table.find("FunctionDef"))
+        assert [(node.lineno, table.fields(node.index)["name"]) for node in functions] == [
+            (9, "load"), (16, "helper")
+        ]
+        assert table.count("Import", "ImportFrom") == 2
+        assert table.count("Call") == 3
+        assert table.root.type == "Module"
+
+        alias = table.fields(next(table.find("ImportFrom")).index)["names"][0]
+        assert table.fields(alias.index) == {"name": "OrderedDict", "asname": "OD"}
+
+    def test_rejects_other_format(self):
+        """Test that tables from another format or Python version are refused."""
+        table = AstTable.from_tree(ast.parse("x = 1\n"))
+        data = marshal.dumps(((0, (2, 7)), table.types, table.rows))
+
+        with pytest.raises(ValueError):
+            AstTable.loads(data)
+
+
+@pytest.mark.unit
+class TestAstCostModel:
+    """Test choosing between rebuilding and reparsing."""
+
+    def test_measures_both_then_picks_cheaper(self):
+        """Test that both ways are tried before the cheaper one is kept."""
+        model = AstCostModel()
+        assert model.choose(1000) == "build"
+        model.record("build", 1000, 0.004)
+        assert model.choose(1000) == "parse"
+        model.record("parse", 1000, 0.002)
+
+        assert model.choose(1000) == "parse"
+        assert model.choose(100 * 1024) == "build"
+
+    def test_buckets(self):
+        """Test file-size bucket names."""
+        assert size_bucket(100) == "<4KB"
+        assert size_bucket(20 * 1024) == "<64KB"
+        assert size_bucket(1024 * 1024) == ">=64KB"
+
+
+@pytest.mark.unit
+class TestAstCache:
+    """Test the AST tier of the CacheManager."""
+
+    def test_table_and_tree(self, temp_dir):
+        """Test that both table and tree are served, and costs persist."""
+        path = temp_dir / "module.py"
+        path.write_text(SOURCE)
+        cache = CacheManager(cache_dir=str(temp_dir / "cache"))
+        cache.set_ast_cache(str(path), ast.parse(SOURCE))
+
+        assert cache.get_ast_table(str(path)).count("ClassDef") == 1
+        built = cache.get_ast_cache(str(path))
+        parsed = cache.get_ast_cache(str(path))
+        assert _dump(built) == _dump(parsed) == _dump(ast.parse(SOURCE))
+        assert set(cache.ast_costs.timings[size_bucket(len(SOURCE))]) == {"build", "parse"}
+        cache.close()
+
+        reopened = CacheManager(cache_dir=str(temp_dir / "cache"))
+        assert reopened.ast_costs.timings == cache.ast_costs.timings
+        reopened.close()
+
+    def test_benchmark(self, temp_dir):
+        """Test that the benchmark reports each bucket and skips bad files."""
+        (temp_dir / "good.py").write_text(SOURCE)
+        (temp_dir / "bad.py").write_text("print 'py2'\n")
+
+        results = benchmark_ast_cache(
+            [str(temp_dir / "good.py"), str(temp_dir / "bad.py")], repeat=1
+        )
+
+        assert [row["bucket"] for row in results] == ["<4KB"]
+        assert results[0]["files"] == 1
+        assert results[0]["parse_ms"] > 0 and results[0]["table_ms"] > 0
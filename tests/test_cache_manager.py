@@ -8,8 +8,11 @@ import sys
 import tempfile
 import shutil
 import ast
+import multiprocessing
 from pathlib import Path
 
+import pytest
+
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
@@ -32,16 +35,16 @@ class TestCacheManager:
     
     def teardown_method(self):
         """Cleanup test environment"""
+        self.cache.close()
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
     
     def test_cache_initialization(self):
         """Test cache manager initialization"""
         assert self.cache.cache_dir.exists()
-        assert self.cache.ast_cache_dir.exists()
-        assert self.cache.pattern_cache_dir.exists()
-        assert self.cache.analysis_cache_dir.exists()
-        assert self.cache.metadata_dir.exists()
+        assert self.cache.db_path.exists()
+        mode = self.cache._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == 'wal'
     
     def test_ast_caching(self):
         """Test AST caching functionality"""
@@ -182,6 +185,159 @@ class TestCacheManager:
         stats = self.cache.get_statistics()
         assert stats['hits'] == 2
         assert stats['hit_rate'] == 100.0
+    
+    def test_entries_replaced_on_change(self):
+        """Test that caching new content drops the entry for the old content"""
+        self.cache.set_analysis_cache(self.test_file, {'version': 1})
+        with open(self.test_file, 'w') as f:
+            f.write('print("Modified!")\n')
+        self.cache.set_analysis_cache(self.test_file, {'version': 2})
+        
+        assert self.cache.get_analysis_cache(self.test_file) == {'version': 2}
+        stats = self.cache.get_statistics()
+        assert stats['analysis_entries'] == 1
+        assert stats['cached_files'] == 1
+    
+    def test_batch_and_reopen(self):
+        """Test batched writes are committed and visible to a new manager"""
+        with self.cache.batch():
+            self.cache.set_pattern_cache(self.test_file, 'a', [1])
+            self.cache.set_pattern_cache(self.test_file, 'b', [2])
+            self.cache.set_analysis_cache(self.test_file, {'x': 1})
+        
+        reopened = CacheManager(cache_dir=self.cache_dir)
+        try:
+            assert reopened.get_pattern_cache(self.test_file, 'b') == [2]
+            assert reopened.get_statistics()['pattern_entries'] == 2
+        finally:
+            reopened.close()
+    
+    def test_batch_rollback(self):
+        """Test that a failing batch leaves no partial writes"""
+        try:
+            with self.cache.batch():
+                self.cache.set_analysis_cache(self.test_file, {'x': 1})
+                raise RuntimeError("interrupted")
+        except RuntimeError:
+            pass
+        
+        assert self.cache.get_statistics()['total_entries'] == 0
+    
+    def test_clear_cache_by_type(self):
+        """Test clearing one cache category"""
+        self.cache.set_pattern_cache(self.test_file, 'test', [])
+        self.cache.set_analysis_cache(self.test_file, {})
+        
+        assert self.cache.clear_cache('patterns') == 1
+        stats = self.cache.get_statistics()
+        assert stats['pattern_entries'] == 0
+        assert stats['analysis_entries'] == 1
+    
+    def test_optimize_cache(self):
+        """Test age-based cleanup of entries and files"""
+        self.cache.set_analysis_cache(self.test_file, {})
+        
+        assert self.cache.optimize_cache(max_age_days=7) == 0
+        self.cache._conn.execute("UPDATE entries SET created = created - 8 * 24 * 3600")
+        assert self.cache.optimize_cache(max_age_days=7) == 1
+        assert self.cache.list_cached_files() == []
+
+
+
+class TestCacheTiers:
+    """Test the in-memory tier and the byte budget of the persistent tier"""
+    
+    def setup_method(self):
+        """Setup test environment with four small files"""
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, '.test_cache')
+        self.files = []
+        for name in 'abcd':
+            path = os.path.join(self.test_dir, f'{name}.py')
+            with open(path, 'w') as f:
+                f.write(f'{name} = 1\n')
+            self.files.append(path)
+    
+    def teardown_method(self):
+        """Cleanup test environment"""
+        shutil.rmtree(self.test_dir)
+    
+    def _fill(self, cache, count=3):
+        """Cache an analysis of about 1000 bytes for the first files"""
+        for path in self.files[:count]:
+            cache.set_analysis_cache(path, {'data': 'x' * 990})
+    
+    def test_memory_tier(self):
+        """Test that repeated hits are served from memory"""
+        with CacheManager(cache_dir=self.cache_dir) as cache:
+            self._fill(cache, 1)
+            first = cache.get_analysis_cache(self.files[0])
+            second = cache.get_analysis_cache(self.files[0])
+            stats = cache.get_statistics()
+        
+        assert first == second == {'data': 'x' * 990}
+        assert (stats['disk_hits'], stats['memory_hits']) == (1, 1)
+        assert stats['hits'] == 2
+        assert stats['memory_entries'] == 1
+    
+    def test_memory_tier_bounded(self):
+        """Test LRU eviction from the in-memory tier"""
+        with CacheManager(cache_dir=self.cache_dir, memory_max_entries=1) as cache:
+            self._fill(cache, 2)
+            cache.get_analysis_cache(self.files[0])
+            cache.get_analysis_cache(self.files[1])
+            stats = cache.get_statistics()
+        
+        assert stats['memory_entries'] == 1
+        assert stats['memory_evictions'] == 1
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entries go over budget"""
+        with CacheManager(cache_dir=self.cache_dir, max_bytes=3500) as cache:
+            self._fill(cache)
+            cache._flush_accesses()
+            cache._conn.execute("UPDATE entries SET accessed = accessed - 100")
+            cache.get_analysis_cache(self.files[0])
+            cache.set_analysis_cache(self.files[3], {'data': 'x' * 990})
+            
+            stats = cache.get_statistics()
+            assert stats['disk_evictions'] == 1
+            assert stats['total_size_bytes'] <= 3500
+            assert [path for path, _ in cache.list_cached_files()] == [
+                self.files[0], self.files[2], self.files[3]
+            ]
+    
+    def test_lfu_eviction(self):
+        """Test that the least frequently used entries go first with LFU"""
+        with CacheManager(cache_dir=self.cache_dir, max_bytes=3500,
+                          eviction_policy='lfu', memory_max_entries=0) as cache:
+            self._fill(cache)
+            for path in self.files[:2]:
+                cache.get_analysis_cache(path)
+            cache.set_analysis_cache(self.files[3], {'data': 'y' * 990})
+            
+            assert cache.get_statistics()['disk_evictions'] == 1
+            assert cache.get_analysis_cache(self.files[2]) is None
+            assert cache.get_analysis_cache(self.files[0]) is not None
+    
+    def test_limits_saved(self):
+        """Test that set_limits evicts and applies to later managers"""
+        with CacheManager(cache_dir=self.cache_dir) as cache:
+            self._fill(cache)
+            assert cache.set_limits(max_bytes=1500, eviction_policy='lfu') == 2
+        
+        with CacheManager(cache_dir=self.cache_dir) as cache:
+            assert (cache.max_bytes, cache.eviction_policy) == (1500, 'lfu')
+            assert cache.get_statistics()['total_entries'] == 1
+    
+    def test_print_statistics_tiers(self, capsys):
+        """Test that per-tier counters are printed"""
+        with CacheManager(cache_dir=self.cache_dir) as cache:
+            cache.print_statistics()
+        
+        output = capsys.readouterr().out
+        assert "Memory Tier" in output and "Disk Tier" in output
+        assert "LRU eviction" in output
 
 
 def test_cache_manager_default_directory():
@@ -190,6 +346,204 @@ def test_cache_manager_default_directory():
     assert cache.cache_dir.name == '.py2to3_cache'
 
 
+class TestCacheBundles:
+    """Test content-addressed entries and relocatable bundles"""
+    
+    def setup_method(self):
+        """Setup two checkouts of the same project, each with its own cache"""
+        self.test_dir = tempfile.mkdtemp()
+        self.checkouts = []
+        for name in ('main', 'ci'):
+            checkout = os.path.join(self.test_dir, name)
+            os.makedirs(checkout)
+            for module, text in (('a.py', 'for i in xrange(3):\n    pass\n'), ('b.py', 'b = 2\n')):
+                with open(os.path.join(checkout, module), 'w') as f:
+                    f.write(text)
+            self.checkouts.append(checkout)
+        self.bundle = os.path.join(self.test_dir, 'main.py2to3cache.gz')
+    
+    def teardown_method(self):
+        """Cleanup test environment"""
+        shutil.rmtree(self.test_dir)
+    
+    def _path(self, checkout, module):
+        return os.path.join(self.checkouts[checkout], module)
+    
+    def _cache(self, checkout):
+        return CacheManager(cache_dir=os.path.join(self.checkouts[checkout], '.py2to3_cache'))
+    
+    def test_entries_shared_by_content(self):
+        """Test that a file with the same content elsewhere hits the same entry"""
+        with self._cache(0) as cache:
+            cache.set_analysis_cache(self._path(0, 'b.py'), {'lines': 1})
+            assert cache.get_analysis_cache(self._path(1, 'b.py')) == {'lines': 1}
+            assert cache.get_analysis_cache(self._path(1, 'a.py')) is None
+    
+    def test_export_import(self):
+        """Test warm-starting another checkout's cache, skipping present entries"""
+        with self._cache(0) as main:
+            main.set_analysis_cache(self._path(0, 'a.py'), {'lines': 2})
+            main.set_ast_cache(self._path(0, 'b.py'), ast.parse('b = 2\n'))
+            assert main.export_bundle(self.bundle)['entries'] == 2
+        
+        with self._cache(1) as ci:
+            ci.set_analysis_cache(self._path(1, 'a.py'), {'lines': 'local'})
+            counts = ci.import_bundle(self.bundle)
+            
+            assert (counts['imported'], counts['skipped']) == (1, 1)
+            assert ci.get_analysis_cache(self._path(1, 'a.py')) == {'lines': 'local'}
+            assert ci.get_ast_table(self._path(1, 'b.py')).count('Assign') == 1
+            assert ci.import_bundle(self.bundle)['imported'] == 0
+    
+    def test_pickled_results_not_exchanged(self):
+        """Test that analyzer results are neither exported nor imported"""
+        with self._cache(0) as main:
+            main.set_analysis_cache(self._path(0, 'a.py'), {'lines': 2})
+            main.set_result_cache(self._path(0, 'b.py'), 'smells', ['smell'])
+            assert main.export_bundle(self.bundle)['entries'] == 1
+
+            # A bundle made (or tampered with) to carry a pickled entry
+            main.PICKLED_KIND_PREFIX = 'none:'
+            assert main.export_bundle(self.bundle)['entries'] == 2
+
+        with self._cache(1) as ci:
+            counts = ci.import_bundle(self.bundle)
+
+            assert (counts['imported'], counts['skipped']) == (1, 1)
+            assert ci.get_result_cache(self._path(1, 'b.py'), 'smells') is None
+
+    def test_bundle_carries_verifier_results(self):
+        """Test that incremental checks in the other checkout reuse verifier results"""
+        from verifier import Python3CompatibilityVerifier
+        
+        with self._cache(0) as main:
+            verifier = Python3CompatibilityVerifier(verbose=False)
+            verifier.open_record(str(main.record_path))
+            verifier.verify_file(self._path(0, 'a.py'))
+            verifier.save_record()
+            assert main.export_bundle(self.bundle)['verifier_results'] == 1
+        
+        with self._cache(1) as ci:
+            assert ci.import_bundle(self.bundle)['verifier_results'] == 1
+            verifier = Python3CompatibilityVerifier(verbose=False)
+            verifier.open_record(str(ci.record_path))
+            verifier.verify_file(self._path(1, 'a.py'))
+        
+        assert verifier.record.hits == 1
+        assert [issue['file'] for issue in verifier.issues_found] == [self._path(1, 'a.py')]
+    
+    def test_rejects_bad_bundles(self):
+        """Test that damaged bundles and other cache versions are refused"""
+        import gzip
+        
+        with self._cache(0) as main:
+            main.set_analysis_cache(self._path(0, 'a.py'), {'lines': 2})
+            main.export_bundle(self.bundle)
+            with gzip.open(self.bundle, 'rb') as f:
+                data = f.read()
+            
+            with gzip.open(self.bundle, 'wb') as f:
+                f.write(data[:-20])
+            with pytest.raises(ValueError):
+                main.import_bundle(self.bundle)
+            
+            with gzip.open(self.bundle, 'wb') as f:
+                f.write(data.replace(CacheManager.CACHE_VERSION.encode(), b'0.0.0', 1))
+            with pytest.raises(ValueError, match='cache version'):
+                main.import_bundle(self.bundle)
+
+
+def _hammer_cache(cache_dir, files, worker, rounds, max_bytes):
+    """Writer process for the stress tests: write and read back results"""
+    cache = CacheManager(cache_dir=cache_dir, max_bytes=max_bytes)
+    for round_number in range(rounds):
+        for path in files:
+            value = {'worker': worker, 'round': round_number}
+            cache.set_result_cache(path, f'worker-{worker}', value)
+            stored = cache.get_result_cache(path, f'worker-{worker}')
+            if max_bytes is None and stored != value:
+                os._exit(2)
+            # Every writer also competes for the same entries
+            cache.set_analysis_cache(path, {'last_writer': worker})
+    cache.close()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='uses fork')
+class TestSharedCache:
+    """Test many processes writing one cache at the same time"""
+    
+    WORKERS = 8
+    ROUNDS = 5
+    
+    def setup_method(self):
+        """Setup ten small files; the writers create the cache together"""
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, '.test_cache')
+        self.files = []
+        for number in range(10):
+            path = os.path.join(self.test_dir, f'm{number}.py')
+            with open(path, 'w') as f:
+                f.write(f'value = {number}\n')
+            self.files.append(path)
+    
+    def teardown_method(self):
+        """Cleanup test environment"""
+        shutil.rmtree(self.test_dir)
+    
+    def _run_writers(self, max_bytes=None):
+        context = multiprocessing.get_context('fork')
+        writers = [
+            context.Process(target=_hammer_cache,
+                            args=(self.cache_dir, self.files, worker, self.ROUNDS, max_bytes))
+            for worker in range(self.WORKERS)
+        ]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join(120)
+        return [writer.exitcode for writer in writers]
+    
+    def test_concurrent_writers(self):
+        """Test that every writer's results are stored and visible to others"""
+        assert self._run_writers() == [0] * self.WORKERS
+        
+        with CacheManager(cache_dir=self.cache_dir) as cache:
+            assert cache._conn.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+            for path in self.files:
+                for worker in range(self.WORKERS):
+                    assert cache.get_result_cache(path, f'worker-{worker}') == {
+                        'worker': worker, 'round': self.ROUNDS - 1
+                    }
+                assert cache.get_analysis_cache(path)['last_writer'] in range(self.WORKERS)
+            stats = cache.get_statistics()
+        
+        assert stats['analysis_entries'] == len(self.files) * (self.WORKERS + 1)
+        assert stats['cached_files'] == len(self.files)
+    
+    def test_concurrent_eviction(self):
+        """Test that writers evicting each other's entries keep the budget"""
+        assert self._run_writers(max_bytes=2000) == [0] * self.WORKERS
+        
+        with CacheManager(cache_dir=self.cache_dir) as cache:
+            assert cache._conn.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+            assert cache.get_statistics()['total_size_bytes'] <= 2000
+    
+    def test_forked_child_reconnects(self):
+        """Test that a cache opened before fork works in the child and the parent"""
+        cache = CacheManager(cache_dir=self.cache_dir)
+        cache.set_analysis_cache(self.files[0], {'from': 'parent'})
+        
+        child = multiprocessing.get_context('fork').Process(
+            target=cache.set_analysis_cache, args=(self.files[1], {'from': 'child'})
+        )
+        child.start()
+        child.join(60)
+        
+        assert child.exitcode == 0
+        assert cache.get_analysis_cache(self.files[1]) == {'from': 'child'}
+        cache.set_analysis_cache(self.files[2], {'from': 'parent'})
+        cache.close()
+
+
 if __name__ == '__main__':
-    import pytest
     pytest.main([__file__, '-v'])
@@ -170,6 +170,55 @@ class TestCLICommands:
             # If import fails, that's also acceptable for this test
             pass
     
+    def test_check_command_ndjson(self, temp_dir, sample_py2_file, capsys):
+        """Test that ndjson output is one JSON record per line and nothing else."""
+        import json
+        from cli import command_check
+        from argparse import Namespace
+        
+        (temp_dir / "clean.py").write_text("x = 1\n")
+        args = Namespace(
+            path=str(temp_dir),
+            report=None,
+            verbose=False,
+            format='ndjson'
+        )
+        
+        result = command_check(args)
+        
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert result == 1
+        assert sorted(r['file'] for r in records[:-1]) == sorted(
+            [str(sample_py2_file), str(temp_dir / "clean.py")]
+        )
+        assert records[-1] == {
+            'type': 'summary',
+            'files': 2,
+            'issues': sum(len(r['issues']) for r in records[:-1]),
+            'incompatible_files': 1,
+        }
+
+    def test_status_command_live(self, temp_dir, sample_py2_file, capsys):
+        """Test that --live reports the issues found by checking the files."""
+        import json
+        from cli import command_status
+        from argparse import Namespace
+
+        args = Namespace(
+            path=str(temp_dir),
+            stats_dir=str(temp_dir / "stats"),
+            json=True,
+            output=None,
+            live=True,
+            no_color=True
+        )
+
+        assert command_status(args) == 0
+
+        stats = json.loads(capsys.readouterr().out)['stats']
+        assert stats['files_with_issues'] == 1
+        assert stats['total_issues'] > 0
+
     def test_fix_command_dry_run(self, temp_dir, sample_py2_file, capsys):
         """Test fix command in dry run mode."""
         from cli import command_fix
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the distributed_runner module.
+"""
+
+import os
+import sys
+import tempfile
+import shutil
+import threading
+import multiprocessing
+from multiprocessing.connection import Client
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from distributed_runner import DistributedMigrationRunner, WorkerNode, parse_address
+
+SECRET = b'test-secret'
+
+
+def _serve(address):
+    WorkerNode(address, SECRET, workers=2, quiet=True).run(connect_timeout=10)
+
+
+class TestDistributedMigrationRunner:
+    """Test suite for DistributedMigrationRunner and WorkerNode"""
+
+    def setup_method(self):
+        """Create a few Python 2 files and a coordinator on localhost"""
+        self.test_dir = tempfile.mkdtemp()
+        self.files = []
+        for i in range(7):
+            path = os.path.join(self.test_dir, f'module{i}.py')
+            with open(path, 'w') as f:
+                f.write(f'print "module {i}"\n')
+            self.files.append(path)
+        self.runner = DistributedMigrationRunner(('127.0.0.1', 0), SECRET, workers=4,
+                                                 chunk_size=1, quiet=True)
+        self.nodes = []
+
+    def teardown_method(self):
+        """Clean up test environment"""
+        self.runner.close()
+        for node in self.nodes:
+            node.join(timeout=10)
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _start_node(self):
+        node = multiprocessing.Process(target=_serve, args=(self.runner.address,))
+        node.start()
+        self.nodes.append(node)
+
+    def test_parse_address(self):
+        """Test HOST:PORT parsing"""
+        assert parse_address('build-3:7070') == ('build-3', 7070)
+        assert parse_address(':7070') == ('0.0.0.0', 7070)
+        with pytest.raises(ValueError):
+            parse_address('build-3')
+
+    def test_nodes_share_the_work(self):
+        """Test that results from several nodes are merged into one summary"""
+        self._start_node()
+        self._start_node()
+        summary = self.runner.check_files(self.files)
+
+        assert summary['backend'] == 'distributed'
+        assert summary['successful'] == 7
+        assert summary['total_issues'] == 7
+        assert sum(node['files'] for node in summary['nodes']) == 7
+        assert all(node['lost'] is None for node in summary['nodes'])
+        assert summary['workers'] == 2 * len(summary['nodes'])
+
+    def test_lost_node_work_requeued(self):
+        """Test that the tasks of a node that went away are run by another"""
+        grabbed = []
+
+        def flaky_node():
+            conn = Client(self.runner.address, authkey=SECRET)
+            conn.send(('hello', 'flaky', 3))
+            conn.recv()
+            conn.send(('more', 3))
+            grabbed.extend(conn.recv()[1])
+            conn.close()
+            self._start_node()
+
+        thread = threading.Thread(target=flaky_node)
+        thread.start()
+        summary = self.runner.check_files(self.files)
+        thread.join()
+
+        assert len(grabbed) == 3
+        assert summary['successful'] == 7
+        assert summary['requeued'] == 3
+        flaky = summary['nodes'][0]
+        assert (flaky['host'], flaky['files'], flaky['lost']) == ('flaky', 0, 'connection lost')
+        assert summary['nodes'][1]['files'] == 7
+
+    def test_no_nodes_fails_files(self):
+        """Test that a run without nodes gives up after the connect timeout"""
+        self.runner.connect_timeout = 0.2
+        summary = self.runner.fix_files(self.files, backup=False)
+
+        assert summary['failed'] == 7
+        assert 'no worker node connected' in summary['results'][0]['error']
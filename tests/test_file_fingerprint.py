@@ -0,0 +1,115 @@
+"""
+Unit tests for the stat-keyed fingerprint service and the caches sharing it.
+"""
+
+import os
+import time
+
+import pytest
+
+from cache_manager import CacheManager
+from file_fingerprint import FingerprintService, content_hash, fingerprint_service
+from verification_record import VerificationRecord
+from verifier import Python3CompatibilityVerifier
+
+
+def _write_old(path, text):
+    """Write a file with an mtime outside the racy window."""
+    path.write_text(text)
+    old = time.time() - 60
+    os.utime(path, (old, old))
+
+
+@pytest.mark.unit
+class TestFingerprintService:
+    """Test hashing only on stat changes."""
+
+    def test_hashes_once_while_unchanged(self, temp_dir):
+        """Test that repeat lookups are answered from the stat tuple."""
+        path = temp_dir / "a.py"
+        _write_old(path, "x = 1\n")
+        service = FingerprintService()
+
+        first = service.get(str(path))
+        second = service.get(str(path))
+
+        assert first.digest == content_hash(b"x = 1\n")
+        assert second == first
+        assert (service.hashes, service.stat_hits) == (1, 1)
+
+    def test_rehashes_on_change(self, temp_dir):
+        """Test that a changed stat tuple triggers a new hash."""
+        path = temp_dir / "a.py"
+        _write_old(path, "x = 1\n")
+        service = FingerprintService()
+        service.get(str(path))
+
+        _write_old(path, "x = 22\n")
+
+        assert service.fingerprint(str(path)) == content_hash(b"x = 22\n")
+        assert service.hashes == 2
+
+    def test_recent_files_not_trusted(self, temp_dir):
+        """Test that a file modified just now is hashed on every lookup."""
+        path = temp_dir / "a.py"
+        path.write_text("x = 1\n")
+        service = FingerprintService()
+
+        assert service.get(str(path)).stat is None
+        service.get(str(path))
+        assert service.hashes == 2
+
+    def test_known_fingerprint_skips_hash(self, temp_dir):
+        """Test that a stored stat tuple and digest are reused without reading."""
+        path = temp_dir / "a.py"
+        _write_old(path, "x = 1\n")
+        stored = FingerprintService().get(str(path))
+        service = FingerprintService()
+
+        assert service.get(str(path), known=(stored.stat, "stored")).digest == "stored"
+        assert service.hashes == 0
+
+        _write_old(path, "x = 22\n")
+        assert service.get(str(path), known=(stored.stat, "stored")).digest != "stored"
+
+    def test_missing_file(self, temp_dir):
+        """Test that unreadable files have no fingerprint."""
+        assert FingerprintService().fingerprint(str(temp_dir / "missing.py")) == ""
+
+
+@pytest.mark.unit
+class TestFingerprintConsumers:
+    """Test that the caches reuse stored stat tuples across processes."""
+
+    def test_cache_manager_reuses_stat(self, temp_dir):
+        """Test that a new process answers an unchanged file without hashing."""
+        path = temp_dir / "a.py"
+        _write_old(path, "x = 1\n")
+        cache = CacheManager(cache_dir=str(temp_dir / "cache"))
+        cache.set_analysis_cache(str(path), {"lines": 1})
+        cache.fingerprints = FingerprintService()  # as in a fresh process
+
+        assert cache.get_analysis_cache(str(path)) == {"lines": 1}
+        assert cache.fingerprints.hashes == 0
+        cache.close()
+
+    def test_verifier_record_reuses_stat(self, temp_dir):
+        """Test that an incremental rerun neither hashes nor reads unchanged files."""
+        path = temp_dir / "legacy.py"
+        _write_old(path, "for i in xrange(3):\n    pass\n")
+        record_path = str(temp_dir / "record.json")
+        verifier = Python3CompatibilityVerifier(verbose=False)
+        verifier.open_record(record_path)
+        verifier.verify_file(str(path))
+        verifier.save_record()
+
+        fingerprint_service().clear()
+        hashes = fingerprint_service().hashes
+        rerun = Python3CompatibilityVerifier(verbose=False)
+        rerun.open_record(record_path)
+        rerun.verify_file(str(path))
+
+        assert rerun.record.hits == 1
+        assert fingerprint_service().hashes == hashes
+        assert [issue["issue"] for issue in rerun.issues_found] == ["xrange_usage"]
+        assert VerificationRecord(record_path, rerun.record.fingerprint).files
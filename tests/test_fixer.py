@@ -16,14 +16,17 @@ class TestFixerInitialization:
         """Test fixer initialization with default backup directory."""
         fixer = Python2to3Fixer(backup_dir=str(temp_dir / "backup"))
         assert fixer.backup_dir == str(temp_dir / "backup")
-        assert (temp_dir / "backup").exists()
     
-    def test_fixer_init_creates_backup_dir(self, temp_dir):
-        """Test that fixer creates backup directory if it doesn't exist."""
+    def test_fixer_creates_backup_dir_when_needed(self, temp_dir):
+        """Test that the backup directory is created by the first backup."""
         backup_path = temp_dir / "new_backup"
-        assert not backup_path.exists()
+        test_file = temp_dir / "legacy.py"
+        test_file.write_text('print "hello"\n')
         
         fixer = Python2to3Fixer(backup_dir=str(backup_path))
+        assert not backup_path.exists()
+        
+        fixer.fix_file(str(test_file))
         assert backup_path.exists()
     
     def test_fixer_has_fix_patterns(self, temp_dir):
@@ -209,6 +212,71 @@ class TestFixerFileMethods:
         # Normal file should be changed
         assert test_file_normal.read_text() != test_content
 
+    
+    def test_fix_file_skips_backup_when_unchanged(self, temp_dir):
+        """Test that files needing no fixes are neither backed up nor rewritten."""
+        backup_dir = temp_dir / "backup"
+        fixer = Python2to3Fixer(backup_dir=str(backup_dir))
+        
+        test_file = temp_dir / "clean.py"
+        test_file.write_text('x = 1\n')
+        mtime_before = test_file.stat().st_mtime_ns
+        
+        result = fixer.fix_file(str(test_file))
+        
+        assert result['success'] is True
+        assert not backup_dir.exists()
+        assert test_file.stat().st_mtime_ns == mtime_before
+
+@pytest.mark.unit
+class TestFixerSourceAPI:
+    """Test the in-memory fix_source API."""
+    
+    def test_fix_source_returns_text_and_fixes(self, temp_dir):
+        """Test that fix_source rewrites text and reports per-fix counts."""
+        fixer = Python2to3Fixer(backup_dir=str(temp_dir / "backup"))
+        
+        new_source, fixes = fixer.fix_source('print "a"\nx = xrange(2)\n')
+        
+        assert 'print("a")' in new_source
+        assert 'range(2)' in new_source
+        assert {fix["fix"]: fix["count"] for fix in fixes} == {
+            "print_statements": 1,
+            "xrange_calls": 1,
+        }
+        assert fixer.fixes_applied == []
+    
+    def test_fix_source_has_no_side_effects(self, temp_dir, capsys):
+        """Test that fix_source neither prints nor creates the backup dir."""
+        backup_path = temp_dir / "backup"
+        fixer = Python2to3Fixer(backup_dir=str(backup_path))
+        capsys.readouterr()
+        
+        fixer.fix_source('import urllib2\n')
+        
+        assert capsys.readouterr().out == ""
+        assert not backup_path.exists()
+    
+    def test_fix_source_examples(self, temp_dir):
+        """Test that fix_source can keep matched snippets per fix."""
+        fixer = Python2to3Fixer(backup_dir=None)
+        
+        _, fixes = fixer.fix_source('a.iteritems()\nb.iteritems()\n', examples=1)
+        
+        assert fixes[0]["matches"] == [".iteritems()"]
+    
+    def test_fix_file_without_backup_dir(self, temp_dir, capsys):
+        """Test that a quiet fixer without backup dir still writes fixes."""
+        fixer = Python2to3Fixer(backup_dir=None, verbose=False)
+        
+        test_file = temp_dir / "nobackup.py"
+        test_file.write_text('import urllib2\n')
+        
+        result = fixer.fix_file(str(test_file))
+        
+        assert result['success'] is True
+        assert 'import urllib.request' in test_file.read_text()
+        assert capsys.readouterr().out == ""
 
 @pytest.mark.unit
 class TestFixerDirectoryMethods:
@@ -259,6 +327,25 @@ class TestFixerDirectoryMethods:
         # At least some fixes should have been applied
         assert len(fixer.fixes_applied) > 0 or result is True
     
+    def test_fix_directory_backs_up_changed_files_only(self, temp_dir):
+        """Test that a directory run backs up only the files it rewrites."""
+        backup_dir = temp_dir / "backup"
+        test_dir = temp_dir / "mixed"
+        (test_dir / "sub").mkdir(parents=True)
+        (test_dir / "old.py").write_text('print "old"\n')
+        (test_dir / "sub" / "old.py").write_text('x = xrange(2)\n')
+        (test_dir / "clean.py").write_text('x = 1\n')
+        
+        fixer = Python2to3Fixer(backup_dir=str(backup_dir))
+        result = fixer.fix_directory(str(test_dir))
+        
+        assert result['success'] is True
+        backups = sorted(p.name for p in backup_dir.iterdir())
+        assert len(backups) == 2
+        assert all(name.startswith("old.py.") for name in backups)
+        assert (test_dir / "clean.py").read_text() == 'x = 1\n'
+        assert 'range(2)' in (test_dir / "sub" / "old.py").read_text()
+    
     def test_dry_run_mode_directory(self, temp_dir):
         """Test that dry-run mode doesn't modify directory files."""
         backup_dir = temp_dir / "backup"
@@ -328,3 +415,104 @@ class TestFixerIntegration:
             if py_file.name != "__init__.py":
                 content = py_file.read_text()
                 assert 'print("' in content or py_file.name == "__init__.py"
+
+
+@pytest.mark.unit
+class TestFixerRewriteEngine:
+    """Test the single-pass rewrite engine behind fix_file."""
+    
+    def test_engine_matches_sequential_passes(self, temp_dir):
+        """Test that one scan gives the same result as per-pattern passes."""
+        fixer = Python2to3Fixer(backup_dir=str(temp_dir / "backup"))
+        content = (
+            'print "x"\nimport urllib2\nfor k, v in d.iteritems():\n'
+            '    print k\nclass Old:\n    pass\nexcept ValueError, e:\n'
+        )
+        
+        expected = content
+        expected_counts = []
+        for fix_info in fixer.fix_patterns.values():
+            expected, count = fixer._apply_fix(expected, fix_info)
+            expected_counts.append(count)
+        
+        assert fixer._engine.rewrite(content) == (expected, expected_counts)
+    
+    def test_engine_rewrites_nested_matches(self, temp_dir):
+        """Test that a match inside another fix's match is still rewritten."""
+        fixer = Python2to3Fixer(backup_dir=str(temp_dir / "backup"))
+        
+        content, counts = fixer._engine.rewrite('print xrange(3)\n')
+        
+        assert content == 'print(range(3))\n'
+        counts_by_name = dict(zip(fixer._engine.names, counts))
+        assert counts_by_name["print_statements"] == 1
+        assert counts_by_name["xrange_calls"] == 1
+    
+    def test_engine_does_not_chain_across_replacements(self, temp_dir):
+        """Test that a replacement plus the text after it is not matched again."""
+        fixer = Python2to3Fixer(backup_dir=str(temp_dir / "backup"))
+        
+        content, counts = fixer._engine.rewrite('from ConfigParser import ConfigParser\n')
+        
+        # Sequential passes gave 'from configparser import configparser as ConfigParser'
+        assert content == 'from configparser import ConfigParser\n'
+        assert {name: count for name, count in zip(fixer._engine.names, counts) if count} == {
+            "configparser_imports": 1
+        }
+    
+    def test_fix_file_reports_per_fix_counts(self, temp_dir):
+        """Test that fixes_applied keeps one entry per fix with its count."""
+        fixer = Python2to3Fixer(backup_dir=str(temp_dir / "backup"))
+        
+        test_file = temp_dir / "counts.py"
+        test_file.write_text('x = xrange(1)\ny = xrange(2)\nprint x\n')
+        
+        fixer.fix_file(str(test_file))
+        
+        fixes = {fix["fix"]: fix["count"] for fix in fixer.fixes_applied}
+        assert fixes == {"print_statements": 1, "xrange_calls": 2}
+
+
+@pytest.mark.unit
+class TestFixerStreaming:
+    """Test the memory-mapped streaming mode for large files."""
+    
+    def _streaming_fixer(self, temp_dir):
+        fixer = Python2to3Fixer(backup_dir=str(temp_dir / "backup"), verbose=False)
+        fixer.STREAM_THRESHOLD_BYTES = 0
+        return fixer
+    
+    def test_streaming_matches_in_memory_fix(self, temp_dir, sample_py2_file):
+        """Test that streamed files get the same content and fix counts."""
+        streamed_file = temp_dir / "streamed.py"
+        streamed_file.write_text(sample_py2_file.read_text())
+        
+        fixer = Python2to3Fixer(backup_dir=str(temp_dir / "backup"), verbose=False)
+        fixer.fix_file(str(sample_py2_file))
+        streaming = self._streaming_fixer(temp_dir)
+        streaming.fix_file(str(streamed_file))
+        
+        assert streamed_file.read_text() == sample_py2_file.read_text()
+        assert [(f["fix"], f["count"]) for f in streaming.fixes_applied] == \
+            [(f["fix"], f["count"]) for f in fixer.fixes_applied]
+    
+    def test_streaming_handles_matches_across_lines(self, temp_dir):
+        """Test that patterns spanning a line break are still rewritten."""
+        test_file = temp_dir / "multiline.py"
+        test_file.write_text('try:\n    pass\nexcept\n    ValueError, e:\n    pass\n')
+        
+        self._streaming_fixer(temp_dir).fix_file(str(test_file))
+        
+        assert 'except ValueError as e:' in test_file.read_text()
+    
+    def test_streaming_leaves_unchanged_file_alone(self, temp_dir):
+        """Test that streamed files without fixes are not replaced."""
+        test_file = temp_dir / "clean.py"
+        test_file.write_text('x = 1\r\n')
+        inode_before = test_file.stat().st_ino
+        
+        result = self._streaming_fixer(temp_dir).fix_file(str(test_file))
+        
+        assert result['success'] is True
+        assert test_file.stat().st_ino == inode_before
+        assert sorted(p.name for p in temp_dir.iterdir()) == ["clean.py"]
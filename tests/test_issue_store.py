@@ -0,0 +1,143 @@
+"""
+Unit tests for the columnar verifier issue store and its consumers.
+"""
+
+import pickle
+
+import pytest
+
+from issue_store import IssueStore
+from report_generator import MigrationReportGenerator
+from stats_tracker import MigrationStatsTracker
+from status_reporter import MigrationStatusReporter
+
+
+def _issue(file, line, issue="xrange_usage", severity="error", code="xrange(3)"):
+    return {
+        "file": file,
+        "line": line,
+        "issue": issue,
+        "severity": severity,
+        "description": "%s found" % issue,
+        "suggestion": "Fix %s" % issue,
+        "code": code,
+    }
+
+
+@pytest.fixture
+def store():
+    """Store with issues in two files and two severities."""
+    return IssueStore([
+        _issue("a.py", 1),
+        _issue("b.py", 2, "old_style_class", "warning", "class A:"),
+        _issue("a.py", 3),
+        _issue("a.py", 4, "old_style_class", "warning", "class B:"),
+    ])
+
+
+@pytest.mark.unit
+class TestIssueStore:
+    """Test the list-like interface and aggregations."""
+
+    def test_round_trip(self, store):
+        """Test that stored issues read back as the original dicts."""
+        assert len(store) == 4
+        assert store[0] == _issue("a.py", 1)
+        assert store[-1] == _issue("a.py", 4, "old_style_class", "warning", "class B:")
+        assert [i["line"] for i in store[1:3]] == [2, 3]
+        assert store == [_issue("a.py", 1), store[1], store[2], store[3]]
+
+    def test_irregular_issues(self):
+        """Test issues with missing keys, unusual values and extra keys."""
+        read_error = {"file": "c.py", "line": 1, "issue": "read_error",
+                      "severity": "error", "description": "Cannot read", "suggestion": "Check"}
+        odd = {"file": "d.py", "line": None, "issue": "x", "severity": "info",
+               "description": "d", "suggestion": None, "code": ["not", "hashable"], "extra": 1}
+        store = IssueStore([read_error, odd])
+
+        assert store[0] == read_error
+        assert "code" not in store[0]
+        assert store[1] == odd
+        assert list(store[1]) == list(odd)
+
+    def test_delete_tail(self, store):
+        """Test truncating the store, as the streaming verifier does on retry."""
+        store.append({"file": "e.py", "line": "?", "issue": "x", "severity": "error",
+                      "description": "d", "suggestion": "s"})
+        del store[2:]
+
+        assert len(store) == 2
+        assert store[1]["file"] == "b.py"
+        store.append(_issue("c.py", 9))
+        assert store[2] == _issue("c.py", 9)
+
+    def test_emptied_store_releases_interned_values(self, store):
+        """Test that emptying the store also drops its interned files and kinds."""
+        del store[:]
+        store.append(_issue("c.py", 9))
+        del store[0]
+
+        assert len(store) == 0
+        assert store._files.values == store._kinds.values == store._codes.values == []
+        store.append(_issue("d.py", 1))
+        assert list(store) == [_issue("d.py", 1)]
+
+    def test_aggregations(self, store):
+        """Test counts and group-bys over the integer columns."""
+        assert store.count_by_file() == {"a.py": 3, "b.py": 1}
+        assert store.count_by_type() == {"xrange_usage": 2, "old_style_class": 2}
+        assert store.severity_counts() == {"error": 2, "warning": 2}
+        assert store.files() == ["a.py", "b.py"]
+        assert [i["line"] for i in store.rows(severity="warning", file="a.py")] == [4]
+        assert list(store.group_by_file("error")) == ["a.py"]
+        assert [i["line"] for i in store.group_by_type()["old_style_class"]] == [2, 4]
+
+    def test_pickle(self, store):
+        """Test that stores survive the trip to and from worker processes."""
+        copy = pickle.loads(pickle.dumps(store))
+
+        assert copy == store
+        copy.append(_issue("a.py", 5))
+        assert copy.count_by_file() == {"a.py": 4, "b.py": 1}
+
+
+@pytest.mark.unit
+class TestIssueStoreConsumers:
+    """Test the reporting modules that read the store directly."""
+
+    def test_stats_tracker(self, temp_dir):
+        """Test that snapshot statistics come from the verifier's store."""
+        (temp_dir / "legacy.py").write_text("for i in xrange(3):\n    pass\n")
+        (temp_dir / "clean.py").write_text("x = 1\n")
+
+        stats = MigrationStatsTracker(str(temp_dir)).collect_stats()
+
+        assert stats["summary"]["files_with_issues"] == 1
+        assert stats["summary"]["clean_files"] == 1
+        assert stats["issues_by_type"] == {"xrange_usage": 1}
+        assert stats["issues_by_severity"] == {"error": 1}
+
+    def test_report_generator(self, store, temp_dir):
+        """Test that an added store is counted and rendered."""
+        generator = MigrationReportGenerator()
+        generator.add_issue("z.py", "manual", "Manual issue", severity="warning")
+        generator.add_issues(store)
+
+        html = generator._build_html()
+
+        assert generator._issue_count() == 5
+        assert generator.report_data["statistics"]["error_count"] == 2
+        assert generator.report_data["statistics"]["warning_count"] == 3
+        assert "Warnings (3)" in html and "class B:" in html
+
+    def test_status_reporter(self, store, temp_dir):
+        """Test status stats built from a live store."""
+        reporter = MigrationStatusReporter(str(temp_dir), str(temp_dir / "stats"))
+
+        report = reporter.generate_status_report(issues=store)
+
+        assert report["stats"]["total_issues"] == 4
+        assert report["stats"]["files_with_issues"] == 2
+        assert report["stats"]["critical_issues"] == 2
+        assert report["stats"]["medium_issues"] == 2
+        assert report["progress"] < 100
@@ -0,0 +1,110 @@
+"""
+Unit tests for the literal prefilter and the tools that use it.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from literal_prefilter import LiteralPrefilter, required_literals
+from fixer import Python2to3Fixer
+from verifier import Python3CompatibilityVerifier
+from freeze_guard import FreezeGuard
+from custom_rules import CustomRule
+
+
+@pytest.mark.unit
+class TestRequiredLiterals:
+    """Test extraction of required literals from regexes."""
+
+    @pytest.mark.parametrize("pattern,expected", [
+        (r"\bxrange\(", ("xrange(",)),
+        (r"except\s+(\w+),\s*(\w+):", ("except",)),
+        (r"^class\s+(\w+):", ("class",)),
+        (r"import (urllib2|cPickle)", ("import ",)),
+        (r"(?:urllib2|cPickle)\.", ("urllib2", "cPickle")),
+        (r"(foo|bar)+x?", ("foo", "bar")),
+        (r"(?=abc)d", ("d",)),
+        (r"ab(?i:cd)ef", ("ab",)),
+    ])
+    def test_extracts_longest_literal(self, pattern, expected):
+        """Test that the most selective required literal is chosen."""
+        assert required_literals(pattern) == expected
+
+    @pytest.mark.parametrize("pattern", [r"x*", r"\d+\s*", r"(?i)xrange", r"(a|\d)", r"("])
+    def test_no_requirement(self, pattern):
+        """Test patterns without a usable literal (or invalid ones)."""
+        assert required_literals(pattern) is None
+
+
+@pytest.mark.unit
+class TestLiteralPrefilter:
+    """Test the multi-literal scan."""
+
+    def test_overlapping_literals(self):
+        """Test that literals sharing text are all reported."""
+        prefilter = LiteralPrefilter({"a": ("ab",), "b": ("bc",), "c": ("abc",), "d": ("zz",)})
+
+        assert prefilter.present("xabcx") == {"ab", "bc", "abc"}
+        assert prefilter.candidates("xabcx") == ["a", "b", "c"]
+        assert prefilter.absent("xabcx") == {"d"}
+
+    def test_entries_without_literal_always_run(self):
+        """Test that patterns without a literal are never filtered out."""
+        prefilter = LiteralPrefilter({"digits": r"\d+", "xrange": r"\bxrange\("})
+
+        assert prefilter.candidates("x = 1") == ["digits"]
+        assert prefilter.candidates("xrange(3)", keys=["xrange"]) == ["xrange"]
+
+
+@pytest.mark.unit
+class TestPrefilterConsumers:
+    """Test that prefiltered tools keep their results."""
+
+    def test_fixer_matches_sequential_passes(self):
+        """Test that skipping absent fixes does not change the rewrite."""
+        fixer = Python2to3Fixer(backup_dir=None, verbose=False)
+        source = "for i in xrange(3):\n    d.iteritems()\nx = 1\n"
+
+        expected = source
+        for fix_info in fixer.fix_patterns.values():
+            expected = fixer._apply_fix(expected, fix_info)[0]
+
+        assert fixer._engine.rewrite(source)[0] == expected
+        assert fixer._engine.rewrite("x = 1\n") == ("x = 1\n", [0] * len(fixer.fix_patterns))
+
+    def test_verifier_skips_import_walk(self, temp_dir):
+        """Test that the AST import walk only runs when a module name occurs."""
+        clean = temp_dir / "clean.py"
+        clean.write_text("import os\n")
+        legacy = temp_dir / "legacy.py"
+        legacy.write_text("import os\nimport commands\n")
+        verifier = Python3CompatibilityVerifier()
+
+        with patch.object(verifier, "_check_import_name") as check_import_name:
+            verifier.verify_file(str(clean))
+            assert not check_import_name.called
+            verifier.verify_file(str(legacy))
+            assert check_import_name.call_count == 2
+
+    def test_freeze_guard_checks(self, temp_dir):
+        """Test freeze guard results with and without py2 markers."""
+        guard = FreezeGuard(str(temp_dir / "freeze.json"))
+        clean = temp_dir / "clean.py"
+        clean.write_text("for i in range(3):\n    print(i)\n")
+        legacy = temp_dir / "legacy.py"
+        legacy.write_text("import urllib2\nfor i in xrange(3):\n    pass\n")
+
+        assert guard.check_file_for_py2_patterns(str(clean)) == []
+        violations = guard.check_file_for_py2_patterns(str(legacy))
+        assert [(v.line_num, v.pattern) for v in violations] == [
+            (1, "Python 2 urllib2 import"),
+            (2, "Python 2 xrange() function"),
+        ]
+
+    def test_custom_rule_without_literal(self):
+        """Test that a rule whose literal is absent leaves content untouched."""
+        rule = CustomRule("r1", "old_api", "Rename old_api", r"old_api\(", "new_api(")
+
+        assert rule.apply("x = 1\n") == ("x = 1\n", 0)
+        assert rule.apply("old_api(1)\n") == ("new_api(1)\n", 1)
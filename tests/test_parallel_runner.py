@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Tests for the parallel_runner module.
+"""
+
+import os
+import signal
+import sys
+import tempfile
+import shutil
+import time
+import multiprocessing
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cache_manager import CacheManager
+from parallel_runner import ParallelMigrationRunner, _MemoryGovernor, _WorkerPool, probe_backends
+from smell_detector import CodeSmellDetector
+from verifier import Python3CompatibilityVerifier
+
+
+class LineCounter:
+    """Minimal map/reduce analyzer"""
+    
+    def map_file(self, path):
+        if path.endswith('module3.py'):
+            raise ValueError('unreadable')
+        with open(path) as f:
+            return len(f.readlines())
+    
+    def reduce_files(self, results):
+        return results
+
+
+class TestParallelMigrationRunner:
+    """Test suite for ParallelMigrationRunner"""
+    
+    def setup_method(self):
+        """Create a few Python 2 files"""
+        self.test_dir = tempfile.mkdtemp()
+        self.files = []
+        for i in range(7):
+            path = os.path.join(self.test_dir, f'module{i}.py')
+            with open(path, 'w') as f:
+                f.write(f'print "module {i}"\n')
+            self.files.append(path)
+    
+    def teardown_method(self):
+        """Clean up test environment"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_adaptive_chunk_size(self):
+        """Test that chunks aim at a few tasks per worker"""
+        runner = ParallelMigrationRunner(workers=4)
+        assert runner.chunk_size_for(1) == 1
+        assert runner.chunk_size_for(160) == 10
+        assert runner.chunk_size_for(10 ** 6) == ParallelMigrationRunner.MAX_CHUNK_SIZE
+    
+    def test_explicit_chunk_size(self):
+        """Test that a given chunk size overrides the adaptive one"""
+        runner = ParallelMigrationRunner(workers=4, chunk_size=3)
+        assert runner.chunk_size_for(1000) == 3
+    
+    def test_check_files_in_chunks(self):
+        """Test that chunked checks report every file and its issues"""
+        runner = ParallelMigrationRunner(workers=2, chunk_size=3)
+        summary = runner.check_files(self.files)
+        
+        assert summary['total_files'] == 7
+        assert summary['successful'] == 7
+        assert summary['chunk_size'] == 3
+        assert summary['chunks'] == 3
+        assert summary['overhead_per_file_ms'] >= 0
+        assert sorted(r['file'] for r in summary['results']) == sorted(self.files)
+        for result in summary['results']:
+            assert result['issues'] == len(result['issue_details']) > 0
+            assert all(issue['file'] == result['file'] for issue in result['issue_details'])
+    
+    def test_fix_files_in_chunks(self):
+        """Test that one fixer per worker fixes every file once"""
+        runner = ParallelMigrationRunner(workers=2, chunk_size=2)
+        summary = runner.fix_files(self.files, backup=False)
+        
+        assert summary['successful'] == 7
+        assert summary['chunks'] == 4
+        assert all(r['fixes_applied'] == 1 for r in summary['results'])
+        with open(self.files[0]) as f:
+            assert 'print("module 0")' in f.read()
+    
+    def test_schedule_longest_first(self):
+        """Test that recorded durations put the slowest file in the first task"""
+        runner = ParallelMigrationRunner(workers=2)
+        history = {path: (os.path.getsize(path), 0.01) for path in self.files}
+        history[self.files[5]] = (os.path.getsize(self.files[5]), 10.0)
+        tasks = runner.schedule(self.files, 'fix', history)
+        
+        assert tasks[0] == [self.files[5]]
+        assert sorted(item for task in tasks for item in task) == sorted(self.files)
+    
+    def test_estimate_scales_recorded_duration(self):
+        """Test that a grown file costs proportionally more than recorded"""
+        runner = ParallelMigrationRunner(workers=2)
+        size = os.path.getsize(self.files[0])
+        costs = runner.estimate_costs(self.files[:1], {self.files[0]: (size // 2, 1.0)})
+        assert costs[0] == pytest.approx(size / (size // 2))
+    
+    def test_large_file_split_into_ranges(self):
+        """Test that a split file reports the same issues as a whole check"""
+        big = os.path.join(self.test_dir, 'big.py')
+        with open(big, 'w') as f:
+            for i in range(400):
+                f.write(f'print "line {i}"\n' if i % 3 == 0 else f'x{i} = xrange({i})\n')
+        runner = ParallelMigrationRunner(workers=2)
+        runner.SPLIT_THRESHOLD_BYTES = 0
+        runner.MIN_RANGE_BYTES = 1
+        
+        tasks = runner.schedule([big] + self.files, 'check')
+        assert sum(1 for task in tasks for item in task if isinstance(item, tuple)) == 2
+        
+        summary = runner.check_files([big] + self.files)
+        assert summary['split_files'] == 1
+        result = next(r for r in summary['results'] if r['file'] == big)
+        
+        verifier = Python3CompatibilityVerifier(verbose=False)
+        verifier.verify_range(big, 0, os.path.getsize(big))
+        assert result['issue_details'] == list(verifier.issues_found)
+        assert 0.0 <= summary['utilization'] <= 1.0
+        assert summary['tail_latency'] >= 0.0
+    
+    def test_durations_recorded_in_cache(self):
+        """Test that runs with a cache record per-file durations"""
+        cache_dir = os.path.join(self.test_dir, '.cache')
+        runner = ParallelMigrationRunner(workers=2, cache_dir=cache_dir)
+        runner.check_files(self.files)
+        
+        with CacheManager(cache_dir) as cache:
+            timings = cache.get_timings('check', self.files)
+        assert set(timings) == set(self.files)
+        assert all(size > 0 and seconds >= 0 for size, seconds in timings.values())
+    
+    def test_results_shared_with_verification_record(self):
+        """Test that check results are reused by path-independent content hash"""
+        cache_dir = os.path.join(self.test_dir, '.cache')
+        first = ParallelMigrationRunner(workers=2, cache_dir=cache_dir).check_files(self.files)
+
+        moved_dir = os.path.join(self.test_dir, 'moved')
+        os.makedirs(moved_dir)
+        moved = [shutil.copy(path, moved_dir) for path in self.files]
+        again = ParallelMigrationRunner(workers=2, cache_dir=cache_dir).check_files(moved)
+
+        assert again['cached'] == 7
+        assert again['total_issues'] == first['total_issues']
+        for result in again['results']:
+            assert all(issue['file'] == result['file'] for issue in result['issue_details'])
+
+        verifier = Python3CompatibilityVerifier(verbose=False)
+        verifier.open_record(os.path.join(cache_dir, 'verification_record.json'))
+        verifier.verify_file(self.files[0])
+        assert verifier.record.hits == 1
+
+    def test_backends_find_the_same_issues(self):
+        """Test that every backend reports the same results"""
+        counts = {}
+        for backend in ('serial', 'threads', 'processes'):
+            runner = ParallelMigrationRunner(workers=2, backend=backend, quiet=True)
+            summary = runner.check_files(self.files)
+            assert summary['backend'] == backend
+            counts[backend] = sorted((r['file'], r['issues']) for r in summary['results'])
+            assert len(runner.issues) == summary['total_issues']
+        assert counts['serial'] == counts['threads'] == counts['processes']
+    
+    def test_unknown_backend_rejected(self):
+        """Test that an unknown backend name raises ValueError"""
+        with pytest.raises(ValueError):
+            ParallelMigrationRunner(backend='gpu')
+    
+    def test_choose_backend_from_work(self):
+        """Test that small runs stay serial and large runs use processes"""
+        runner = ParallelMigrationRunner(workers=4)
+        runner._calibration = {'file_seconds': 0.001, 'byte_seconds': 1e-7,
+                               'thread_speedup': 1.0, 'process_start': 0.1}
+        
+        assert runner.choose_backend(0.01) == 'serial'
+        assert runner.choose_backend(0.1) == 'serial'
+        assert runner.choose_backend(10.0) == 'processes'
+        
+        runner._calibration['thread_speedup'] = 3.0
+        assert runner.choose_backend(0.3) == 'threads'
+        
+        runner.backend = 'processes'
+        assert runner.choose_backend(0.01) == 'processes'
+    
+    def test_probe_phases_start_cold(self, monkeypatch):
+        """Test that no timed probe phase reuses another phase's parses"""
+        import ast
+        calls = []
+        real_parse = ast.parse
+        monkeypatch.setattr(ast, 'parse', lambda *a, **k: calls.append(1) or real_parse(*a, **k))
+        probe_backends()
+
+        # 17 files checked serially, then twice that on two threads
+        assert len(calls) == 3 * 17
+
+    def test_probe_results_reused_from_cache(self):
+        """Test that the probe runs once per cache directory"""
+        cache_dir = os.path.join(self.test_dir, '.cache')
+        costs = ParallelMigrationRunner(cache_dir=cache_dir).calibrate()
+        assert set(costs) == {'file_seconds', 'byte_seconds', 'thread_speedup', 'process_start'}
+        
+        again = ParallelMigrationRunner(cache_dir=cache_dir)
+        assert again.calibrate() == costs
+    
+    @pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                        reason='workers must inherit the patched verifier')
+    def test_hung_and_crashed_files_quarantined(self, monkeypatch):
+        """Test that a hung or crashing file costs only its own result"""
+        verify_file = Python3CompatibilityVerifier.verify_file
+        
+        def poisoned(verifier, path):
+            if path == self.files[2]:
+                time.sleep(30)
+            if path == self.files[4]:
+                os.kill(os.getpid(), signal.SIGSEGV)
+            return verify_file(verifier, path)
+        
+        monkeypatch.setattr(Python3CompatibilityVerifier, 'verify_file', poisoned)
+        runner = ParallelMigrationRunner(workers=2, backend='processes', chunk_size=3,
+                                         timeout=0.5, quiet=True)
+        start = time.time()
+        summary = runner.check_files(self.files)
+        
+        assert time.time() - start < 10
+        assert summary['successful'] == 5
+        reasons = {entry['file']: entry['reason'] for entry in summary['quarantined']}
+        assert reasons[self.files[2]].startswith('timed out')
+        assert reasons[self.files[4]] == 'worker killed by signal 11'
+    
+    @pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                        reason='workers must inherit the patched verifier')
+    def test_lost_worker_keeps_finished_items(self, monkeypatch):
+        """Test that batches sent before a crash are kept and the rest run again"""
+        import parallel_runner
+        verify_file = Python3CompatibilityVerifier.verify_file
+        log = os.path.join(self.test_dir, 'verified.log')
+        
+        def crashing(verifier, path):
+            with open(log, 'a') as f:
+                f.write(path + '\n')
+            if path == self.files[2]:
+                os.kill(os.getpid(), signal.SIGSEGV)
+            return verify_file(verifier, path)
+        
+        # One item first, then the rest of the task in a single batch
+        monkeypatch.setattr(parallel_runner, 'BATCH_SECONDS', 3600)
+        monkeypatch.setattr(Python3CompatibilityVerifier, 'verify_file', crashing)
+        yielded = list(_WorkerPool(1, 'check', {}).run([self.files[:4]]))
+        
+        assert [(chunk, type(outcome).__name__) for chunk, outcome in yielded] == [
+            (self.files[:1], 'dict'), (self.files[2:3], 'WorkerLost'),
+            ([self.files[1], self.files[3]], 'dict'),
+        ]
+        assert [row[0] for row in yielded[0][1]['files']] == self.files[:1]
+        with open(log) as f:
+            assert f.read().split() == self.files[:3] + [self.files[1], self.files[3]]
+    
+    @pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                        reason='workers must inherit the patched batch size')
+    def test_one_message_per_batch(self, monkeypatch):
+        """Test that workers send one message per batch, not per file"""
+        import parallel_runner
+        monkeypatch.setattr(parallel_runner, 'BATCH_SECONDS', 3600)
+        pool = _WorkerPool(1, 'check', {})
+        start = time.perf_counter()
+        yielded = list(pool.run([self.files]))
+        elapsed = time.perf_counter() - start
+        
+        assert pool.batches == 2
+        assert [chunk for chunk, _ in yielded] == [self.files]
+        print(f"\n{len(self.files)} files in {pool.batches} batches: {elapsed:.3f}s")
+    
+    @pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                        reason='workers must inherit the patched fixer')
+    def test_slow_fix_reported_not_killed(self, monkeypatch):
+        """Test that a fix over the budget finishes and is only reported"""
+        from fixer import Python2to3Fixer
+        fix_file = Python2to3Fixer.fix_file
+        
+        def slow(fixer, path, *args, **kwargs):
+            if path == self.files[1]:
+                time.sleep(0.5)
+            return fix_file(fixer, path, *args, **kwargs)
+        
+        monkeypatch.setattr(Python2to3Fixer, 'fix_file', slow)
+        runner = ParallelMigrationRunner(workers=1, backend='processes', chunk_size=3,
+                                         timeout=0.2, quiet=True)
+        summary = runner.fix_files(self.files[:3], backup=False)
+        
+        assert summary['successful'] == 3
+        with open(self.files[1]) as f:
+            assert f.read().endswith('print("module 1")\n')
+        reasons = {entry['file']: entry['reason'] for entry in summary['quarantined']}
+        assert 'over the 0.2s budget' in reasons[self.files[1]]
+    
+    @pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                        reason='workers must inherit the patched fixer')
+    def test_lost_fix_worker_removes_temp_files(self, monkeypatch):
+        """Test that a crashed fix leaves no temp files next to its file"""
+        from fixer import Python2to3Fixer
+        fix_file = Python2to3Fixer.fix_file
+        
+        def crashing(fixer, path, *args, **kwargs):
+            if path == self.files[1]:
+                os.close(Python2to3Fixer._temp_file(path, self.test_dir)[0])
+                os.kill(os.getpid(), signal.SIGSEGV)
+            return fix_file(fixer, path, *args, **kwargs)
+        
+        fd, sibling = Python2to3Fixer._temp_file(self.files[2], self.test_dir)
+        os.close(fd)
+        monkeypatch.setattr(Python2to3Fixer, 'fix_file', crashing)
+        runner = ParallelMigrationRunner(workers=1, backend='processes', quiet=True)
+        summary = runner.fix_files(self.files[:2], backup=False)
+        
+        reasons = {entry['file']: entry['reason'] for entry in summary['quarantined']}
+        assert reasons[self.files[1]] == 'worker killed by signal 11'
+        assert Python2to3Fixer.temp_files(self.files[1]) == []
+        assert Python2to3Fixer.temp_files(self.files[2]) == [sibling]
+    
+    def test_slow_file_reported_without_pool(self, monkeypatch):
+        """Test that the serial backend reports files over the budget"""
+        verify_file = Python3CompatibilityVerifier.verify_file
+        
+        def slow(verifier, path):
+            if path == self.files[1]:
+                time.sleep(0.2)
+            return verify_file(verifier, path)
+        
+        monkeypatch.setattr(Python3CompatibilityVerifier, 'verify_file', slow)
+        runner = ParallelMigrationRunner(backend='serial', timeout=0.1, quiet=True)
+        summary = runner.check_files(self.files)
+        
+        assert summary['successful'] == 7
+        assert [entry['file'] for entry in summary['quarantined']] == [self.files[1]]
+    
+    def test_memory_governor_throttles_and_recycles(self):
+        """Test the governor's dispatch and recycling decisions"""
+        mb = 1024 * 1024
+        governor = _MemoryGovernor(budget=400 * mb, workers=4, reserve=0)
+        governor.enabled = True
+        
+        assert governor.may_dispatch({0: 100 * mb}, busy=1)
+        assert not governor.may_dispatch({0: 150 * mb, 1: 150 * mb}, busy=2)
+        assert not governor.may_dispatch({0: 150 * mb, 1: 150 * mb}, busy=2)
+        # Always one task running
+        assert governor.may_dispatch({0: 500 * mb}, busy=0)
+        assert governor.throttled == 1
+        
+        assert not governor.should_recycle(0, 20 * mb)
+        assert not governor.should_recycle(0, 40 * mb)
+        assert governor.should_recycle(0, 70 * mb)
+        assert governor.should_recycle(1, 120 * mb)
+        assert governor.recycled == 2
+    
+    @pytest.mark.skipif(not os.path.exists('/proc/self/statm'),
+                        reason='worker memory is read from /proc')
+    def test_tiny_memory_budget_still_completes(self):
+        """Test that a run over its memory budget keeps going one task at a time"""
+        runner = ParallelMigrationRunner(workers=2, backend='processes', chunk_size=1,
+                                         memory_budget=1, quiet=True)
+        summary = runner.check_files(self.files)
+        
+        assert summary['successful'] == 7
+        assert summary['workers_recycled'] > 0
+        assert len(summary['worker_peak_memory']) <= 2
+        assert all(peak > 0 for peak in summary['worker_peak_memory'])
+    
+    def test_map_files_reduces_in_file_order(self):
+        """Test that an analyzer's results are merged in the order given"""
+        serial = ParallelMigrationRunner(backend='serial', quiet=True)
+        expected = serial.map_files(CodeSmellDetector(), self.files)['result']
+        
+        runner = ParallelMigrationRunner(workers=3, backend='processes', chunk_size=1, quiet=True)
+        summary = runner.map_files(CodeSmellDetector(), self.files)
+        
+        assert summary['analyzer'] == 'CodeSmellDetector'
+        assert summary['successful'] == 7
+        assert [r['file'] for r in summary['results']] == self.files
+        assert [smell.file for smell in summary['result']] == self.files
+        assert summary['result'] == expected
+    
+    def test_map_files_reports_failed_files(self):
+        """Test that files whose map_file raised are left out of the reduce"""
+        runner = ParallelMigrationRunner(workers=2, backend='threads', chunk_size=2, quiet=True)
+        summary = runner.map_files(LineCounter(), self.files)
+        
+        assert summary['failed'] == 1
+        assert summary['results'][3] == {'file': self.files[3], 'success': False,
+                                          'error': 'unreadable'}
+        assert summary['result'] == [(path, 1) for i, path in enumerate(self.files) if i != 3]
+    
+    def test_run_analyzer_probes_once_per_process(self, monkeypatch):
+        """Test that runners without a cache directory share one probe"""
+        import parallel_runner
+        probes = []
+        costs = {'file_seconds': 0.001, 'byte_seconds': 1e-7,
+                 'thread_speedup': 1.0, 'process_start': 100.0}
+        monkeypatch.setattr(parallel_runner, '_process_calibration', None)
+        monkeypatch.setattr(parallel_runner, 'probe_backends', lambda: probes.append(1) or costs)
+        monkeypatch.setattr(ParallelMigrationRunner, 'SERIAL_WORK_SECONDS', 0.0)
+        
+        for _ in range(3):
+            summary = parallel_runner.run_analyzer(LineCounter(), self.files, workers=2)
+            assert summary['backend'] == 'serial'
+        
+        assert len(probes) == 1
+    
+    def test_failed_files_reported_in_file_order(self, monkeypatch):
+        """Test that a file that failed on a worker keeps its place among the smells"""
+        walk_order = [os.path.join(self.test_dir, name) for name in os.listdir(self.test_dir)]
+        analyze_file = CodeSmellDetector.analyze_file
+        
+        def failing(detector, path):
+            if path == walk_order[0]:
+                raise ValueError('unreadable')
+            return analyze_file(detector, path)
+        
+        for path in self.files:
+            with open(path, 'a') as f:
+                f.write('def f(a, b, c, d, e, f, g, h):\n    return a\n')
+        monkeypatch.setattr(CodeSmellDetector, 'map_file', failing)
+        smells = CodeSmellDetector().analyze_directory(self.test_dir)
+        
+        files = [smell.file for smell in smells]
+        assert smells[0].category == 'error' and smells[0].file == walk_order[0]
+        assert list(dict.fromkeys(files)) == walk_order
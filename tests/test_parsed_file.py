@@ -0,0 +1,131 @@
+"""
+Unit tests for the shared ParsedFile abstraction.
+"""
+
+import ast
+import threading
+import tokenize
+
+import pytest
+
+from parsed_file import ParsedFile
+from verifier import Python3CompatibilityVerifier
+from smell_detector import CodeSmellDetector
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    """Keep the per-process registry isolated between tests."""
+    ParsedFile.clear_registry()
+    yield
+    ParsedFile.clear_registry()
+
+
+@pytest.mark.unit
+class TestParsedFile:
+    """Test lazily computed members of ParsedFile."""
+    
+    def test_members(self, temp_dir):
+        """Test raw bytes, text, lines, offsets, tokens and AST."""
+        path = temp_dir / "module.py"
+        path.write_bytes(b"x = 1\r\ny = 2\r\n")
+        
+        parsed = ParsedFile(path)
+        
+        assert parsed.raw == b"x = 1\r\ny = 2\r\n"
+        assert parsed.text == "x = 1\ny = 2\n"
+        assert parsed.lines == ["x = 1", "y = 2"]
+        assert parsed.line_offsets == [0, 6, 12]
+        assert parsed.tokens[0].string == "x"
+        assert isinstance(parsed.tree, ast.Module)
+        assert parsed.syntax_error is None
+    
+    def test_syntax_error_and_encoding_fallback(self, temp_dir):
+        """Test that parse errors are kept and latin-1 is used as fallback."""
+        path = temp_dir / "legacy.py"
+        path.write_bytes(b'print "caf\xe9"\n')
+        
+        parsed = ParsedFile(path)
+        
+        assert parsed.tree is None
+        assert isinstance(parsed.syntax_error, SyntaxError)
+        assert parsed.encoding == "latin-1"
+        assert parsed.text == 'print "caf\xe9"\n'
+    
+    def test_registry_shares_until_file_changes(self, temp_dir):
+        """Test that coerce() reuses one parse per unchanged file."""
+        path = temp_dir / "shared.py"
+        path.write_text("x = 1\n")
+        
+        first = ParsedFile.coerce(str(path))
+        assert ParsedFile.coerce(str(path)) is first
+        assert ParsedFile.coerce(first) is first
+        
+        path.write_text("x = 1\ny = 2\n")
+        assert ParsedFile.coerce(str(path)) is not first
+    
+    def test_registry_bounded_by_bytes(self, temp_dir, monkeypatch):
+        """Test that old entries are evicted once the byte budget is exceeded."""
+        monkeypatch.setattr(ParsedFile, "REGISTRY_MAX_BYTES", 25)
+        paths = []
+        for name in ("a", "b"):
+            path = temp_dir / f"{name}.py"
+            path.write_text("x = 1234567890\n")  # 15 bytes
+            paths.append(str(path))
+        
+        first = ParsedFile.coerce(paths[0])
+        ParsedFile.coerce(paths[1])
+        
+        assert ParsedFile.coerce(paths[0]) is not first
+        assert ParsedFile._registry_bytes == 15
+    
+    def test_registry_locked(self, temp_dir):
+        """Test that registry updates wait for the lock shared with other threads."""
+        path = temp_dir / "shared.py"
+        path.write_text("x = 1\n")
+        opened = []
+        thread = threading.Thread(target=lambda: opened.append(ParsedFile.coerce(str(path))))
+
+        with ParsedFile._registry_lock:
+            thread.start()
+            thread.join(timeout=0.2)
+            assert not opened
+        thread.join()
+
+        assert opened and ParsedFile._registry_bytes == 6
+
+    def test_tokenize_failure_cached(self, temp_dir, monkeypatch):
+        """Test that text that cannot be tokenized is only tokenized once."""
+        path = temp_dir / "broken.py"
+        path.write_text("x = '''unterminated\n")
+        calls = []
+        real_generate = tokenize.generate_tokens
+        monkeypatch.setattr(tokenize, "generate_tokens",
+                            lambda *a: calls.append(1) or real_generate(*a))
+        parsed = ParsedFile(path)
+        
+        assert parsed.tokens is None
+        assert parsed.tokens is None
+        assert len(calls) == 1
+
+
+@pytest.mark.unit
+class TestParsedFileConsumers:
+    """Test that checks and analyzers share one parse."""
+    
+    def test_verifier_and_analyzer_parse_once(self, temp_dir, monkeypatch):
+        """Test that the verifier and smell detector reuse one AST."""
+        path = temp_dir / "module.py"
+        path.write_text("import urllib2\n\ndef f(a=[]):\n    return a\n")
+        calls = []
+        real_parse = ast.parse
+        monkeypatch.setattr(ast, "parse", lambda *a, **k: calls.append(1) or real_parse(*a, **k))
+        
+        parsed = ParsedFile(path)
+        verifier = Python3CompatibilityVerifier()
+        verifier.verify_file(parsed)
+        smells = CodeSmellDetector().analyze_file(parsed)
+        
+        assert len(calls) == 1
+        assert any(i["issue"] == "problematic_import" for i in verifier.issues_found)
+        assert all(smell.file == str(path) for smell in smells)
@@ -0,0 +1,170 @@
+"""
+Unit tests for the shared project file index.
+"""
+
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from project_index import ProjectFileIndex, list_files, project_index
+
+
+def _make_tree(root, paths):
+    """Create empty files (or files with the given text) under ``root``."""
+    for path, text in paths.items():
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text)
+
+
+def _age(root, seconds=60):
+    """Move every mtime under ``root`` outside the racy window."""
+    old = time.time() - seconds
+    for path in [root, *root.rglob("*")]:
+        os.utime(path, (old, old))
+
+
+def _relative(root, paths):
+    return [os.path.relpath(path, root) for path in paths]
+
+
+@pytest.mark.unit
+class TestProjectFileIndex:
+    """Test listing, filtering and reuse of the index."""
+
+    def test_scan_honors_gitignore(self, temp_dir):
+        """Test that ignored paths and pruned directories are not listed."""
+        _make_tree(temp_dir, {
+            ".gitignore": "venv/\n/build\n",
+            "a.py": "", "build/gen.py": "", "venv/lib/site.py": "",
+            "pkg/.gitignore": "gen_*.py\n!gen_keep.py\n",
+            "pkg/b.py": "", "pkg/gen_1.py": "", "pkg/gen_keep.py": "",
+            "pkg/build/c.py": "", "pkg/__pycache__/b.py": "",
+        })
+        index = ProjectFileIndex(str(temp_dir), use_git=False)
+
+        assert _relative(temp_dir, index.files()) == [
+            "a.py", os.path.join("pkg", "b.py"), os.path.join("pkg", "build", "c.py"),
+            os.path.join("pkg", "gen_keep.py"),
+        ]
+        assert index.source == "scan"
+
+    def test_files_filters_per_caller(self, temp_dir):
+        """Test name patterns, excluded directories and the returned path form."""
+        _make_tree(temp_dir, {
+            "a.py": "", "notes.txt": "", "tests/test_a.py": "", "tests/a_test.py": "",
+            ".hidden/x.py": "", "pkg/venv2/y.py": "",
+        })
+        index = ProjectFileIndex(str(temp_dir), use_git=False)
+
+        assert _relative(temp_dir, index.files(exclude=lambda d: d.startswith("."))) == [
+            "a.py", os.path.join("pkg", "venv2", "y.py"),
+            os.path.join("tests", "a_test.py"), os.path.join("tests", "test_a.py"),
+        ]
+        assert _relative(temp_dir, index.files(exclude={".hidden", "venv2", "tests"})) == ["a.py"]
+        assert _relative(temp_dir, index.files(pattern=("test_*.py", "*_test.py"))) == [
+            os.path.join("tests", "a_test.py"), os.path.join("tests", "test_a.py"),
+        ]
+        assert index.files(str(temp_dir / "tests"), pattern=None) == [
+            os.path.join(str(temp_dir / "tests"), "a_test.py"),
+            os.path.join(str(temp_dir / "tests"), "test_a.py"),
+        ]
+
+    def test_unchanged_listing_reused(self, temp_dir):
+        """Test that only directories whose mtime moved are read again."""
+        _make_tree(temp_dir, {"a.py": "", "pkg/b.py": "", "pkg/sub/c.py": ""})
+        _age(temp_dir)
+        index = ProjectFileIndex(str(temp_dir), use_git=False)
+        index.files()
+        index.files()
+        assert (index.listings, index.updates, index.reuses) == (1, 0, 1)
+
+        (temp_dir / "pkg" / "sub" / "c.py").unlink()
+        _make_tree(temp_dir, {"pkg/new/d.py": ""})
+        _age(temp_dir, seconds=30)
+
+        assert _relative(temp_dir, index.files()) == [
+            "a.py", os.path.join("pkg", "b.py"), os.path.join("pkg", "new", "d.py"),
+        ]
+        assert (index.listings, index.updates) == (1, 1)
+        assert index.files() == ProjectFileIndex(str(temp_dir), use_git=False).files()
+
+    def test_recent_directories_not_trusted(self, temp_dir):
+        """Test that a directory modified just now is read on every lookup."""
+        _make_tree(temp_dir, {"a.py": ""})
+        index = ProjectFileIndex(str(temp_dir), use_git=False)
+        index.files()
+        index.files()
+
+        assert index.reuses == 0
+
+    def test_gitignore_change_relists(self, temp_dir):
+        """Test that editing an ignore file rebuilds the listing."""
+        _make_tree(temp_dir, {".gitignore": "", "a.py": "", "b.py": ""})
+        _age(temp_dir)
+        index = ProjectFileIndex(str(temp_dir), use_git=False)
+        index.files()
+
+        (temp_dir / ".gitignore").write_text("b.py\n")
+        _age(temp_dir, seconds=30)
+
+        assert _relative(temp_dir, index.files()) == ["a.py"]
+        assert index.listings == 2
+
+    def test_persisted_listing_shared(self, temp_dir):
+        """Test that a second process reuses the first one's listing."""
+        _make_tree(temp_dir, {"project/a.py": "", "project/pkg/b.py": ""})
+        _age(temp_dir)
+        root = str(temp_dir / "project")
+        cache_dir = str(temp_dir / "cache")
+        first = ProjectFileIndex(root, use_git=False, cache_dir=cache_dir)
+        first.files()
+
+        second = ProjectFileIndex(root, use_git=False, cache_dir=cache_dir)
+
+        assert second.files() == first.files()
+        assert (second.listings, second.reuses) == (0, 1)
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_git_listing(self, temp_dir):
+        """Test that git lists tracked and untracked files, minus ignored and deleted ones."""
+        _make_tree(temp_dir, {
+            ".gitignore": "ignored.py\n", "tracked.py": "", "deleted.py": "",
+            "untracked.py": "", "ignored.py": "",
+        })
+        subprocess.run(["git", "init", "-q", str(temp_dir)], check=True)
+        subprocess.run(["git", "-C", str(temp_dir), "add", "tracked.py", "deleted.py"], check=True)
+        (temp_dir / "deleted.py").unlink()
+        index = ProjectFileIndex(str(temp_dir))
+
+        assert _relative(temp_dir, index.files()) == ["tracked.py", "untracked.py"]
+        assert index.source == "git"
+
+    def test_shared_index_covers_subdirectories(self, temp_dir):
+        """Test that a subdirectory is answered from an enclosing index."""
+        _make_tree(temp_dir, {"a.py": "", "pkg/b.py": ""})
+        root = project_index(str(temp_dir))
+
+        assert project_index(str(temp_dir / "pkg")) is root
+        assert list_files(str(temp_dir / "pkg")) == [os.path.join(str(temp_dir / "pkg"), "b.py")]
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_git_listing_scans_nested_repositories(self, temp_dir):
+        """Test that files of nested repositories and submodules are listed."""
+        _make_tree(temp_dir, {"pkg/a.py": "", "nested/b.py": "", "sub/c.py": ""})
+        for repo in (temp_dir, temp_dir / "nested", temp_dir / "sub"):
+            subprocess.run(["git", "init", "-q", str(repo)], check=True)
+        subprocess.run(["git", "-C", str(temp_dir / "sub"), "add", "c.py"], check=True)
+        subprocess.run(["git", "-C", str(temp_dir / "sub"), "-c", "user.name=t",
+                        "-c", "user.email=t@t", "commit", "-qm", "init"], check=True)
+        subprocess.run(["git", "-C", str(temp_dir), "add", "pkg/a.py", "sub"],
+                       check=True, capture_output=True)
+        index = ProjectFileIndex(str(temp_dir))
+
+        assert _relative(temp_dir, index.files()) == [
+            os.path.join("nested", "b.py"), os.path.join("pkg", "a.py"), os.path.join("sub", "c.py"),
+        ]
+        assert index.source == "git"
@@ -0,0 +1,178 @@
+"""
+Unit tests for Python3CompatibilityVerifier.
+"""
+
+import pytest
+
+from verifier import Python3CompatibilityVerifier
+
+
+@pytest.mark.unit
+class TestVerifierPatterns:
+    """Test detection of Python 2 patterns."""
+    
+    def test_verify_file_finds_issues(self, sample_py2_file):
+        """Test that Python 2 constructs are reported with line numbers."""
+        verifier = Python3CompatibilityVerifier()
+        
+        assert verifier.verify_file(str(sample_py2_file)) is True
+        
+        issues = {(issue["issue"], issue["line"]) for issue in verifier.issues_found}
+        assert ("urllib2_import", 4) in issues
+        assert ("xrange_usage", 35) in issues
+        assert len(verifier.syntax_errors) == 1
+    
+    def test_verify_file_clean(self, temp_dir):
+        """Test that Python 3 code has no errors."""
+        clean_file = temp_dir / "clean.py"
+        clean_file.write_text('for i in range(3):\n    print(i)\n')
+        verifier = Python3CompatibilityVerifier()
+        
+        verifier.verify_file(str(clean_file))
+        
+        assert verifier.is_python3_compatible()
+
+    
+    def test_patterns_stay_within_a_line(self, temp_dir):
+        """Test that a match running into the next line is not reported."""
+        test_file = temp_dir / "split.py"
+        test_file.write_text('print\n    x = xrange(1) + xrange(2)\n')
+        verifier = Python3CompatibilityVerifier()
+        
+        verifier._check_patterns(str(test_file), test_file.read_text())
+        
+        assert [(i["issue"], i["line"]) for i in verifier.issues_found] == [
+            ("xrange_usage", 2)
+        ]
+        assert verifier.issues_found[0]["code"] == "x = xrange(1) + xrange(2)"
+
+@pytest.mark.unit
+class TestVerifierStreaming:
+    """Test the windowed streaming mode for large files."""
+    
+    def test_streaming_matches_in_memory_patterns(self, sample_py2_file):
+        """Test that streamed verification reports the same pattern issues."""
+        verifier = Python3CompatibilityVerifier()
+        verifier.verify_file(str(sample_py2_file))
+        
+        streaming = Python3CompatibilityVerifier()
+        streaming.STREAM_THRESHOLD_BYTES = 0
+        streaming.STREAM_WINDOW_CHARS = 64
+        streaming.verify_file(str(sample_py2_file))
+        
+        expected = [issue for issue in verifier.issues_found
+                    if issue["issue"] != "problematic_import"]
+        assert streaming.issues_found == expected
+        assert [w["issue"] for w in streaming.warnings] == ["streamed_file"]
+
+    def test_ranges_match_streamed_file(self, sample_py2_file):
+        """Test that checking a file in two byte ranges finds the same issues."""
+        streaming = Python3CompatibilityVerifier()
+        streaming.STREAM_THRESHOLD_BYTES = 0
+        streaming.verify_file(str(sample_py2_file))
+
+        data = sample_py2_file.read_bytes()
+        middle = data.index(b"\n", len(data) // 2) + 1
+        ranged = Python3CompatibilityVerifier()
+        ranged.STREAM_WINDOW_CHARS = 64
+        ranged.verify_range(str(sample_py2_file), middle, len(data),
+                            first_line=data.count(b"\n", 0, middle) + 1)
+        ranged.verify_range(str(sample_py2_file), 0, middle)
+
+        assert sorted(ranged.issues_found, key=lambda i: i["line"]) == list(streaming.issues_found)
+
+
+@pytest.mark.unit
+class TestVerifierIterResults:
+    """Test the streaming per-file results API."""
+    
+    def test_records_are_yielded_per_file(self, temp_dir):
+        """Test that each file's record arrives before the next file is read."""
+        (temp_dir / "a.py").write_text("for i in xrange(3):\n    pass\n")
+        (temp_dir / "b.py").write_text("x = 1\n")
+        (temp_dir / "c.py").write_text("def f(:\n")
+        verifier = Python3CompatibilityVerifier(verbose=False)
+        
+        results = verifier.iter_results([str(temp_dir / "a.py"), str(temp_dir)])
+        first = next(results)
+        
+        assert verifier.files_checked == 1
+        assert first["file"] == str(temp_dir / "a.py")
+        assert [i["issue"] for i in first["issues"]] == ["xrange_usage"]
+        assert first["compatible"] is False
+        
+        rest = {r["file"]: r for r in results}
+        assert rest[str(temp_dir / "b.py")]["compatible"] is True
+        assert rest[str(temp_dir / "c.py")]["syntax_error"].startswith("Line 1")
+        assert len(verifier.issues_found) == 0
+        assert verifier.syntax_errors == []
+    
+    def test_memory_stays_flat_without_keep(self, temp_dir):
+        """Test that streamed files leave no interned paths or snippets behind."""
+        for i in range(20):
+            (temp_dir / f"m{i}.py").write_text(f"for i in xrange({i}):\n    print i\n")
+        verifier = Python3CompatibilityVerifier(verbose=False)
+        
+        for record in verifier.iter_results(str(temp_dir)):
+            assert record["issues"]
+        
+        store = verifier.issues_found
+        assert len(store) == 0
+        assert len(store._files.values) + len(store._codes.values) == 0
+    
+    def test_keep_accumulates_results(self, temp_dir):
+        """Test that keep=True also leaves results on the verifier."""
+        (temp_dir / "a.py").write_text("for i in xrange(3):\n    pass\n")
+        verifier = Python3CompatibilityVerifier(verbose=False)
+        
+        records = list(verifier.iter_results(str(temp_dir), keep=True))
+        
+        assert len(records) == 1
+        assert verifier.issues_found == records[0]["issues"]
+
+
+@pytest.mark.unit
+class TestVerifierIncremental:
+    """Test content-hash keyed reuse of results across runs."""
+    
+    def _run(self, directory, record_path, rules_path):
+        verifier = Python3CompatibilityVerifier(verbose=False)
+        verifier.open_record(str(record_path), custom_rules_file=str(rules_path))
+        verifier.verify_directory(str(directory))
+        return verifier
+    
+    def _results(self, verifier):
+        return (sorted(map(repr, verifier.issues_found)), sorted(map(repr, verifier.warnings)),
+                sorted(map(repr, verifier.syntax_errors)), verifier.files_checked)
+    
+    def test_unchanged_files_come_from_record(self, temp_dir, sample_py2_file):
+        """Test that a repeat run reuses results and only rescans changed files."""
+        (temp_dir / "clean.py").write_text("# café\nx = 1\n")
+        record_path = temp_dir / "cache" / "record.json"
+        rules_path = temp_dir / "rules.json"
+        
+        first = self._run(temp_dir, record_path, rules_path)
+        second = self._run(temp_dir, record_path, rules_path)
+        
+        assert self._results(second) == self._results(first)
+        assert (second.record.hits, second.record.misses) == (2, 0)
+        
+        (temp_dir / "clean.py").write_text("y = 2\n")
+        third = self._run(temp_dir, record_path, rules_path)
+        assert (third.record.hits, third.record.misses) == (1, 1)
+        assert third.warnings == []
+    
+    def test_pattern_or_rule_changes_invalidate(self, temp_dir, sample_py2_file):
+        """Test that stored results are dropped when the fingerprint changes."""
+        record_path = temp_dir / "record.json"
+        rules_path = temp_dir / "rules.json"
+        self._run(temp_dir, record_path, rules_path)
+        
+        rules_path.write_text('{"rules": []}')
+        verifier = self._run(temp_dir, record_path, rules_path)
+        assert verifier.record.invalidated and verifier.record.hits == 0
+        
+        verifier = Python3CompatibilityVerifier(verbose=False)
+        verifier.issue_patterns["xrange_usage"]["severity"] = "warning"
+        verifier.open_record(str(record_path), custom_rules_file=str(rules_path))
+        assert verifier.record.invalidated